@@ -1,8 +1,16 @@
 class task_annotation:
     """
     一个用于存放所有任务相关注解（装饰器）的容器类。
+    配额类注解会把限制合并到函数的 '_task_quota' 字典中，调度器在启动浏览器前据此过滤任务。
     """
 
+    @staticmethod
+    def _merge_quota(func, **quota):
+        merged = dict(getattr(func, '_task_quota', {}))
+        merged.update(quota)
+        setattr(func, '_task_quota', merged)
+        return func
+
     @staticmethod
     def once_per_day(func):
         """
@@ -10,6 +18,43 @@ class task_annotation:
         它会给函数对象附加一个 '_task_limit' 属性。
         """
         setattr(func, '_task_limit', 'once_per_day')
-        return func
+        return task_annotation._merge_quota(func, per_day=1)
+
+    @staticmethod
+    def per_day(times: int):
+        """
+        注解，用于标记一个任务每个自然日最多执行 times 次。
+        """
+        def decorator(func):
+            setattr(func, '_task_limit', f'{times}_per_day')
+            return task_annotation._merge_quota(func, per_day=times)
+        return decorator
+
+    @staticmethod
+    def cooldown(hours: float):
+        """
+        注解，用于标记一个任务两次成功执行之间至少间隔 hours 小时。
+        """
+        def decorator(func):
+            return task_annotation._merge_quota(func, cooldown_hours=hours)
+        return decorator
 
+    @staticmethod
+    def quota(times: int, window_hours: float):
+        """
+        注解，用于标记一个任务在任意连续 window_hours 小时内最多执行 times 次。
+        """
+        def decorator(func):
+            return task_annotation._merge_quota(func, window=(times, window_hours))
+        return decorator
 
+    @staticmethod
+    def timeout(seconds: float):
+        """
+        注解，用于声明任务的最长执行时间（秒），超时后看门狗会强制终止该任务并回收槽位。
+        未声明时使用 AppConfig.DEFAULT_TASK_TIMEOUT。
+        """
+        def decorator(func):
+            setattr(func, '_task_timeout', seconds)
+            return func
+        return decorator
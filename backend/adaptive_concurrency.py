@@ -0,0 +1,227 @@
+import ctypes
+import statistics
+import sys
+import threading
+from collections import deque
+
+from backend.task_duration_model import task_duration_model
+from config import AppConfig
+from util.log_util import log_util
+
+
+class ConcurrencyLimiter:
+    """
+    可调整上限的并发限制器，接口与 threading.Semaphore 的 acquire/release 一致。
+    调小上限时不会打断正在运行的工作线程，只是在它们归还后不再放行新的线程，直到占用数低于新上限。
+    """
+
+    def __init__(self, limit: int):
+        self._cond = threading.Condition()
+        self._limit = limit
+        self._in_use = 0
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def acquire(self):
+        with self._cond:
+            while self._in_use >= self._limit:
+                self._cond.wait()
+            self._in_use += 1
+
+    def release(self):
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify_all()
+
+    def set_limit(self, limit: int):
+        with self._cond:
+            self._limit = limit
+            self._cond.notify_all()
+
+
+class HostLoadSampler:
+    """
+    采样主机的CPU使用率和可用内存比例。
+    Linux 读取 /proc/stat 与 /proc/meminfo；Windows 通过 GetSystemTimes/GlobalMemoryStatusEx 获取。
+    CPU使用率按两次采样之间的差值计算，第一次采样返回None。
+    """
+
+    def __init__(self):
+        self._last_cpu = None
+
+    def sample(self) -> dict:
+        try:
+            if sys.platform.startswith('win'):
+                idle, total = self._windows_cpu_times()
+                mem_available = self._windows_mem_available()
+            else:
+                idle, total = self._proc_cpu_times()
+                mem_available = self._proc_mem_available()
+        except Exception as e:
+            log_util.warn("自适应并发", f"采样主机负载失败: {e}")
+            return {'cpu': None, 'mem_available': None}
+
+        cpu = None
+        if self._last_cpu is not None:
+            last_idle, last_total = self._last_cpu
+            delta_total = total - last_total
+            if delta_total > 0:
+                cpu = 1.0 - (idle - last_idle) / delta_total
+        self._last_cpu = (idle, total)
+        return {'cpu': cpu, 'mem_available': mem_available}
+
+    @staticmethod
+    def _proc_cpu_times():
+        with open('/proc/stat', 'r') as f:
+            values = [int(v) for v in f.readline().split()[1:]]
+        # idle + iowait
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        return idle, sum(values)
+
+    @staticmethod
+    def _proc_mem_available():
+        meminfo = {}
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0])
+        return meminfo['MemAvailable'] / meminfo['MemTotal']
+
+    @staticmethod
+    def _windows_cpu_times():
+        idle, kernel, user = (ctypes.c_ulonglong(), ctypes.c_ulonglong(), ctypes.c_ulonglong())
+        ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user))
+        # kernel 时间已包含 idle 时间
+        return idle.value, kernel.value + user.value
+
+    @staticmethod
+    def _windows_mem_available():
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong),
+                ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong),
+                ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong),
+                ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status))
+        return status.ullAvailPhys / status.ullTotalPhys
+
+
+class AdaptiveConcurrencyController:
+    """
+    自适应并发控制器。
+    后台线程定期采样主机CPU/内存，并结合最近任务的相对耗时与超时率，在 [min_limit, max_limit]
+    范围内每次把并发上限增加或减少1：
+        - 主机过载（CPU或内存超过阈值）、超时率过高、或任务耗时明显变慢时缩小；
+        - 主机空闲、所有槽位都在使用且任务表现正常时扩大。
+    不同任务的耗时相差很大，因此每个任务的耗时先除以该任务的基线（首次出现时耗时模型中的历史中位数，
+    没有历史时取本次运行中的首次耗时），再对最近任务的耗时比取中位数，避免任务组合变化被误判为变慢。
+    每次决策（包括保持不变）都会写入日志，便于调参。
+    """
+
+    def __init__(self, limiter: ConcurrencyLimiter, min_limit: int, max_limit: int, run_stats=None):
+        self.log = log_util
+        self.limiter = limiter
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.max_limit = max_limit
+        self.run_stats = run_stats
+        self.sampler = HostLoadSampler()
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=AppConfig.ADAPTIVE_SAMPLE_WINDOW)  # (耗时/该任务基线, 是否超时)
+        self._baselines = {}  # task_name -> 基线耗时（秒）
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.sampler.sample()  # 建立CPU采样基线
+        self._thread = threading.Thread(target=self._run, name="AdaptiveConcurrency", daemon=True)
+        self._thread.start()
+        self.log.info("自适应并发", f"自适应并发已启用，范围 {self.min_limit}-{self.max_limit}，"
+                                    f"初始并发 {self.limiter.limit}。")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def record_task(self, task_name: str, duration: float, timed_out: bool):
+        """工作线程在每个任务结束后调用。"""
+        with self._lock:
+            baseline = self._baselines.get(task_name)
+            if baseline is None:
+                baseline = task_duration_model.median(task_name) or duration
+                self._baselines[task_name] = baseline
+            self._recent.append((duration / baseline if baseline > 0 else 1.0, timed_out))
+
+    def _task_metrics(self):
+        with self._lock:
+            recent = list(self._recent)
+        if len(recent) < AppConfig.ADAPTIVE_MIN_SAMPLES:
+            return None, None
+        ratios = [r for r, _ in recent]
+        timeout_rate = sum(1 for _, t in recent if t) / len(recent)
+        return statistics.median(ratios), timeout_rate
+
+    def _run(self):
+        while not self._stop_event.wait(AppConfig.ADAPTIVE_INTERVAL):
+            try:
+                self._adjust()
+            except Exception as e:
+                self.log.error("自适应并发", f"调整并发时发生异常: {e}", exc_info=True)
+
+    def _adjust(self):
+        load = self.sampler.sample()
+        cpu, mem_available = load['cpu'], load['mem_available']
+        median_ratio, timeout_rate = self._task_metrics()
+        limit, in_use = self.limiter.limit, self.limiter.in_use
+
+        # 最近任务的耗时普遍显著高于各自的基线，说明并发已经在拖慢任务
+        slowed = median_ratio is not None and median_ratio > AppConfig.ADAPTIVE_SLOWDOWN_RATIO
+
+        reasons = []
+        if cpu is not None and cpu > AppConfig.ADAPTIVE_CPU_HIGH:
+            reasons.append(f"CPU {cpu:.0%} 过高")
+        if mem_available is not None and mem_available < AppConfig.ADAPTIVE_MEM_AVAILABLE_LOW:
+            reasons.append(f"可用内存 {mem_available:.0%} 过低")
+        if timeout_rate is not None and timeout_rate > AppConfig.ADAPTIVE_TIMEOUT_RATE_HIGH:
+            reasons.append(f"超时率 {timeout_rate:.0%} 过高")
+        if slowed:
+            reasons.append(f"任务耗时中位数为基线的 {median_ratio:.1f} 倍")
+
+        if reasons:
+            new_limit = max(self.min_limit, limit - 1)
+            action = "缩小" if new_limit < limit else "保持(已达下限)"
+        elif (cpu is not None and cpu < AppConfig.ADAPTIVE_CPU_LOW and in_use >= limit
+              and (timeout_rate is None or timeout_rate == 0)):
+            new_limit = min(self.max_limit, limit + 1)
+            action = "扩大" if new_limit > limit else "保持(已达上限)"
+            reasons.append("主机空闲且槽位已满")
+        else:
+            new_limit = limit
+            action = "保持"
+
+        cpu_text = f"{cpu:.0%}" if cpu is not None else "-"
+        mem_text = f"{mem_available:.0%}" if mem_available is not None else "-"
+        ratio_text = f"{median_ratio:.2f}" if median_ratio is not None else "-"
+        timeout_text = f"{timeout_rate:.0%}" if timeout_rate is not None else "-"
+        self.log.info("自适应并发", f"{action}: 并发 {limit} -> {new_limit}，占用 {in_use}，CPU {cpu_text}，"
+                                    f"可用内存 {mem_text}，耗时/基线 {ratio_text}，超时率 {timeout_text}"
+                                    + (f"；原因: {'，'.join(reasons)}" if reasons else ""))
+
+        if new_limit != limit:
+            self.limiter.set_limit(new_limit)
+            if self.run_stats:
+                self.run_stats.incr('concurrency_increases' if new_limit > limit else 'concurrency_decreases')
+                self.run_stats.set_gauge('concurrency_limit', new_limit)
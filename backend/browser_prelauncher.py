@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from util.ads_browser_util import AdsBrowserUtil
+from util.log_util import log_util
+
+
+class BrowserPrelauncher:
+    """
+    浏览器预启动流水线。
+    在工作线程仍在执行任务时，提前在后台为接下来的K个工作包启动AdsPower浏览器，
+    当并发槽位空出时可以直接拿到已经就绪的浏览器对象，而不是再同步等待启动。
+    同时处于“已启动但未领取”状态的浏览器数量不会超过K。
+    """
+
+    def __init__(self, depth: int, max_depth: int, headless: bool = False):
+        self.log = log_util
+        self.headless = headless
+        self.depth = max(0, min(int(depth), int(max_depth)))
+        self._lock = threading.Lock()
+        self._pending = {}  # user_id -> Future[browser]
+        self._closed = False
+        self._executor = None
+        if self.depth > 0:
+            self._executor = ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix='BrowserLauncher')
+
+    def prefetch(self, user_ids):
+        """
+        按顺序为给定的user_id提交后台启动。
+        已在流水线中的浏览器会被跳过，超出预启动深度的部分会被忽略。
+        """
+        if not self._executor:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            for user_id in user_ids:
+                if len(self._pending) >= self.depth:
+                    break
+                if user_id in self._pending:
+                    continue
+                self._pending[user_id] = self._executor.submit(AdsBrowserUtil.start_browser_if_not_running,
+                                                               user_id, self.headless)
+
+    def acquire(self, user_id: str):
+        """
+        领取指定浏览器。
+        如果该浏览器已在预启动流水线中，则等待其启动结果；否则在当前线程同步启动。
+        """
+        with self._lock:
+            future = self._pending.pop(user_id, None)
+
+        if future is None:
+            return AdsBrowserUtil.start_browser_if_not_running(user_id, self.headless)
+
+        try:
+            return future.result()
+        except Exception as e:
+            self.log.error("调度器", f"预启动浏览器 {user_id} 时发生异常: {e}", exc_info=True)
+            return None
+
+    def shutdown(self):
+        """停止预启动，已启动但未被领取的浏览器会在启动完成后被关闭。"""
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.items())
+            self._pending.clear()
+
+        for user_id, future in pending:
+            future.add_done_callback(lambda f, uid=user_id: self._quit_unclaimed(uid, f))
+
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+    def _quit_unclaimed(self, user_id, future):
+        try:
+            browser = future.result()
+        except Exception:
+            return
+        if browser:
+            try:
+                browser.quit()
+                self.log.info("调度器", f"已关闭未被领取的预启动浏览器 {user_id}。")
+            except Exception as e:
+                self.log.error("调度器", f"关闭预启动浏览器 {user_id} 时发生异常: {e}", exc_info=True)
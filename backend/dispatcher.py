@@ -2,18 +2,36 @@ import threading
 import time
 import itertools
 import random
+import queue
 import traceback
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 from collections import Counter
 
-import pyautogui
 from DrissionPage import ChromiumPage, ChromiumOptions
 
+from backend.adaptive_concurrency import AdaptiveConcurrencyController, ConcurrencyLimiter
+from backend.browser_prelauncher import BrowserPrelauncher
+from backend.memory_governor import BrowserMemoryGovernor
 from backend.message_store import message_store
+from backend.quota_ledger import quota_ledger
+from backend.run_stats import RunStats
+from backend.task_duration_model import task_duration_model
+from backend.task_queue import TaskQueue
+from backend.task_status_table import TaskStatusTable
+from backend.task_watchdog import TaskWatchdog, WorkerLease
+from config import AppConfig
 from util.ads_browser_util import AdsBrowserUtil
 from util.anti_sybil_dp_util import AntiSybilDpUtil
+from util.cancel_util import CancelUtil, TaskCancelledError
+from util.cdp_counter import CdpCounter
+from util.foreground_util import ForegroundUtil
 from util.log_util import log_util
+from util.selector_strategy_memo import selector_strategy_memo
+from util.session_state_cache import session_state_cache
+from util.tab_manager import TabManager
+from util.tab_registry import TabRegistry
+from util.window_layout import WindowLayout
 
 from util.okx_wallet_util import OKXWalletUtil
 
@@ -35,24 +53,106 @@ def get_windows_dpi_scaling():
 class Dispatcher:
     """
     调度器，运行在主线程。
-    它使用内置的ThreadPoolExecutor和信号量来管理并发。
+    它使用内置的ThreadPoolExecutor和并发限制器来管理并发。
+    自适应模式下，concurrent_browsers 作为并发上限，实际并发在 [min_browsers, concurrent_browsers] 之间动态调整。
     """
 
-    def __init__(self, sequence, concurrent_browsers, projects_map, interrupt_event):
+    SCHEDULER_PACKAGE = 'package'
+    SCHEDULER_TASK_QUEUE = 'task_queue'
+    BACKEND = 'thread'
+
+    def __init__(self, sequence, concurrent_browsers, projects_map, interrupt_event, prelaunch_count=None,
+                 scheduler_mode=None, journal=None, unit_filter=None, run_mode='new', parent_run_id=None,
+                 adaptive=False, min_browsers=None, slot_ids=None, headless=None):
         self.sequence = sequence
         self.concurrent_browsers = concurrent_browsers
+        self.scheduler_mode = scheduler_mode or AppConfig.DEFAULT_SCHEDULER_MODE
+        self.adaptive = adaptive
+        self.min_browsers = min_browsers
         self.projects_map = projects_map
         self.interrupt_event = interrupt_event
         self.log = log_util
-
-        self.scale_factor = get_windows_dpi_scaling()
-        self.screen_width, self.screen_height = pyautogui.size()
-
-        self.executor = ThreadPoolExecutor(max_workers=self.concurrent_browsers, thread_name_prefix='BrowserWorker')
-        self.concurrency_semaphore = threading.Semaphore(self.concurrent_browsers)
-
+        # 所有可取消的等待（CancelUtil.sleep）都监听该中断事件
+        CancelUtil.bind(interrupt_event)
+        self._stop_requested_at = None
+
+        # 无显示器模式下跳过所有屏幕几何相关的工作，GUI依赖只在有桌面时才导入
+        self.headless = AppConfig.is_headless() if headless is None else headless
+        if self.headless:
+            self.scale_factor = 1.0
+            self.screen_width, self.screen_height = None, None
+        else:
+            import pyautogui
+            self.scale_factor = get_windows_dpi_scaling()
+            self.screen_width, self.screen_height = pyautogui.size()
+
+        # 本调度器负责的槽位编号。多进程调度时每个子进程只负责其中一部分，
+        # concurrent_browsers 仍是全局槽位数，用于窗口排列和统计
+        self.slot_ids = list(slot_ids) if slot_ids is not None else list(range(self.concurrent_browsers))
+        max_slots = len(self.slot_ids)
+
+        self.run_stats = RunStats(self.concurrent_browsers, self.scheduler_mode)
+        self.executor = None
+        self.prelauncher = None
+        self.watchdog = None
+        self.adaptive_controller = None
+        self.memory_governor = None
+        self._init_worker_resources(max_slots, adaptive, min_browsers, prelaunch_count)
+        self.run_stats.set_gauge('concurrency_limit', self.concurrency_semaphore.limit)
+        self._active_leases = set()
+        self._leases_cond = threading.Condition()
+
+        # 基准测试：统计每个任务的CDP消息数
+        self._count_cdp = AppConfig.CDP_MESSAGE_COUNTING and CdpCounter.install()
+
+        # 运行日志；unit_filter 为 (browser_id, unique_task_name) 集合，用于恢复/重跑时只执行指定单元
+        self.journal = journal
+        self.unit_filter = unit_filter
+        self.run_mode = run_mode
+        self.parent_run_id = parent_run_id
+
+        self.skipped_units = []  # 因配额已满足而被跳过的 (browser_id, unique_task_name, 原因)
         self.job_list = []  # 用于存放所有工作任务定义
+        self.task_queue = None  # 仅在task_queue调度模式下使用
         self.total_task_count = 0  # 将在execute()方法中计算
+        self._expected_seconds = {}  # (browser_id, unique_task_name) -> 预计耗时，用于估算剩余时间
+        self.task_status = TaskStatusTable()  # 本次运行所有任务单元的状态，供前端轮询
+
+    def _init_worker_resources(self, max_slots, adaptive, min_browsers, prelaunch_count):
+        """创建本进程运行浏览器工作线程所需的线程池、并发限制、预启动流水线、看门狗和内存管控。"""
+        # 线程池预留额外线程：被看门狗回收槽位的卡死线程仍占用一个线程，不能因此减少可用并发
+        self.executor = ThreadPoolExecutor(max_workers=max_slots + AppConfig.STUCK_WORKER_RESERVE,
+                                           thread_name_prefix='BrowserWorker')
+        if adaptive:
+            min_browsers = min_browsers or 1
+            self.concurrency_semaphore = ConcurrencyLimiter(min(min_browsers, max_slots))
+            self.adaptive_controller = AdaptiveConcurrencyController(
+                self.concurrency_semaphore, min_browsers, max_slots, self.run_stats)
+        else:
+            self.concurrency_semaphore = ConcurrencyLimiter(max_slots)
+        if prelaunch_count is None:
+            prelaunch_count = AppConfig.BROWSER_PRELAUNCH_COUNT
+        self.prelauncher = BrowserPrelauncher(prelaunch_count, AppConfig.BROWSER_PRELAUNCH_MAX,
+                                              headless=self.headless and AppConfig.ADS_HEADLESS_BROWSER)
+
+        # 槽位编号，用于窗口排列和槽位利用率统计
+        self.free_slots = queue.Queue()
+        for slot_id in self.slot_ids:
+            self.free_slots.put(slot_id)
+
+        # 看门狗：监控任务超时，回收卡死的槽位
+        self.watchdog = TaskWatchdog(self._on_watchdog_timeout, AppConfig.WATCHDOG_INTERVAL)
+        # 浏览器内存管控：两个任务之间采样内存，超出预算时回收标签页或重启浏览器
+        self.memory_governor = BrowserMemoryGovernor() if AppConfig.MEMORY_GOVERNOR_ENABLED else None
+
+    def _run_options(self) -> dict:
+        """写入运行日志的调度选项，恢复或重跑时按原选项启动。"""
+        return {
+            'scheduler_mode': self.scheduler_mode,
+            'backend': self.BACKEND,
+            'adaptive': self.adaptive,
+            'min_browsers': self.min_browsers,
+        }
 
     def _generate_job_list(self):
         """
@@ -85,17 +185,102 @@ class Dispatcher:
         self.job_list = []
         for browser_id, tasks in work_by_browser.items():
             random.shuffle(tasks)
+            # 按照前端的规则，为同一个任务的多次执行创建唯一键 (e.g., task_name_0, task_name_1)
+            task_execution_counts = Counter()
+            tasks = [dict(task) for task in tasks]
+            for task in tasks:
+                task['unique_task_name'] = f"{task['task_name']}_{task_execution_counts[task['task_name']]}"
+                task_execution_counts[task['task_name']] += 1
+            if self.unit_filter is not None:
+                tasks = [task for task in tasks if (browser_id, task['unique_task_name']) in self.unit_filter]
+            tasks = self._apply_quota(browser_id, tasks)
+            if not tasks:
+                # 剩余任务为空的浏览器不需要启动
+                continue
             self.job_list.append({
                 'user_id': browser_id,
-                'tasks_to_run': tasks
+                'tasks_to_run': tasks,
+                'expected_seconds': sum(task_duration_model.expected(task['task_name']) for task in tasks)
             })
-        
-        # 生成最终列表后，计算总任务数
-        self.total_task_count = sum(len(job['tasks_to_run']) for job in self.job_list)
+
+        # LPT：预计耗时最长的工作包最先启动，避免长工作包最后才开始而拉长总耗时
+        self.job_list.sort(key=lambda job: job['expected_seconds'], reverse=True)
+        self._expected_seconds = {(job['user_id'], task['unique_task_name']): task_duration_model.expected(task['task_name'])
+                                  for job in self.job_list for task in job['tasks_to_run']}
+        for browser_id, unique_task_name in self._expected_seconds:
+            self.task_status.register(browser_id, unique_task_name)
+
+        # 生成最终列表后，计算总任务数（被跳过的单元也计入总数，它们会直接以SKIPPED状态完成）
+        self.total_task_count = sum(len(job['tasks_to_run']) for job in self.job_list) + len(self.skipped_units)
         self.log.info("调度器", f"已生成 {len(self.job_list)} 个工作包，总任务数: {self.total_task_count}")
+        if self.skipped_units:
+            self.log.info("调度器", f"已跳过 {len(self.skipped_units)} 个配额已满足的任务单元。")
+
+    def estimate_remaining_seconds(self):
+        """
+        根据耗时模型和任务状态表估算剩余时间。
+        已结束的单元不计，执行中的单元扣除已执行时间；结果取"剩余总工作量/并发数"与
+        "单个浏览器剩余工作量"两者中的较大值（同一浏览器的任务只能串行执行）。
+        """
+        if not self._expected_seconds:
+            return None
+        now = datetime.now()
+        per_browser = Counter()
+        for (user_id, unique_task_name), expected in self._expected_seconds.items():
+            task = self.task_status.get(user_id, unique_task_name)
+            if task is None:
+                per_browser[user_id] += expected
+            elif task.get('status') == 'EXECUTING':
+                try:
+                    elapsed = (now - datetime.fromisoformat(task['timestamp'])).total_seconds()
+                except (KeyError, TypeError, ValueError):
+                    elapsed = 0
+                per_browser[user_id] += max(0.0, expected - elapsed)
+        if not per_browser:
+            return 0.0
+        total = sum(per_browser.values())
+        return round(max(total / max(1, self.concurrency_semaphore.limit), max(per_browser.values())), 1)
+
+    def _get_task_attr(self, task_name, attr, default=None):
+        """根据任务名找到对应项目类的任务方法，并读取其注解属性。"""
+        project_class = self.projects_map.get(task_name.split('_task_')[0].capitalize())
+        method = getattr(project_class, task_name, None) if project_class else None
+        return getattr(method, attr, default) if method else default
+
+    def _apply_quota(self, browser_id, tasks):
+        """根据配额账本过滤一个浏览器的任务列表，超出剩余配额的单元记入 skipped_units。"""
+        if not AppConfig.TASK_QUOTA_ENFORCED:
+            return tasks
+        allowed = {}
+        kept = []
+        for task in tasks:
+            task_name = task['task_name']
+            if task_name not in allowed:
+                quota = self._get_task_attr(task_name, '_task_quota')
+                allowed[task_name] = quota_ledger.remaining(browser_id, task_name, quota)
+            if allowed[task_name] is None:
+                kept.append(task)
+            elif allowed[task_name] > 0:
+                allowed[task_name] -= 1
+                kept.append(task)
+            else:
+                self.skipped_units.append((browser_id, task['unique_task_name'], "任务配额已用完，已跳过。"))
+        return kept
+
+    def _publish_skipped_units(self):
+        for browser_id, unique_task_name, reason in self.skipped_units:
+            self._publish_task_status(browser_id, {
+                'task_name': unique_task_name,
+                'status': 'SKIPPED',
+                'details': reason,
+                'timestamp': datetime.now().isoformat(timespec='milliseconds')
+            })
 
     def _arrange_window(self, browser: ChromiumPage, worker_id: int):
-        """根据总并发数和当前序号，动态计算并排列窗口。"""
+        """
+        根据总并发数和当前序号，动态计算并排列窗口（任意并发数，见 WindowLayout）。
+        工作页面开启焦点模拟，窗口重叠或被遮挡时也不会被后台节流。无显示器模式下只准备工作页面，不排列窗口。
+        """
         try:
             page = browser.new_tab()
             time.sleep(1)
@@ -106,30 +291,21 @@ class Dispatcher:
                     if tab.tab_id != page.tab_id:
                         tab.close()
                 time.sleep(0.5)
+            ForegroundUtil.keep_foreground(page)
 
-            if self.concurrent_browsers <= 2: cols, rows = 2, 1
-            elif self.concurrent_browsers <= 4: cols, rows = 2, 2
-            elif self.concurrent_browsers <= 6: cols, rows = 3, 2
-            elif self.concurrent_browsers <= 8: cols, rows = 4, 2
-            else: cols, rows = 4, 2
+            if self.headless:
+                return
 
             taskbar_height = 80
-            gap_x = 10
-            gap_y = 10
-
-            cell_width = (self.screen_width - (cols - 1) * gap_x) / cols
-            cell_height = (self.screen_height - taskbar_height - (rows - 1) * gap_y) / rows
-
-            row = worker_id // cols
-            col = worker_id % cols
+            rect = WindowLayout.rect(worker_id, self.concurrent_browsers,
+                                     self.screen_width, self.screen_height - taskbar_height,
+                                     mode=AppConfig.WINDOW_LAYOUT_MODE,
+                                     min_width=AppConfig.WINDOW_MIN_WIDTH, min_height=AppConfig.WINDOW_MIN_HEIGHT)
 
-            logical_x = col * (cell_width + gap_x)
-            logical_y = row * (cell_height + gap_y)
-
-            actual_x = int(logical_x / self.scale_factor)
-            actual_y = int(logical_y / self.scale_factor)
-            actual_width = int(cell_width / self.scale_factor)
-            actual_height = int(cell_height / self.scale_factor)
+            actual_x = int(rect.x / self.scale_factor)
+            actual_y = int(rect.y / self.scale_factor)
+            actual_width = int(rect.width / self.scale_factor)
+            actual_height = int(rect.height / self.scale_factor)
 
             for attempt in range(3):
                 try:
@@ -150,152 +326,595 @@ class Dispatcher:
         except Exception as e:
             self.log.error(f"调度器", f"排列窗口时发生严重错误: {e}", exc_info=True)
 
-    def _worker(self, browser, assignment, user_id):
-        """包含原BrowserWorker核心逻辑的工作函数，由线程池执行。"""
+    def _prepare_browser(self, browser, user_id, lease) -> bool:
+        """排列窗口、注入补丁并解锁钱包。任何一步失败（或超时）都返回False。"""
+        lease.thread_ident = threading.get_ident()
+        CancelUtil.reset_current_thread()
+        self.watchdog.begin(lease, None, AppConfig.BROWSER_PREPARE_TIMEOUT)
         try:
-            try:
-                thread_name = threading.current_thread().name
-                worker_id = int(thread_name.split('_')[-1])
-                self._arrange_window(browser, worker_id)
-
-                # 在窗口排列（并创建了新页面）后，立即获取该页面并注入补丁
-                AntiSybilDpUtil.human_brief_wait()
-                page = browser.latest_tab
-                if page:
-                    AntiSybilDpUtil.patch_webdriver_fingerprint(page)
-                    self.log.info(user_id, "已成功为工作页面注入反指纹补丁。")
+            prepared = self._do_prepare_browser(browser, user_id, lease.slot_id)
+        except TaskCancelledError:
+            self.log.warn(user_id, "浏览器准备阶段已被取消。")
+            prepared = False
+        finally:
+            in_time = self.watchdog.end(lease)
+        return prepared and in_time
+
+    def _do_prepare_browser(self, browser, user_id, slot_id) -> bool:
+        try:
+            self._arrange_window(browser, slot_id)
+
+            # 在窗口排列（并创建了新页面）后，立即获取该页面并注入补丁
+            AntiSybilDpUtil.human_brief_wait()
+            page = browser.latest_tab
+            if page:
+                AntiSybilDpUtil.patch_webdriver_fingerprint(page)
+                # 登记为托管页面，任务结束清理残留页面时保留它
+                try:
+                    TabManager.for_browser(browser).adopt(page)
+                except Exception as e:
+                    self.log.warn(user_id, f"登记工作页面失败: {e}")
+                self.log.info(user_id, "已成功为工作页面注入反指纹补丁。")
+            else:
+                raise Exception("排列窗口后未能获取页面，无法注入补丁。")
+
+        except Exception as e:
+            self.log.error(user_id, f"排列窗口或注入补丁失败: {e}", exc_info=True)
+            return False # 关键步骤失败，中止该worker
+
+        try:
+            okx_util = OKXWalletUtil()
+            okx_util.open_and_unlock_drission(browser, user_id)
+        except Exception as e:
+            self.log.error(user_id, f"钱包初始化解锁失败，任务序列中止: {e}", exc_info=True)
+            return False
+
+        return True
+
+    def _publish_task_status(self, user_id, task_details):
+        """将单个任务的状态写入任务状态表。"""
+        try:
+            timestamp = datetime.fromisoformat(task_details['timestamp']).timestamp()
+        except (KeyError, TypeError, ValueError):
+            timestamp = None
+        self.task_status.set_status(user_id, task_details['task_name'], task_details['status'],
+                                    task_details.get('details'), timestamp)
+        if self.journal:
+            self.journal.record_status(user_id, task_details)
+
+    def _record_success(self, user_id, task_name, seconds):
+        """把一次成功执行写入配额账本和任务耗时模型。"""
+        quota_ledger.record(user_id, task_name)
+        task_duration_model.record(task_name, seconds)
+
+    def _run_task(self, browser, user_id, original_task_name, unique_task_name, script_instances, lease) -> dict:
+        """执行单个任务并返回其最终状态。任务超时被看门狗回收时返回TIMEOUT状态，被停止时返回CANCELLED状态。"""
+        project_name_inferred = original_task_name.split('_task_')[0].capitalize()
+        project_class = self.projects_map.get(project_name_inferred)
+
+        # 立即将状态设置为执行中并更新UI
+        task_details = {
+            'task_name': unique_task_name, # 直接使用唯一名称作为任务名
+            'status': 'EXECUTING',
+            'details': '任务正在执行...',
+            'timestamp': datetime.now().isoformat(timespec='milliseconds')
+        }
+        self._publish_task_status(user_id, task_details)
+        task_details = dict(task_details)
+
+        timeout = self._get_task_attr(original_task_name, '_task_timeout', AppConfig.DEFAULT_TASK_TIMEOUT)
+        self.watchdog.begin(lease, unique_task_name, timeout)
+        started = time.monotonic()
+        cdp_started = CdpCounter.thread_count()
+        wait_saved_started = AntiSybilDpUtil.thread_wait_saved()
+        try:
+            if not project_class:
+                task_details['status'] = "FAILURE"
+                task_details['details'] = f"无法从任务名 '{original_task_name}' 推断出有效的项目类。"
+            else:
+                if project_name_inferred not in script_instances:
+                    script_instances[project_name_inferred] = project_class(browser=browser, user_id=user_id)
+
+                script_instance = script_instances[project_name_inferred]
+                # 注意：调用方法时仍使用原始名称
+                task_method = getattr(script_instance, original_task_name)
+                task_return_value = task_method()
+
+                if isinstance(task_return_value, str):
+                    task_details['status'] = "FAILURE"
+                    task_details['details'] = task_return_value
                 else:
-                    raise Exception("排列窗口后未能获取页面，无法注入补丁。")
+                    task_details['status'] = "SUCCESS"
+                    task_details['details'] = "任务成功完成。"
+                    self._record_success(user_id, original_task_name, time.monotonic() - started)
 
+        except TaskCancelledError:
+            task_details['status'] = "CANCELLED"
+            task_details['details'] = "任务已被停止。"
+            self.log.warn(user_id, f"任务 {unique_task_name} 已被取消。")
+
+        except Exception as e:
+            task_details['status'] = "FAILURE"
+            task_details['details'] = f"{e.__class__.__name__}: {e}" if str(e) else e.__class__.__name__
+            self.log.error(user_id, f"任务 {unique_task_name} 发生异常: {traceback.format_exc()}")
+
+        finally:
+            # 使用 finally 确保最终状态（成功或失败）一定会被更新
+            duration = time.monotonic() - started
+            self.run_stats.add_task_time(lease.slot_id, duration)
+            if self._count_cdp:
+                self.run_stats.incr('cdp_messages', CdpCounter.thread_count() - cdp_started)
+            self._record_wait_saved(original_task_name, AntiSybilDpUtil.thread_wait_saved() - wait_saved_started)
+            in_time = self.watchdog.end(lease)
+            if self.adaptive_controller:
+                self.adaptive_controller.record_task(original_task_name, duration,
+                                                     not in_time or self._is_timeout_failure(task_details))
+            if in_time:
+                self._close_stray_tabs(browser, user_id)
+                task_details['timestamp'] = datetime.now().isoformat(timespec='milliseconds')
+                self._publish_task_status(user_id, task_details)
+            else:
+                # 看门狗已将该任务标记为TIMEOUT并回收了槽位，不再覆盖其状态
+                task_details['status'] = 'TIMEOUT'
+
+        return task_details
+
+    def _record_wait_saved(self, task_name, seconds):
+        """按任务累计就绪等待相对固定等待节省的时间（计数器名带任务名，多进程调度时随统计快照合并）。"""
+        if not seconds:
+            return
+        self.run_stats.incr(f'wait_saved_ms:{task_name}', round(seconds * 1000))
+        self.run_stats.incr(f'wait_saved_runs:{task_name}')
+
+    def _log_wait_saved(self, counters):
+        for name, saved_ms in sorted(counters.items()):
+            if not name.startswith('wait_saved_ms:'):
+                continue
+            task_name = name.split(':', 1)[1]
+            runs = counters.get(f'wait_saved_runs:{task_name}', 0)
+            if runs:
+                self.log.info("调度器", f"就绪等待：{task_name} 执行 {runs} 次，平均每次比固定等待节省 "
+                                       f"{saved_ms / runs / 1000:.1f} 秒，共节省 {saved_ms / 1000:.1f} 秒。")
+
+    def _log_selector_strategies(self, before):
+        """汇总本次运行中查找过钱包选项的站点：记住的策略及本次命中/未命中次数（多进程调度时子进程的记录已回放到主进程）。"""
+        report = {}
+        for domain, entry in selector_strategy_memo.summary().items():
+            previous = before.get(domain, {})
+            hits = entry['hits'] - previous.get('hits', 0)
+            misses = entry['misses'] - previous.get('misses', 0)
+            if domain in before and not hits and not misses and entry['strategy'] == previous.get('strategy'):
+                continue
+            report[domain] = {'strategy': entry['strategy'], 'hits': hits, 'misses': misses}
+            self.log.info("调度器", f"查找策略：{domain} 记住 '{entry['strategy'] or '-'}'，"
+                                   f"本次命中 {hits} 次，未命中 {misses} 次。")
+        if report:
+            message_store.put('stats', 'selector_strategies', report)
+
+    @staticmethod
+    def _is_timeout_failure(task_details) -> bool:
+        """任务失败原因是否为等待超时（元素查找、页面加载等），用于自适应并发判断主机是否过载。"""
+        if task_details['status'] != 'FAILURE':
+            return False
+        details = str(task_details.get('details') or '')
+        return '超时' in details or 'timeout' in details.lower()
+
+    def _release_lease(self, lease, failed=False):
+        """关闭浏览器并归还槽位。同一个凭证只会被归还一次（工作线程与看门狗之间先到先得）。"""
+        if not lease.try_release():
+            return False
+
+        user_id = lease.user_id
+        try:
+            if self.task_queue:
+                self._finish_queue_browser(user_id, failed=failed)
+
+            browser = lease.browser
+            if self.memory_governor:
+                self._log_memory_report(user_id)
+            if browser:
+                self._collect_tab_stats(browser, user_id, lease.reclaimed)
+                try:
+                    browser.quit(force=lease.reclaimed)
+                except Exception as e:
+                    self.log.error(user_id, f"关闭浏览器 {browser.address} 时发生异常: {e}", exc_info=True)
+        finally:
+            self.run_stats.slot_released(lease.slot_id)
+            self.free_slots.put(lease.slot_id)
+            self.concurrency_semaphore.release()
+            with self._leases_cond:
+                self._active_leases.discard(lease)
+                self._leases_cond.notify_all()
+            self.log.info(user_id, "信号量已成功释放。")
+        return True
+
+    def _close_stray_tabs(self, browser, user_id):
+        """任务结束后关闭残留页面，并把标签页数量压到上限以内。"""
+        try:
+            TabManager.for_browser(browser).close_strays()
+        except Exception as e:
+            self.log.warn(user_id, f"清理残留标签页失败: {e}")
+
+    def _collect_tab_stats(self, browser, user_id, reclaimed=False):
+        """把该浏览器的标签页轮询次数、钱包弹窗检测延迟和标签页池统计汇总进运行统计。"""
+        for name, value in TabRegistry.pop_stats(browser).items():
+            self.run_stats.incr(name, round(value))
+        if self.memory_governor:
+            self.memory_governor.release(browser)
+
+        if reclaimed:
+            # 被看门狗回收的浏览器可能已无响应，不再向它查询内存
+            TabManager.discard(browser)
+        else:
+            try:
+                tab_stats = TabManager.release_browser(browser)
             except Exception as e:
-                self.log.error(user_id, f"排列窗口或注入补丁失败: {e}", exc_info=True)
-                return # 关键步骤失败，中止该worker
+                self.log.warn(user_id, f"读取标签页统计失败: {e}")
+                tab_stats = {}
+            if tab_stats:
+                for name in ('opened', 'reused', 'evicted', 'strays_closed', 'recycled'):
+                    self.run_stats.incr(f'tabs_{name}', tab_stats[name])
+                self.log.info(user_id, f"标签页: 新建 {tab_stats['opened']}，复用 {tab_stats['reused']}，"
+                                       f"淘汰 {tab_stats['evicted']}，关闭残留 {tab_stats['strays_closed']}，"
+                                       f"峰值 {tab_stats['peak_tabs']} 个，关闭前 {tab_stats['open_tabs']} 个，"
+                                       f"JS堆 {tab_stats['js_heap_mb']} MB。")
+        TabRegistry.release(browser)
+
+    def _govern_memory(self, browser, user_id, lease, script_instances):
+        """
+        两个任务之间检查浏览器内存，超出预算时回收标签页或重启浏览器。
+        返回之后使用的浏览器对象；重启失败时返回None，剩余任务无法继续。
+        """
+        if not self.memory_governor:
+            return browser
 
+        action = self.memory_governor.check(browser, user_id)
+        self.run_stats.incr('memory_samples')
+        if action == BrowserMemoryGovernor.ACTION_RECYCLE_TABS:
+            self.run_stats.incr('memory_tab_recycles')
             try:
-                okx_util = OKXWalletUtil()
-                okx_util.open_and_unlock_drission(browser, user_id)
+                TabManager.for_browser(browser).recycle()
+            except TaskCancelledError:
+                raise
             except Exception as e:
-                self.log.error(user_id, f"钱包初始化解锁失败，任务序列中止: {e}", exc_info=True)
+                self.log.warn(user_id, f"回收标签页失败: {e}")
+        elif action == BrowserMemoryGovernor.ACTION_RESTART:
+            self.run_stats.incr('memory_browser_restarts')
+            # 项目脚本实例持有旧浏览器及其标签页池，重启后需要重新创建
+            script_instances.clear()
+            browser = self._restart_browser(browser, user_id, lease)
+        return browser
+
+    def _restart_browser(self, browser, user_id, lease):
+        """关闭并重新启动浏览器，重新排列窗口、注入补丁并解锁钱包。任何一步失败都返回None。"""
+        self.log.info(user_id, "正在重启浏览器以释放内存...")
+        self._collect_tab_stats(browser, user_id)
+        self._stop_browser(browser, user_id)
+
+        browser = AdsBrowserUtil.start_browser_if_not_running(user_id, self.prelauncher.headless)
+        # 看门狗回收槽位时关闭的是凭证上的浏览器，必须先更新
+        lease.browser = browser
+        if not browser:
+            self.log.error(user_id, "重启浏览器失败，剩余任务无法继续。")
+            return None
+        if not self._prepare_browser(browser, user_id, lease):
+            self.log.error(user_id, "重启后准备浏览器失败，关闭新浏览器，剩余任务无法继续。")
+            # 准备阶段已为新浏览器创建了标签页注册表和标签页池，一并移除（不再向它发送CDP请求）
+            self._collect_tab_stats(browser, user_id, reclaimed=True)
+            if not lease.reclaimed:
+                # 准备超时时看门狗已经关闭了它；否则在这里关闭，归还槽位时不再重复处理
+                lease.browser = None
+                self._stop_browser(browser, user_id)
+            return None
+        return browser
+
+    def _stop_browser(self, browser, user_id):
+        """通过 AdsPower 关闭浏览器，失败时直接关闭 DrissionPage 连接的浏览器。"""
+        if not AdsBrowserUtil.stop_browser(user_id):
+            try:
+                browser.quit()
+            except Exception as e:
+                self.log.warn(user_id, f"关闭浏览器 {browser.address} 时发生异常: {e}")
+
+    def _log_memory_report(self, user_id):
+        report = self.memory_governor.browser_report(user_id)
+        if report:
+            rss = '-' if report['peak_rss_mb'] is None else report['peak_rss_mb']
+            self.log.info(user_id, f"内存: 采样 {report['samples']} 次，峰值JS堆 {report['peak_js_heap_mb']} MB，"
+                                   f"峰值DOM节点 {report['peak_dom_nodes']}，峰值文档 {report['peak_documents']}，"
+                                   f"峰值进程内存 {rss} MB，回收标签页 {report['tab_recycles']} 次，"
+                                   f"重启浏览器 {report['browser_restarts']} 次。")
+
+    def _on_watchdog_timeout(self, lease, task_name):
+        """看门狗回调：标记超时、强制关闭浏览器连接并把槽位还给调度器。"""
+        user_id = lease.user_id
+        self.run_stats.incr('stuck_slots_reclaimed')
+        if task_name:
+            self.run_stats.incr('timeout_units')
+            self.log.error(user_id, f"任务 {task_name} 执行超时，看门狗正在回收槽位 {lease.slot_id}。")
+            self._publish_task_status(user_id, {
+                'task_name': task_name,
+                'status': 'TIMEOUT',
+                'details': '任务执行超时，已被看门狗强制终止。',
+                'timestamp': datetime.now().isoformat(timespec='milliseconds')
+            })
+        else:
+            self.log.error(user_id, f"浏览器准备阶段超时，看门狗正在回收槽位 {lease.slot_id}。")
+        # 让卡住的线程在下一次可取消等待时退出，而不是继续操作已关闭的浏览器
+        if lease.thread_ident:
+            CancelUtil.cancel_thread(lease.thread_ident)
+        self._release_lease(lease, failed=True)
+
+    def _worker(self, browser, assignment, user_id, lease):
+        """包含原BrowserWorker核心逻辑的工作函数，由线程池执行（工作包模式）。"""
+        try:
+            if not self._prepare_browser(browser, user_id, lease):
                 return
 
             script_instances = {}
             task_execution_counts = Counter()
+            ran_task = False
             for task in assignment:
                 if self.interrupt_event.is_set():
                     self.log.warn(user_id, "检测到中断信号，任务序列已中止。")
                     break
 
                 original_task_name = task.get("task_name")
-                
-                # 按照前端的规则，为同一个任务的多次执行创建唯一键 (e.g., task_name_0, task_name_1)
-                execution_index = task_execution_counts[original_task_name]
-                unique_task_name = f"{original_task_name}_{execution_index}"
+                unique_task_name = task.get("unique_task_name")
+                if not unique_task_name:
+                    execution_index = task_execution_counts[original_task_name]
+                    unique_task_name = f"{original_task_name}_{execution_index}"
                 task_execution_counts[original_task_name] += 1
 
-                project_name_inferred = original_task_name.split('_task_')[0].capitalize()
-                project_class = self.projects_map.get(project_name_inferred)
-
-                # 立即将状态设置为执行中并更新UI
-                task_details = {
-                    'task_name': unique_task_name, # 直接使用唯一名称作为任务名
-                    'status': 'EXECUTING',
-                    'details': '任务正在执行...',
-                    'timestamp': datetime.now().isoformat(timespec='milliseconds')
-                }
-                current_browser_tasks = message_store.getByTopicAndKey('tasks', user_id) or {}
-                current_browser_tasks[unique_task_name] = task_details
-                message_store.put('tasks', user_id, current_browser_tasks)
+                if ran_task:
+                    browser = self._govern_memory(browser, user_id, lease, script_instances)
+                    if browser is None:
+                        break
+                ran_task = True
+                task_details = self._run_task(browser, user_id, original_task_name, unique_task_name,
+                                              script_instances, lease)
+                if task_details['status'] in ('TIMEOUT', 'CANCELLED'):
+                    # 浏览器已被看门狗关闭或运行已停止，剩余任务无法继续
+                    break
 
-                try:
-                    if not project_class:
-                        task_details['status'] = "FAILURE"
-                        task_details['details'] = f"无法从任务名 '{original_task_name}' 推断出有效的项目类。"
-                    else:
-                        if project_name_inferred not in script_instances:
-                            script_instances[project_name_inferred] = project_class(browser=browser, user_id=user_id)
+        except Exception as e:
+            self.log.error(user_id, f"处理工作包时发生严重错误: {e}", exc_info=True)
+        finally:
+            self._release_lease(lease)
 
-                        script_instance = script_instances[project_name_inferred]
-                        # 注意：调用方法时仍使用原始名称
-                        task_method = getattr(script_instance, original_task_name)
-                        task_return_value = task_method()
+    def _queue_worker(self, browser, user_id, lease):
+        """任务队列模式的工作函数：持续领取当前浏览器的任务单元，直到该浏览器没有待执行的任务。"""
+        prepared = False
+        try:
+            prepared = self._prepare_browser(browser, user_id, lease)
+            if not prepared:
+                return
 
-                        if isinstance(task_return_value, str):
-                            task_details['status'] = "FAILURE"
-                            task_details['details'] = task_return_value
-                        else:
-                            task_details['status'] = "SUCCESS"
-                            task_details['details'] = "任务成功完成。"
+            script_instances = {}
+            while not self.interrupt_event.is_set():
+                unit = self.task_queue.next_unit(user_id)
+                if unit is None:
+                    break
 
-                except Exception as e:
-                    task_details['status'] = "FAILURE"
-                    task_details['details'] = f"{e.__class__.__name__}: {e}" if str(e) else e.__class__.__name__
-                    self.log.error(user_id, f"任务 {unique_task_name} 发生异常: {traceback.format_exc()}")
+                task_details = self._run_task(browser, user_id, unit.task_name, unit.unique_task_name,
+                                              script_instances, lease)
+                if task_details['status'] in ('TIMEOUT', 'CANCELLED'):
+                    prepared = False
+                    break
+                if task_details['status'] == 'FAILURE' and self.task_queue.requeue(unit):
+                    self.run_stats.incr('requeued_units')
+                    self.log.warn(user_id, f"任务 {unit.unique_task_name} 失败，已重新排队（第 {unit.attempts} 次重试）。")
+                if self.task_queue.has_pending(user_id) and not self.interrupt_event.is_set():
+                    browser = self._govern_memory(browser, user_id, lease, script_instances)
+                    if browser is None:
+                        prepared = False
+                        break
 
-                finally:
-                    # 使用 finally 确保最终状态（成功或失败）一定会被更新
-                    task_details['timestamp'] = datetime.now().isoformat(timespec='milliseconds')
-                    current_browser_tasks = message_store.getByTopicAndKey('tasks', user_id) or {}
-                    current_browser_tasks[unique_task_name] = task_details
-                    message_store.put('tasks', user_id, current_browser_tasks)
+            if self.interrupt_event.is_set():
+                self.log.warn(user_id, "检测到中断信号，任务序列已中止。")
 
         except Exception as e:
-            self.log.error(user_id, f"处理工作包时发生严重错误: {e}", exc_info=True)
+            self.log.error(user_id, f"处理任务队列时发生严重错误: {e}", exc_info=True)
         finally:
-            if browser:
-                try:
-                    browser.quit()
-                except Exception as e:
-                    self.log.error(user_id, f"关闭浏览器 {browser.address} 时发生异常: {e}", exc_info=True)
-
-            self.concurrency_semaphore.release()
-            self.log.info(user_id, "信号量已成功释放。")
+            self._release_lease(lease, failed=not prepared)
+
+    def _finish_queue_browser(self, user_id, failed):
+        """在任务队列中释放浏览器；被丢弃的任务单元直接标记为失败。"""
+        for unit in self.task_queue.release_browser(user_id, failed=failed):
+            self._publish_task_status(user_id, {
+                'task_name': unit.unique_task_name,
+                'status': 'FAILURE',
+                'details': '浏览器准备、钱包解锁或任务执行多次失败，任务未执行。',
+                'timestamp': datetime.now().isoformat(timespec='milliseconds')
+            })
 
     def shutdown(self):
         """设置中断事件并清空待处理任务以停止所有工作。"""
         self.log.info("调度器", "接收到关闭信号，正在终止所有任务...")
+        if self._stop_requested_at is None:
+            self._stop_requested_at = time.monotonic()
         self.interrupt_event.set()
         self.log.info("调度器", "清空所有待执行的任务分配。")
         self.job_list.clear()
+        if self.task_queue:
+            self.task_queue.clear()
+        if self.prelauncher:
+            self.prelauncher.shutdown()
 
     def execute(self):
         """Dispatcher's main execution method."""
         self.log.info("调度器", "开始生成工作分配...")
         self._generate_job_list()
 
+        if self.journal:
+            units = [(job['user_id'], task['unique_task_name'], task['task_name'])
+                     for job in self.job_list for task in job['tasks_to_run']]
+            self.journal.start(self.sequence, self.concurrent_browsers, units,
+                               mode=self.run_mode, parent_run_id=self.parent_run_id, options=self._run_options())
+            self.log.info("调度器", f"运行日志已创建: {self.journal.path}")
+        self._publish_skipped_units()
+
         if not self.job_list:
             self.log.warn("调度器", "没有生成任何有效的工作任务，调度中止。")
+            if self.journal:
+                self.journal.close()
             message_store.put('signals', 'completion', {'status': 'ALL_TASKS_COMPLETED'})
             return
 
+        strategies_before = selector_strategy_memo.summary()
+        self.run_stats.start()
+        self._run_workers()
+
+        if self._stop_requested_at is not None:
+            # 停止延迟：从收到停止信号到所有槽位归还（浏览器全部关闭）的时间
+            stop_latency = time.monotonic() - self._stop_requested_at
+            self.run_stats.set_gauge('stop_latency_seconds', round(stop_latency, 1))
+            self.log.info("调度器", f"运行已停止，停止耗时 {stop_latency:.1f} 秒。")
+
+        counters = self.run_stats.snapshot()['counters']
+        if self.total_task_count and 'tab_polls' in counters:
+            self.run_stats.set_gauge('tab_polls_per_task', round(counters['tab_polls'] / self.total_task_count, 2))
+        if counters.get('popup_detections'):
+            self.run_stats.set_gauge('popup_detect_avg_ms',
+                                     round(counters.get('popup_detect_ms', 0) / counters['popup_detections']))
+        if self.total_task_count and 'cdp_messages' in counters:
+            self.run_stats.set_gauge('cdp_messages_per_task', round(counters['cdp_messages'] / self.total_task_count, 1))
+        memory_report = self.memory_governor.report() if self.memory_governor else {}
+        if memory_report:
+            # 每个浏览器的内存采样汇总（多进程调度时由各子进程在浏览器关闭时写入日志）
+            message_store.put('stats', 'memory', memory_report)
+            self.run_stats.set_gauge('memory_peak_js_heap_mb',
+                                     max(entry['peak_js_heap_mb'] for entry in memory_report.values()))
+            self.run_stats.set_gauge('memory_peak_dom_nodes',
+                                     max(entry['peak_dom_nodes'] for entry in memory_report.values()))
+            rss_peaks = [entry['peak_rss_mb'] for entry in memory_report.values() if entry['peak_rss_mb'] is not None]
+            if rss_peaks:
+                self.run_stats.set_gauge('memory_peak_rss_mb', max(rss_peaks))
+
+        if self.journal:
+            self.journal.close()
+        self.run_stats.finish()
+        stats = self.run_stats.snapshot()
+        self.log.info("调度器", f"运行结束，总耗时 {stats['makespan_seconds']} 秒，"
+                               f"槽位利用率 {stats['slot_utilization']:.1%}，槽位占用率 {stats['slot_occupancy']:.1%}。")
+        if 'tab_polls_per_task' in stats['gauges'] or 'popup_detect_avg_ms' in stats['gauges']:
+            self.log.info("调度器", f"钱包弹窗检测：每个任务平均标签页轮询 {stats['gauges'].get('tab_polls_per_task', 0)} 次，"
+                                   f"平均检测延迟 {stats['gauges'].get('popup_detect_avg_ms', '-')} 毫秒"
+                                   f"（{'事件驱动' if AppConfig.TAB_REGISTRY_ENABLED else '轮询'}）。")
+        if 'cdp_messages_per_task' in stats['gauges']:
+            self.log.info("调度器", f"CDP消息：每个任务平均 {stats['gauges']['cdp_messages_per_task']} 条"
+                                   f"（批量页面探测{'开启' if AppConfig.DOM_PROBE_ENABLED else '关闭'}）。")
+        self._log_wait_saved(stats['counters'])
+        if stats['counters'].get('memory_samples'):
+            self.log.info("调度器", f"内存管控：采样 {stats['counters']['memory_samples']} 次，"
+                                   f"回收标签页 {stats['counters'].get('memory_tab_recycles', 0)} 次，"
+                                   f"重启浏览器 {stats['counters'].get('memory_browser_restarts', 0)} 次，"
+                                   f"峰值JS堆 {stats['gauges'].get('memory_peak_js_heap_mb', '-')} MB，"
+                                   f"峰值进程内存 {stats['gauges'].get('memory_peak_rss_mb', '-')} MB。")
+        self._log_selector_strategies(strategies_before)
+        if any(name.startswith('session_cache_') for name in stats['counters']):
+            self.log.info("调度器", f"会话缓存：命中 {stats['counters'].get('session_cache_hits', 0)} 次，"
+                                   f"未命中 {stats['counters'].get('session_cache_misses', 0)} 次，"
+                                   f"探测失效 {stats['counters'].get('session_cache_stale', 0)} 次。")
+        message_store.put('signals', 'completion', {'status': 'ALL_TASKS_COMPLETED'})
+
+    def _run_workers(self):
+        """在本进程的线程池中执行 job_list 中的所有工作，直到所有槽位归还。"""
+        session_before = session_state_cache.summary()
+        if self.prelauncher.depth:
+            self.log.info("调度器", f"已启用浏览器预启动流水线，预启动深度: {self.prelauncher.depth}")
+
+        self.watchdog.start()
+        if self.adaptive_controller:
+            self.adaptive_controller.start()
+        if self.scheduler_mode == self.SCHEDULER_TASK_QUEUE:
+            self.log.info("调度器", "使用任务队列调度模式。")
+            futures = self._dispatch_task_queue()
+        else:
+            futures = self._dispatch_packages()
+
+        self.prelauncher.shutdown()
+
+        # 等待所有槽位归还；被看门狗回收的卡死线程不再等待
+        with self._leases_cond:
+            while self._active_leases:
+                self._leases_cond.wait()
+        self.watchdog.stop()
+        if self.adaptive_controller:
+            self.adaptive_controller.stop()
+
+        self.executor.shutdown(wait=False)
+
+        # 会话缓存的计数在执行任务的进程中累加，计入运行统计后多进程调度时可以跨子进程合并
+        for name, value in session_state_cache.summary().items():
+            delta = value - session_before.get(name, 0)
+            if delta:
+                self.run_stats.incr(f'session_cache_{name}', delta)
+
+    def _submit_worker(self, user_id, worker, *args):
+        """在已获得信号量的前提下领取浏览器并提交工作线程。失败时归还信号量并返回None。"""
+        try:
+            browser = self.prelauncher.acquire(user_id)
+            if not browser:
+                self.log.error("调度器", f"获取浏览器实例 {user_id} 失败，跳过。")
+                self.concurrency_semaphore.release()
+                return None
+
+            slot_id = self.free_slots.get()
+            lease = WorkerLease(slot_id, user_id, browser)
+            with self._leases_cond:
+                self._active_leases.add(lease)
+            self.run_stats.slot_acquired(slot_id)
+            return self.executor.submit(worker, browser, *args, user_id, lease)
+
+        except Exception as e:
+            self.log.error(f"调度器", f"在主调度循环中处理 {user_id} 时发生严重错误: {e}", exc_info=True)
+            self.concurrency_semaphore.release()
+            return None
+
+    def _dispatch_packages(self):
+        """工作包模式：每个工作线程领取一个浏览器的完整任务列表。"""
         futures = []
-        for job in self.job_list:
+        # 遍历快照，shutdown() 清空 job_list 时不影响当前迭代
+        jobs = list(self.job_list)
+        for index, job in enumerate(jobs):
             if self.interrupt_event.is_set():
                 self.log.info("调度器", "在分发任务前检测到中断信号，主调度循环终止。")
                 break
 
+            # 在等待空闲槽位之前，先让接下来的K个浏览器在后台启动
+            self.prelauncher.prefetch(j['user_id'] for j in jobs[index:index + self.prelauncher.depth])
+
             self.concurrency_semaphore.acquire()
-            
-            user_id = job['user_id']
-            assignment = job['tasks_to_run']
-            
-            try:
-                browser = AdsBrowserUtil.start_browser_if_not_running(user_id)
-                if not browser:
-                    self.log.error("调度器", f"获取浏览器实例 {user_id} 失败，跳过。")
-                    self.concurrency_semaphore.release()
-                    continue
+            if self.interrupt_event.is_set():
+                self.concurrency_semaphore.release()
+                break
 
-                future = self.executor.submit(self._worker, browser, assignment, user_id)
+            future = self._submit_worker(job['user_id'], self._worker, job['tasks_to_run'])
+            if future:
                 futures.append(future)
 
-            except Exception as e:
-                self.log.error(f"调度器", f"在主调度循环中处理 {user_id} 时发生严重错误: {e}", exc_info=True)
+        return futures
+
+    def _dispatch_task_queue(self):
+        """任务队列模式：工作线程按浏览器亲和性从共享队列中领取(浏览器, 任务)单元。"""
+        self.task_queue = TaskQueue(self.job_list, requeue_limit=AppConfig.TASK_REQUEUE_LIMIT)
+        futures = []
+        while not self.interrupt_event.is_set():
+            self.prelauncher.prefetch(self.task_queue.peek_browsers(self.prelauncher.depth))
+
+            self.concurrency_semaphore.acquire()
+            user_id = self.task_queue.acquire_browser(self.interrupt_event)
+            if user_id is None:
                 self.concurrency_semaphore.release()
-                continue
+                break
 
-        if futures:
-            from concurrent.futures import wait
-            wait(futures)
+            future = self._submit_worker(user_id, self._queue_worker)
+            if future:
+                futures.append(future)
+            else:
+                self._finish_queue_browser(user_id, failed=True)
 
-        self.executor.shutdown(wait=True)
-        message_store.put('signals', 'completion', {'status': 'ALL_TASKS_COMPLETED'})
\ No newline at end of file
+        if self.interrupt_event.is_set():
+            self.log.info("调度器", "检测到中断信号，任务队列调度循环终止。")
+        return futures
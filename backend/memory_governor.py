@@ -0,0 +1,200 @@
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+from config import AppConfig
+from util.log_util import log_util
+from util.tab_registry import TabRegistry
+
+
+@dataclass
+class MemorySample:
+    """一次采样的结果：所有普通页面的合计值，以及浏览器进程树的常驻内存（不可用时为None）。"""
+    tabs: int = 0
+    js_heap_mb: float = 0.0
+    dom_nodes: int = 0
+    documents: int = 0
+    rss_mb: float = None
+
+
+class BrowserMemoryGovernor:
+    """
+    浏览器内存管控。
+    长时间连续执行多个任务时，浏览器的页面内存会不断上涨，直到页面变慢、元素查找开始超时。
+    调度器在同一浏览器的两个任务之间调用 check：通过CDP Performance.getMetrics 采样每个普通页面的
+    JS堆（JSHeapUsedSize）、DOM节点数（Nodes）和文档数（Documents），并在安装了 psutil 时采样浏览器
+    进程树的常驻内存。JS堆或DOM节点超出预算时建议回收标签页；回收后下一次采样仍超出，或进程内存超出预算时
+    建议重启浏览器。每个浏览器的峰值和处理次数汇总为本次运行的内存报告。
+    """
+    ACTION_OK = 'ok'
+    ACTION_RECYCLE_TABS = 'recycle_tabs'
+    ACTION_RESTART = 'restart'
+
+    _psutil_warned = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._report = {}  # user_id -> 该浏览器的采样汇总
+        self._recycled = set()  # 上一次处理为回收标签页、尚未恢复到预算以内的 user_id
+        self._metrics_enabled = {}  # browser.address -> 已执行过 Performance.enable 且仍打开的 tab_id
+
+    def check(self, browser, user_id: str) -> str:
+        """采样并返回建议的处理方式（ACTION_*）。采样失败时返回 ACTION_OK。"""
+        try:
+            sample = self.sample(browser)
+        except Exception as e:
+            log_util.warn(user_id, f"浏览器内存采样失败: {e}")
+            return self.ACTION_OK
+
+        action = self.decide(user_id, sample)
+        self._record(user_id, sample, action)
+        if action != self.ACTION_OK:
+            rss = '-' if sample.rss_mb is None else sample.rss_mb
+            log_util.warn(user_id, f"浏览器内存超出预算（{sample.tabs} 个页面，JS堆 {sample.js_heap_mb} MB，"
+                                   f"DOM节点 {sample.dom_nodes}，文档 {sample.documents}，进程内存 {rss} MB），"
+                                   f"{'回收标签页' if action == self.ACTION_RECYCLE_TABS else '重启浏览器'}。")
+        return action
+
+    def sample(self, browser) -> MemorySample:
+        """采样浏览器所有普通页面的性能指标和进程树内存。"""
+        sample = MemorySample()
+        tab_ids = list(TabRegistry.for_browser(browser).page_targets())
+        with self._lock:
+            # 只保留仍然打开的页面，已关闭页面的记录随之丢弃
+            enabled = self._metrics_enabled.get(browser.address, set()) & set(tab_ids)
+            self._metrics_enabled[browser.address] = enabled
+        for tab_id in tab_ids:
+            try:
+                metrics = self._tab_metrics(browser.get_tab(tab_id), enabled)
+            except Exception:
+                continue  # 页面可能刚被关闭
+            sample.tabs += 1
+            sample.js_heap_mb += metrics.get('JSHeapUsedSize', 0) / 1024 / 1024
+            sample.dom_nodes += int(metrics.get('Nodes', 0))
+            sample.documents += int(metrics.get('Documents', 0))
+        sample.js_heap_mb = round(sample.js_heap_mb, 1)
+        sample.rss_mb = self._process_rss_mb(browser)
+        return sample
+
+    def decide(self, user_id: str, sample: MemorySample) -> str:
+        """根据预算判断处理方式。"""
+        if sample.rss_mb is not None and sample.rss_mb > AppConfig.MEMORY_RSS_BUDGET_MB:
+            return self.ACTION_RESTART
+        over_budget = (sample.js_heap_mb > AppConfig.MEMORY_JS_HEAP_BUDGET_MB
+                       or sample.dom_nodes > AppConfig.MEMORY_DOM_NODES_BUDGET)
+        with self._lock:
+            if not over_budget:
+                self._recycled.discard(user_id)
+                return self.ACTION_OK
+            if user_id in self._recycled:
+                # 回收标签页后仍超出预算，说明内存不在页面本身（扩展、后台页等），只能重启浏览器
+                return self.ACTION_RESTART
+            return self.ACTION_RECYCLE_TABS
+
+    def _record(self, user_id, sample, action):
+        with self._lock:
+            entry = self._report.setdefault(user_id, {
+                'samples': 0, 'peak_js_heap_mb': 0.0, 'peak_dom_nodes': 0, 'peak_documents': 0,
+                'peak_rss_mb': None, 'tab_recycles': 0, 'browser_restarts': 0,
+            })
+            entry['samples'] += 1
+            entry['peak_js_heap_mb'] = max(entry['peak_js_heap_mb'], sample.js_heap_mb)
+            entry['peak_dom_nodes'] = max(entry['peak_dom_nodes'], sample.dom_nodes)
+            entry['peak_documents'] = max(entry['peak_documents'], sample.documents)
+            if sample.rss_mb is not None:
+                entry['peak_rss_mb'] = max(entry['peak_rss_mb'] or 0.0, sample.rss_mb)
+            if action == self.ACTION_RECYCLE_TABS:
+                entry['tab_recycles'] += 1
+                self._recycled.add(user_id)
+            elif action == self.ACTION_RESTART:
+                entry['browser_restarts'] += 1
+                self._recycled.discard(user_id)
+
+    def release(self, browser):
+        """浏览器关闭或重启前调用，丢弃它的页面记录。"""
+        with self._lock:
+            self._metrics_enabled.pop(browser.address, None)
+
+    def browser_report(self, user_id: str) -> dict:
+        """指定浏览器的采样汇总，没有采样时返回空字典。"""
+        with self._lock:
+            return dict(self._report.get(user_id, {}))
+
+    def report(self) -> dict:
+        """本次运行所有浏览器的内存报告：{user_id: 采样汇总}。"""
+        with self._lock:
+            return {user_id: dict(entry) for user_id, entry in self._report.items()}
+
+    @staticmethod
+    def _tab_metrics(tab, enabled: set) -> dict:
+        if tab.tab_id not in enabled:
+            tab.run_cdp('Performance.enable')
+            enabled.add(tab.tab_id)
+        result = tab.run_cdp('Performance.getMetrics')
+        return {metric['name']: metric['value'] for metric in result.get('metrics', [])}
+
+    @staticmethod
+    def _process_rss_mb(browser) -> float:
+        """
+        浏览器主进程及其所有子进程（渲染、GPU、扩展进程）的常驻内存之和（MB）。
+        安装了 psutil 时使用 psutil；否则 Linux 读取 /proc，其他平台返回None。无法获取进程号时也返回None。
+        """
+        try:
+            pid = browser.process_id
+        except Exception:
+            return None
+        if not pid:
+            return None
+
+        try:
+            import psutil
+        except ImportError:
+            psutil = None
+        try:
+            if psutil is not None:
+                rss = BrowserMemoryGovernor._psutil_tree_rss(psutil, pid)
+            elif sys.platform.startswith('linux'):
+                rss = BrowserMemoryGovernor._proc_tree_rss(pid)
+            else:
+                if not BrowserMemoryGovernor._psutil_warned:
+                    BrowserMemoryGovernor._psutil_warned = True
+                    log_util.info("内存管控", "未安装 psutil，浏览器进程内存不参与采样，仅使用页面性能指标。")
+                return None
+        except Exception:
+            return None
+        return round(rss / 1024 / 1024, 1)
+
+    @staticmethod
+    def _psutil_tree_rss(psutil, pid) -> int:
+        root = psutil.Process(pid)
+        rss = root.memory_info().rss
+        for child in root.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                continue  # 子进程可能已退出
+        return rss
+
+    @staticmethod
+    def _proc_tree_rss(pid) -> int:
+        children = {}  # ppid -> [pid]
+        rss_pages = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat', 'r') as f:
+                    # 进程名可能包含空格和括号，从最后一个 ')' 之后再拆分字段
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue  # 进程可能已退出
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss_pages[int(entry)] = int(fields[21])
+
+        rss, stack = 0, [pid]
+        while stack:
+            current = stack.pop()
+            rss += rss_pages.get(current, 0)
+            stack.extend(children.get(current, []))
+        return rss * os.sysconf('SC_PAGE_SIZE')
@@ -5,6 +5,9 @@ class MessageStore:
     """
     一个单例的、线程安全的、基于主题的内存状态存储器。
     严格按照用户设计的API实现。
+    每个主题维护一个单调递增的版本号，每次写入（put/clear_topic）版本号加一并记录该key的修改版本，
+    调用方可以通过 changes_since 只拉取某个版本之后变化的key，或通过 subscribe 在写入时收到通知，
+    而不必每次深拷贝整个主题。
     """
     _instance = None
     _lock = threading.Lock()
@@ -16,6 +19,10 @@ class MessageStore:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
                     cls._instance._store = {}  # The actual data store is a dictionary
+                    cls._instance._versions = {}  # topic -> 当前版本号
+                    cls._instance._key_versions = {}  # topic -> {key: 最后一次修改时的版本号}
+                    cls._instance._cleared_at = {}  # topic -> 最后一次清空时的版本号
+                    cls._instance._subscribers = {}  # topic -> [callback]
         return cls._instance
 
     def put(self, topic: str, key: str, value: any):
@@ -27,6 +34,11 @@ class MessageStore:
             if topic not in self._store:
                 self._store[topic] = {}
             self._store[topic][key] = value
+            version = self._bump(topic)
+            self._key_versions.setdefault(topic, {})[key] = version
+            subscribers = list(self._subscribers.get(topic, ()))
+            snapshot = deepcopy(value) if subscribers else None
+        self._notify(subscribers, topic, key, snapshot, version)
 
     def getByTopic(self, topic: str) -> dict:
         """
@@ -52,6 +64,61 @@ class MessageStore:
         with self._lock:
             if topic in self._store:
                 self._store[topic].clear()
+            version = self._bump(topic)
+            self._key_versions.pop(topic, None)
+            self._cleared_at[topic] = version
+            subscribers = list(self._subscribers.get(topic, ()))
+        self._notify(subscribers, topic, None, None, version)
+
+    def version(self, topic: str) -> int:
+        """主题的当前版本号，从未写入过的主题为0。"""
+        with self._lock:
+            return self._versions.get(topic, 0)
+
+    def changes_since(self, topic: str, version: int) -> dict:
+        """
+        获取主题在 version 之后发生变化的key（值为深拷贝）。
+
+        :return: {'version': 当前版本号, 'reset': 是否在此期间被清空, 'changes': {key: value}}。
+                 reset 为True时调用方应丢弃本地副本，changes 此时包含清空之后写入的全部key。
+        """
+        with self._lock:
+            current = self._versions.get(topic, 0)
+            reset = version < self._cleared_at.get(topic, 0)
+            data = self._store.get(topic, {})
+            changes = {key: deepcopy(data[key])
+                       for key, key_version in self._key_versions.get(topic, {}).items()
+                       if key_version > version and key in data}
+            return {'version': current, 'reset': reset, 'changes': changes}
+
+    def subscribe(self, topic: str, callback):
+        """
+        订阅主题的写入通知：callback(topic, key, value, version)，value 为写入值的深拷贝；
+        主题被清空时 key 和 value 都为None。回调在写入线程中、锁外调用，不应执行耗时操作。
+        """
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+
+    def unsubscribe(self, topic: str, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(topic, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def _bump(self, topic: str) -> int:
+        version = self._versions.get(topic, 0) + 1
+        self._versions[topic] = version
+        return version
+
+    @staticmethod
+    def _notify(subscribers, topic, key, value, version):
+        for callback in subscribers:
+            try:
+                callback(topic, key, value, version)
+            except Exception as e:
+                # 延迟导入：log_util 的UI转发可能反过来依赖 message_store
+                from util.log_util import log_util
+                log_util.warn("消息存储", f"主题 {topic} 的订阅回调异常: {e}")
 
 # 导出的单例实例
 message_store = MessageStore()
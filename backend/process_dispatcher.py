@@ -0,0 +1,208 @@
+import math
+import multiprocessing
+import queue
+import threading
+from datetime import datetime
+
+from backend.adaptive_concurrency import ConcurrencyLimiter
+from backend.dispatcher import Dispatcher
+from backend.run_journal import RunJournal
+from config import AppConfig
+from util.log_util import log_util
+from util.selector_strategy_memo import selector_strategy_memo
+from util.session_state_cache import session_state_cache
+
+
+class ShardDispatcher(Dispatcher):
+    """
+    运行在子进程中的调度器，只负责分配给它的一部分浏览器和槽位。
+    任务状态、配额记录、查找策略备忘录和会话状态缓存的更新以及日志都不在子进程落地，
+    而是通过事件队列发回主进程，由主进程统一写盘，避免多个子进程互相覆盖同一个文件。
+    """
+
+    def __init__(self, shard_index, jobs, event_queue, **kwargs):
+        super().__init__(**kwargs)
+        self.shard_index = shard_index
+        self.event_queue = event_queue
+        self.job_list = jobs
+        self.total_task_count = sum(len(job['tasks_to_run']) for job in jobs)
+
+    def _publish_task_status(self, user_id, task_details):
+        self.event_queue.put(('status', user_id, task_details))
+
+    def _record_success(self, user_id, task_name, seconds):
+        self.event_queue.put(('success', user_id, task_name, seconds))
+
+    def run_shard(self):
+        self.log.info("调度器", f"工作进程 {self.shard_index} 启动，负责 {len(self.job_list)} 个浏览器，"
+                               f"槽位 {self.slot_ids}。")
+        self.run_stats.start()
+        self._run_workers()
+        self.run_stats.finish()
+
+
+def _shard_main(shard_index, jobs, options, event_queue, stop_event):
+    """子进程入口。项目类无法跨进程传递，因此在子进程中重新扫描项目目录。"""
+    log_util.set_forwarder(lambda full_message: event_queue.put(('log', full_message)))
+    selector_strategy_memo.set_forwarder(lambda *args: event_queue.put(('memo',) + args))
+    session_state_cache.set_forwarder(lambda operation, *args: event_queue.put(('session', operation) + args))
+    stats = None
+    try:
+        from backend.smart_controller import SmartController
+        controller = SmartController()
+        controller.discover_projects()
+
+        dispatcher = ShardDispatcher(shard_index, jobs, event_queue, projects_map=controller.projects_map,
+                                     interrupt_event=stop_event, **options)
+
+        def watch_stop():
+            stop_event.wait()
+            dispatcher.shutdown()
+
+        threading.Thread(target=watch_stop, name="ShardStopWatcher", daemon=True).start()
+        dispatcher.run_shard()
+        stats = dispatcher.run_stats.snapshot()
+    except Exception as e:
+        log_util.error("调度器", f"工作进程 {shard_index} 发生严重错误: {e}", exc_info=True)
+    finally:
+        event_queue.put(('done', shard_index, stats))
+
+
+class ProcessDispatcher(Dispatcher):
+    """
+    多进程调度器。
+    主进程负责生成工作计划、配额过滤、运行日志和任务状态表；浏览器工作线程按浏览器分片
+    运行在若干个子进程中（每个子进程内部仍是线程池调度），某个子进程死锁、内存暴涨或崩溃
+    只影响它负责的浏览器，且各子进程的CDP消息解析不再共享同一个GIL。
+    子进程的状态、配额记录、备忘录/缓存更新和日志通过 multiprocessing.Queue 发回，由主进程统一落地。
+    """
+
+    BACKEND = 'process'
+
+    def __init__(self, *args, process_count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prelaunch_count = kwargs.get('prelaunch_count')
+        self.process_count = process_count or math.ceil(self.concurrent_browsers / AppConfig.SLOTS_PER_PROCESS)
+        # 使用spawn启动方式，保证Windows与Linux下行为一致，且子进程不继承主进程的Qt与线程状态
+        self._mp_context = multiprocessing.get_context('spawn')
+        self._stop_event = self._mp_context.Event()
+        self._event_queue = self._mp_context.Queue()
+
+    def _init_worker_resources(self, max_slots, adaptive, min_browsers, prelaunch_count):
+        """主进程不运行浏览器工作线程：线程池、预启动流水线和看门狗都在子进程中创建，这里只保留并发上限用于估算。"""
+        self.concurrency_semaphore = ConcurrencyLimiter(max_slots)
+
+    def shutdown(self):
+        super().shutdown()
+        self._stop_event.set()
+
+    def _build_shards(self):
+        """
+        把槽位平均分给各子进程，再按预计耗时把浏览器贪心分配给当前负载（预计耗时/槽位数）最低的子进程。
+        """
+        process_count = max(1, min(self.process_count, self.concurrent_browsers, len(self.job_list)))
+        slot_groups = [list(range(self.concurrent_browsers))[i::process_count] for i in range(process_count)]
+        shards = [{'slot_ids': slot_ids, 'jobs': [], 'load': 0} for slot_ids in slot_groups]
+
+        # job_list 已按预计耗时降序排列
+        for job in self.job_list:
+            shard = min(shards, key=lambda s: s['load'] / len(s['slot_ids']))
+            shard['jobs'].append(job)
+            shard['load'] += job['expected_seconds']
+        return [shard for shard in shards if shard['jobs']]
+
+    def _shard_options(self, slot_ids):
+        min_browsers = None
+        if self.adaptive:
+            # 按槽位占比把最小并发数分摊到各子进程
+            min_browsers = max(1, (self.min_browsers or 1) * len(slot_ids) // self.concurrent_browsers)
+        return {
+            'sequence': [],
+            'concurrent_browsers': self.concurrent_browsers,
+            'prelaunch_count': self._prelaunch_count,
+            'scheduler_mode': self.scheduler_mode,
+            'adaptive': self.adaptive,
+            'min_browsers': min_browsers,
+            'slot_ids': slot_ids,
+            'headless': self.headless,
+        }
+
+    def _run_workers(self):
+        shards = self._build_shards()
+        processes = {}
+        for index, shard in enumerate(shards):
+            process = self._mp_context.Process(
+                target=_shard_main,
+                args=(index, shard['jobs'], self._shard_options(shard['slot_ids']), self._event_queue, self._stop_event),
+                name=f"DispatcherShard-{index}",
+                daemon=True,
+            )
+            process.start()
+            processes[index] = process
+        self.log.info("调度器", f"多进程调度已启动 {len(processes)} 个工作进程，共 {self.concurrent_browsers} 个槽位。")
+
+        pending = set(processes)
+        while pending:
+            try:
+                self._handle_event(self._event_queue.get(timeout=0.5), pending, shards)
+            except queue.Empty:
+                pass
+            # 每轮都检查子进程是否存活，日志持续到达时也能及时发现崩溃的子进程
+            dead = [index for index in pending if not processes[index].is_alive()]
+            if dead:
+                # 子进程退出前发出的事件可能仍在队列中，先处理完再判断它是否正常结束
+                self._drain_events(pending, shards)
+                for index in dead:
+                    if index in pending:
+                        pending.discard(index)
+                        self._fail_shard(index, shards[index], processes[index].exitcode)
+
+        for process in processes.values():
+            process.join(timeout=5)
+
+    def _drain_events(self, pending, shards):
+        while True:
+            try:
+                self._handle_event(self._event_queue.get(timeout=0.1), pending, shards)
+            except queue.Empty:
+                return
+
+    def _handle_event(self, event, pending, shards):
+        kind = event[0]
+        if kind == 'status':
+            _, user_id, task_details = event
+            self._publish_task_status(user_id, task_details)
+        elif kind == 'success':
+            _, user_id, task_name, seconds = event
+            Dispatcher._record_success(self, user_id, task_name, seconds)
+        elif kind == 'memo':
+            selector_strategy_memo.record(*event[1:])
+        elif kind == 'session':
+            _, operation, user_id, scope = event
+            session_state_cache.replay(operation, user_id, scope)
+        elif kind == 'log':
+            log_util.emit(event[1])
+        elif kind == 'done':
+            _, index, stats = event
+            pending.discard(index)
+            if stats:
+                self.run_stats.merge(stats)
+            else:
+                self._fail_shard(index, shards[index], None)
+
+    def _fail_shard(self, index, shard, exitcode):
+        """子进程异常退出时，把它负责但尚未结束的任务单元标记为失败。"""
+        self.run_stats.incr('crashed_processes')
+        self.log.error("调度器", f"工作进程 {index} 异常退出（退出码: {exitcode}），其未完成的任务将标记为失败。")
+        for job in shard['jobs']:
+            user_id = job['user_id']
+            for task in job['tasks_to_run']:
+                status = self.task_status.status(user_id, task['unique_task_name'])
+                if status in RunJournal.TERMINAL_STATUSES:
+                    continue
+                self._publish_task_status(user_id, {
+                    'task_name': task['unique_task_name'],
+                    'status': 'FAILURE',
+                    'details': f"工作进程异常退出（退出码: {exitcode}），任务未完成。",
+                    'timestamp': datetime.now().isoformat(timespec='milliseconds'),
+                })
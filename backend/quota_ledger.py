@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from config import AppConfig
+from util.log_util import log_util
+
+
+class QuotaLedger:
+    """
+    按(浏览器, 任务)记录成功执行时间的持久化账本，用于在启动浏览器之前判断任务配额是否已用完。
+    配额来自 task_annotation 附加的 '_task_quota'：
+        per_day        每个自然日最多执行次数
+        cooldown_hours 两次成功执行之间的最小间隔
+        window         (次数, 小时)，任意连续时间窗口内的最多执行次数
+    这是一个线程安全的单例。
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._loaded = False
+        return cls._instance
+
+    def __init__(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self.file_path = AppConfig.TASK_LEDGER_FILE
+            self._entries = {}  # profile -> {task_name: [iso时间戳]}
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            log_util.error("配额账本", f"读取任务账本 {self.file_path} 失败，将使用空账本: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """先写临时文件再替换，避免写入中途崩溃损坏账本。"""
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            log_util.error("配额账本", f"保存任务账本 {self.file_path} 失败: {e}")
+
+    def record(self, profile: str, task_name: str, when: datetime = None):
+        """记录一次成功执行，并清理超过保留期限的旧记录。"""
+        when = when or datetime.now()
+        cutoff = when - timedelta(days=AppConfig.TASK_LEDGER_RETENTION_DAYS)
+        with self._lock:
+            history = self._entries.setdefault(profile, {}).setdefault(task_name, [])
+            history.append(when.isoformat(timespec='seconds'))
+            history[:] = [t for t in history if datetime.fromisoformat(t) >= cutoff]
+            self._save()
+
+    def remaining(self, profile: str, task_name: str, quota: dict, now: datetime = None):
+        """
+        返回该任务当前还允许执行的次数。没有任何配额限制时返回None（表示不限）。
+        设置了冷却时间的任务每次运行最多执行一次。
+        """
+        if not quota:
+            return None
+        now = now or datetime.now()
+        with self._lock:
+            history = [datetime.fromisoformat(t) for t in self._entries.get(profile, {}).get(task_name, [])]
+
+        limits = []
+        if 'per_day' in quota:
+            today_count = sum(1 for t in history if t.date() == now.date())
+            limits.append(quota['per_day'] - today_count)
+        if 'window' in quota:
+            times, window_hours = quota['window']
+            window_start = now - timedelta(hours=window_hours)
+            limits.append(times - sum(1 for t in history if t > window_start))
+        if 'cooldown_hours' in quota:
+            # 冷却期内不能执行；冷却结束后本次运行也最多执行一次，执行后重新进入冷却期
+            cooling = history and now - max(history) < timedelta(hours=quota['cooldown_hours'])
+            limits.append(0 if cooling else 1)
+
+        if not limits:
+            return None
+        return max(0, min(limits))
+
+
+# 导出的单例实例
+quota_ledger = QuotaLedger()
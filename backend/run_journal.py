@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+from config import AppConfig
+from util.log_util import log_util
+
+
+class RunJournal:
+    """
+    运行日志（journal），以JSONL格式追加写入磁盘，保证进程崩溃或用户停止后仍能恢复进度。
+    第一行是运行头记录（包含任务序列和计划执行的所有任务单元），之后每行是一次任务状态变化。
+    写入采用批量刷盘：状态先进入缓冲区，遇到终态（成功/失败/跳过/超时/取消）、缓冲区满或定时器到期时
+    一次性写入并fsync。
+    """
+
+    TERMINAL_STATUSES = ('SUCCESS', 'FAILURE', 'SKIPPED', 'TIMEOUT', 'CANCELLED')
+
+    def __init__(self, run_id: str, runs_dir: str = None):
+        self.run_id = run_id
+        self.runs_dir = runs_dir or AppConfig.RUNS_DIR
+        self.path = os.path.join(self.runs_dir, f"{run_id}.jsonl")
+        self.log = log_util
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._closed = False
+
+    @staticmethod
+    def new_run_id() -> str:
+        return datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+
+    def start(self, sequence, concurrent_browsers, units, mode='new', parent_run_id=None, options=None):
+        """
+        写入运行头记录。units 为 (browser_id, unique_task_name, task_name) 列表，
+        options 为调度选项（调度模式、后端、自适应并发设置），恢复或重跑时沿用。
+        """
+        os.makedirs(self.runs_dir, exist_ok=True)
+        header = {
+            'type': 'run',
+            'run_id': self.run_id,
+            'mode': mode,
+            'parent_run_id': parent_run_id,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'concurrent_browsers': concurrent_browsers,
+            'options': options or {},
+            'sequence': sequence,
+            'units': [list(unit) for unit in units],
+        }
+        self._append([header], sync=True)
+        self._start_timer()
+
+    def record_status(self, browser_id: str, task_details: dict):
+        """记录一次任务状态变化。"""
+        record = {
+            'type': 'status',
+            'browser_id': browser_id,
+            'task_name': task_details.get('task_name'),
+            'status': task_details.get('status'),
+            'details': task_details.get('details'),
+            'timestamp': task_details.get('timestamp'),
+        }
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(record)
+            should_flush = (record['status'] in self.TERMINAL_STATUSES
+                            or len(self._buffer) >= AppConfig.JOURNAL_FLUSH_BATCH)
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if records:
+            self._append(records, sync=True)
+
+    def close(self):
+        """写入结束记录并停止定时刷盘。"""
+        with self._lock:
+            self._closed = True
+            if self._timer:
+                self._timer.cancel()
+            records, self._buffer = self._buffer, []
+        records.append({'type': 'end', 'timestamp': datetime.now().isoformat(timespec='milliseconds')})
+        self._append(records, sync=True)
+
+    def _append(self, records, sync):
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        except Exception as e:
+            self.log.error("运行日志", f"写入运行日志 {self.path} 失败: {e}")
+
+    def _start_timer(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._timer = threading.Timer(AppConfig.JOURNAL_FLUSH_INTERVAL, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        self.flush()
+        self._start_timer()
+
+    @staticmethod
+    def load(run_id: str, runs_dir: str = None) -> dict:
+        """
+        读取一次运行的日志，返回运行头以及每个任务单元的最终状态。
+        日志末尾因崩溃而被截断的行会被忽略。
+        """
+        path = os.path.join(runs_dir or AppConfig.RUNS_DIR, f"{run_id}.jsonl")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"未找到运行日志: {path}")
+
+        header = None
+        last_status = {}
+        finished = False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                record_type = record.get('type')
+                if record_type == 'run':
+                    header = record
+                elif record_type == 'status':
+                    last_status[(record['browser_id'], record['task_name'])] = record
+                elif record_type == 'end':
+                    finished = True
+
+        if header is None:
+            raise ValueError(f"运行日志 {path} 缺少运行头记录。")
+
+        return {'header': header, 'last_status': last_status, 'finished': finished}
+
+    @staticmethod
+    def list_runs(runs_dir: str = None) -> list:
+        """列出所有运行日志的摘要，按时间倒序。"""
+        runs_dir = runs_dir or AppConfig.RUNS_DIR
+        if not os.path.exists(runs_dir):
+            return []
+
+        summaries = []
+        for fname in sorted(os.listdir(runs_dir), reverse=True):
+            if not fname.endswith(".jsonl"):
+                continue
+            run_id = fname[:-len(".jsonl")]
+            try:
+                run = RunJournal.load(run_id, runs_dir)
+            except Exception as e:
+                log_util.warn("运行日志", f"解析运行日志 {fname} 失败: {e}")
+                continue
+            statuses = [record['status'] for record in run['last_status'].values()]
+            summaries.append({
+                'run_id': run_id,
+                'mode': run['header'].get('mode'),
+                'parent_run_id': run['header'].get('parent_run_id'),
+                'created_at': run['header'].get('created_at'),
+                'total': len(run['header'].get('units', [])),
+                'success': statuses.count('SUCCESS'),
+                'failure': statuses.count('FAILURE') + statuses.count('TIMEOUT'),
+                'finished': run['finished'],
+            })
+        return summaries
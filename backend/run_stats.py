@@ -0,0 +1,107 @@
+import threading
+import time
+
+from backend.message_store import message_store
+
+
+class RunStats:
+    """
+    单次运行的统计信息。
+    记录每个并发槽位被工作线程占用的时间和真正执行任务的时间，
+    据此计算总耗时（makespan）和槽位利用率，用于比较不同调度模式的效果。
+    统计快照会写入 message_store 的 'stats' 主题。
+    """
+
+    def __init__(self, slot_count: int, scheduler_mode: str):
+        self._lock = threading.Lock()
+        self.slot_count = slot_count
+        self.scheduler_mode = scheduler_mode
+        self.started_at = None
+        self.finished_at = None
+        self._slot_busy = [0.0] * slot_count
+        self._slot_task = [0.0] * slot_count
+        self._slot_since = [None] * slot_count
+        self.counters = {}
+        self.gauges = {}
+
+    def start(self):
+        with self._lock:
+            self.started_at = time.monotonic()
+        self.publish()
+
+    def finish(self):
+        with self._lock:
+            now = time.monotonic()
+            for slot_id, since in enumerate(self._slot_since):
+                if since is not None:
+                    self._slot_busy[slot_id] += now - since
+                    self._slot_since[slot_id] = None
+            self.finished_at = now
+        self.publish()
+
+    def slot_acquired(self, slot_id: int):
+        with self._lock:
+            self._slot_since[slot_id] = time.monotonic()
+
+    def slot_released(self, slot_id: int):
+        with self._lock:
+            since = self._slot_since[slot_id]
+            if since is not None:
+                self._slot_busy[slot_id] += time.monotonic() - since
+                self._slot_since[slot_id] = None
+        self.publish()
+
+    def add_task_time(self, slot_id: int, seconds: float):
+        with self._lock:
+            self._slot_task[slot_id] += seconds
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name: str, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def merge(self, snapshot: dict):
+        """合并另一个统计快照（多进程调度时由子进程回传）的槽位时间和计数器。"""
+        with self._lock:
+            for slot_id, seconds in enumerate(snapshot.get('slot_busy_seconds', [])):
+                self._slot_busy[slot_id] += seconds
+            for slot_id, seconds in enumerate(snapshot.get('slot_task_seconds', [])):
+                self._slot_task[slot_id] += seconds
+            for name, amount in snapshot.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+        self.publish()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            if self.started_at is None:
+                makespan = 0.0
+            else:
+                makespan = (self.finished_at or now) - self.started_at
+
+            busy = list(self._slot_busy)
+            for slot_id, since in enumerate(self._slot_since):
+                if since is not None:
+                    busy[slot_id] += now - since
+
+            capacity = makespan * self.slot_count
+            return {
+                'scheduler_mode': self.scheduler_mode,
+                'slot_count': self.slot_count,
+                'makespan_seconds': round(makespan, 1),
+                'slot_busy_seconds': [round(v, 1) for v in busy],
+                'slot_task_seconds': [round(v, 1) for v in self._slot_task],
+                # 槽位占用率：槽位被工作线程持有的时间占比（含浏览器准备、钱包解锁）
+                'slot_occupancy': round(sum(busy) / capacity, 3) if capacity else 0.0,
+                # 槽位利用率：槽位真正在执行任务的时间占比
+                'slot_utilization': round(sum(self._slot_task) / capacity, 3) if capacity else 0.0,
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'is_finished': self.finished_at is not None,
+            }
+
+    def publish(self):
+        message_store.put('stats', 'run', self.snapshot())
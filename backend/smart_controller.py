@@ -5,7 +5,9 @@ import inspect
 from time import sleep
 
 from backend.dispatcher import Dispatcher
+from backend.process_dispatcher import ProcessDispatcher
 from backend.message_store import message_store
+from backend.run_journal import RunJournal
 from util.log_util import log_util
 from config import AppConfig
 from util.socks5_util import Socks5Util
@@ -15,7 +17,8 @@ from annotation.task_annotation import task_annotation
 class SmartController:
     """
     智能控制器，作为系统的统一入口。
-    采用无状态设计，通过 message_store 与调度器解耦。
+    运行信号和统计通过 message_store 读取；任务单元的状态、增量变化和计数直接读取当前调度器的任务状态表
+    （TaskStatusTable），前端按版本号只拉取变化的单元。
     """
     def __init__(self):
         self.log = log_util
@@ -78,10 +81,49 @@ class SmartController:
         if self.dispatcher:
             self.dispatcher.shutdown()
 
-    def dispatch_sequence(self, sequence: list[dict], concurrent_browsers: int):
+    def dispatch_sequence(self, sequence: list[dict], concurrent_browsers: int, scheduler_mode: str = None,
+                          adaptive: bool = False, min_browsers: int = None, backend: str = None):
         """
         接收UI层的请求，创建并启动调度器来完成所有工作。
+        adaptive 为True时，concurrent_browsers 作为并发上限，调度器根据主机负载在 [min_browsers, 上限] 内自动调整。
+        backend 为 "thread"（默认）或 "process"（按浏览器分片到多个子进程执行）。
         """
+        return self._start_dispatcher(sequence, concurrent_browsers, scheduler_mode,
+                                      adaptive=adaptive, min_browsers=min_browsers, backend=backend)
+
+    def resume_run(self, run_id: str, concurrent_browsers: int = None, scheduler_mode: str = None):
+        """
+        从运行日志恢复一次中断（崩溃或手动停止）的运行：重建原任务计划，跳过已成功的任务单元。
+        并发数、调度模式、调度后端和自适应并发设置默认沿用原运行，传入的参数优先。
+        """
+        run = RunJournal.load(run_id)
+        done = {key for key, record in run['last_status'].items() if record.get('status') == 'SUCCESS'}
+        units = {(unit[0], unit[1]) for unit in run['header'].get('units', [])} - done
+        self.log.info("智能控制器", f"恢复运行 {run_id}：已完成 {len(done)} 个任务单元，剩余 {len(units)} 个。")
+        return self._restart_run(run, units, 'resume', concurrent_browsers, scheduler_mode)
+
+    def retry_failed_units(self, run_id: str, concurrent_browsers: int = None, scheduler_mode: str = None):
+        """只重新执行指定运行中最终状态为失败（含超时）的任务单元，调度选项的沿用规则与 resume_run 相同。"""
+        run = RunJournal.load(run_id)
+        units = {key for key, record in run['last_status'].items() if record.get('status') in ('FAILURE', 'TIMEOUT')}
+        self.log.info("智能控制器", f"重跑运行 {run_id} 中失败的 {len(units)} 个任务单元。")
+        return self._restart_run(run, units, 'retry_failed', concurrent_browsers, scheduler_mode)
+
+    def _restart_run(self, run, units, run_mode, concurrent_browsers, scheduler_mode):
+        header = run['header']
+        options = header.get('options', {})
+        return self._start_dispatcher(header['sequence'], concurrent_browsers or header['concurrent_browsers'],
+                                      scheduler_mode or options.get('scheduler_mode'),
+                                      unit_filter=units, run_mode=run_mode, parent_run_id=header['run_id'],
+                                      adaptive=options.get('adaptive', False), min_browsers=options.get('min_browsers'),
+                                      backend=options.get('backend'))
+
+    def list_runs(self) -> list:
+        """列出磁盘上所有运行日志的摘要，供恢复或重跑时选择。"""
+        return RunJournal.list_runs()
+
+    def _start_dispatcher(self, sequence, concurrent_browsers, scheduler_mode=None, unit_filter=None,
+                          run_mode='new', parent_run_id=None, adaptive=False, min_browsers=None, backend=None):
         # 检查是否有旧的调度线程仍在运行
         if self.dispatcher and any(t.name == "DispatcherThread" and t.is_alive() for t in threading.enumerate()):
             self.log.warn("智能控制器", "检测到上一次的任务仍在运行，将先执行强制关闭。")
@@ -90,39 +132,76 @@ class SmartController:
         self.interrupt_event.clear()
         
         # 清空上一次运行的数据
-        message_store.clear_topic('tasks')
         message_store.clear_topic('signals')
+        message_store.clear_topic('stats')
 
-        self.dispatcher = Dispatcher(
+        journal = RunJournal(RunJournal.new_run_id())
+        backend = backend or AppConfig.DEFAULT_DISPATCHER_BACKEND
+        dispatcher_class = ProcessDispatcher if backend == 'process' else Dispatcher
+        self.dispatcher = dispatcher_class(
             sequence=sequence,
             concurrent_browsers=concurrent_browsers,
             projects_map=self.projects_map,
-            interrupt_event=self.interrupt_event
+            interrupt_event=self.interrupt_event,
+            scheduler_mode=scheduler_mode,
+            journal=journal,
+            unit_filter=unit_filter,
+            run_mode=run_mode,
+            parent_run_id=parent_run_id,
+            adaptive=adaptive,
+            min_browsers=min_browsers
         )
 
         threading.Thread(target=self.dispatcher.execute, name="DispatcherThread").start()
-        return {"status": "started"}
+        return {"status": "started", "run_id": journal.run_id}
 
     def get_task_progress(self) -> dict:
-        """获取当前所有任务的执行状态。供前端轮询调用。"""
-        return message_store.getByTopic('tasks')
+        """获取当前所有任务的执行状态（完整快照）。"""
+        return self.dispatcher.task_status.snapshot() if self.dispatcher else {}
+
+    def get_task_changes(self, since_version: int = 0) -> dict:
+        """
+        获取 since_version 之后状态有变化的任务单元，供前端轮询调用。
+        返回 {'version', 'reset', 'changes': {browser_id: {task_name: details}}}，下次轮询时传入返回的 version。
+        """
+        if not self.dispatcher:
+            return {'version': 0, 'reset': False, 'changes': {}}
+        return self.dispatcher.task_status.changes_since(since_version)
 
     def get_execution_status(self) -> dict:
         """获取任务执行的计数状态，并明确指示整个序列是否已完成。"""
         total_tasks = self.dispatcher.total_task_count if self.dispatcher else 0
         
-        tasks_data = message_store.getByTopic('tasks')
-        completed_count = sum(len(tasks) for tasks in tasks_data.values())
+        # 只统计已结束的单元；状态表增量维护计数，开销与运行规模无关
+        completed_count = self.dispatcher.task_status.completed_count() if self.dispatcher else 0
 
         completion_signal = message_store.getByTopicAndKey('signals', 'completion')
         is_done = bool(completion_signal and completion_signal.get('status') == 'ALL_TASKS_COMPLETED')
 
+        eta_seconds = None
+        if self.dispatcher and not is_done:
+            eta_seconds = self.dispatcher.estimate_remaining_seconds()
+
         return {
             'completed': completed_count,
             'total': total_tasks,
-            'is_done': is_done
+            'is_done': is_done,
+            'eta_seconds': eta_seconds  # 基于历史耗时模型估算的剩余秒数，无法估算时为None
         }
 
+    def get_task_stats(self, by_browser: bool = False) -> dict:
+        """
+        获取任务单元的实时统计：各状态、各项目（by_browser 为True时还有各浏览器）的计数和吞吐量（个/分钟）。
+        计数增量维护，可供进度界面和外部监控高频轮询。
+        """
+        if not self.dispatcher:
+            return {'total': 0, 'completed': 0, 'by_status': {}, 'by_project': {}, 'tasks_per_minute': 0.0}
+        return self.dispatcher.task_status.stats(by_browser)
+
+    def get_run_stats(self) -> dict:
+        """获取当前（或最近一次）运行的统计信息，包括总耗时和槽位利用率。"""
+        return message_store.getByTopicAndKey('stats', 'run') or {}
+
     def get_ip_configs(self):
         return Socks5Util().read_proxies()
 
@@ -0,0 +1,93 @@
+import json
+import os
+import statistics
+import threading
+
+from config import AppConfig
+from util.log_util import log_util
+
+
+class TaskDurationModel:
+    """
+    基于历史记录的任务耗时模型。
+    按任务名保存最近 TASK_DURATION_WINDOW 次成功执行的耗时（秒），跨运行持久化到磁盘，
+    提供滚动中位数和p90，供调度器按"预计最长优先"（LPT）排序工作包以及估算剩余时间。
+    这是一个线程安全的单例。
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._loaded = False
+        return cls._instance
+
+    def __init__(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self.file_path = AppConfig.TASK_DURATION_FILE
+            self._durations = {}  # task_name -> [秒]
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._durations = json.load(f)
+        except Exception as e:
+            log_util.error("耗时模型", f"读取任务耗时记录 {self.file_path} 失败，将使用空记录: {e}")
+            self._durations = {}
+
+    def _save(self):
+        """先写临时文件再替换，避免写入中途崩溃损坏记录。"""
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._durations, f, ensure_ascii=False)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            log_util.error("耗时模型", f"保存任务耗时记录 {self.file_path} 失败: {e}")
+
+    def record(self, task_name: str, seconds: float):
+        """记录一次成功执行的耗时，只保留最近 TASK_DURATION_WINDOW 次。"""
+        with self._lock:
+            history = self._durations.setdefault(task_name, [])
+            history.append(round(seconds, 2))
+            del history[:-AppConfig.TASK_DURATION_WINDOW]
+            self._save()
+
+    def median(self, task_name: str):
+        with self._lock:
+            history = list(self._durations.get(task_name, []))
+        return statistics.median(history) if history else None
+
+    def p90(self, task_name: str):
+        with self._lock:
+            history = sorted(self._durations.get(task_name, []))
+        if not history:
+            return None
+        return history[min(len(history) - 1, int(len(history) * 0.9))]
+
+    def expected(self, task_name: str) -> float:
+        """任务的预计耗时：有历史时取中位数，否则取 AppConfig.TASK_DURATION_DEFAULT。"""
+        median = self.median(task_name)
+        return median if median is not None else AppConfig.TASK_DURATION_DEFAULT
+
+    def summary(self) -> dict:
+        """所有任务的样本数、中位数和p90。"""
+        with self._lock:
+            names = list(self._durations)
+        return {name: {'samples': len(self._durations.get(name, [])),
+                       'median': self.median(name),
+                       'p90': self.p90(name)} for name in names}
+
+
+# 导出的单例实例
+task_duration_model = TaskDurationModel()
@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+
+
+@dataclass
+class TaskUnit:
+    """调度的最小单位：某个浏览器上的一次任务执行。"""
+    browser_id: str
+    task_name: str
+    unique_task_name: str
+    attempts: int = 0
+
+
+class TaskQueue:
+    """
+    按(浏览器, 任务)粒度调度的共享工作队列。
+    每个任务单元都绑定在自己的浏览器上（浏览器亲和性）：持有某个浏览器的工作线程会持续领取该浏览器的任务，
+    失败的单元会被重新排到该浏览器队列的末尾，被中途释放的浏览器会排到全局末尾，由之后空闲的槽位重新领取。
+    """
+
+    def __init__(self, job_list, requeue_limit: int = 1):
+        self.requeue_limit = requeue_limit
+        self._cond = threading.Condition()
+        self._units = OrderedDict()  # browser_id -> deque[TaskUnit]
+        self._held = set()
+        self._browser_attempts = {}
+
+        for job in job_list:
+            browser_id = job['user_id']
+            queue = self._units.setdefault(browser_id, deque())
+            for task in job['tasks_to_run']:
+                queue.append(TaskUnit(browser_id, task['task_name'], task['unique_task_name']))
+
+    def peek_browsers(self, count: int) -> list:
+        """按调度顺序返回接下来可被领取的最多count个浏览器，用于预启动。"""
+        with self._cond:
+            result = []
+            for browser_id, queue in self._units.items():
+                if len(result) >= count:
+                    break
+                if queue and browser_id not in self._held:
+                    result.append(browser_id)
+            return result
+
+    def acquire_browser(self, interrupt_event, poll_interval: float = 1.0):
+        """
+        领取下一个有待执行任务且未被占用的浏览器。
+        当暂时没有可领取的浏览器但仍有浏览器被占用时会等待（被占用的浏览器可能释放出重排的任务）；
+        全部完成或收到中断信号时返回None。
+        """
+        with self._cond:
+            while not interrupt_event.is_set():
+                for browser_id, queue in self._units.items():
+                    if queue and browser_id not in self._held:
+                        self._held.add(browser_id)
+                        self._browser_attempts[browser_id] = self._browser_attempts.get(browser_id, 0) + 1
+                        return browser_id
+                if not self._held:
+                    return None
+                self._cond.wait(poll_interval)
+            return None
+
+    def next_unit(self, browser_id: str):
+        """为已持有的浏览器取出下一个任务单元，没有则返回None。"""
+        with self._cond:
+            queue = self._units.get(browser_id)
+            if queue:
+                return queue.popleft()
+            return None
+
+    def has_pending(self, browser_id: str) -> bool:
+        """该浏览器是否还有待执行的任务单元。"""
+        with self._cond:
+            return bool(self._units.get(browser_id))
+
+    def requeue(self, unit: TaskUnit) -> bool:
+        """将失败的任务单元重新排到其浏览器队列末尾。超过重试上限时返回False。"""
+        with self._cond:
+            if unit.attempts >= self.requeue_limit:
+                return False
+            unit.attempts += 1
+            self._units.setdefault(unit.browser_id, deque()).append(unit)
+            self._cond.notify_all()
+            return True
+
+    def release_browser(self, browser_id: str, failed: bool = False) -> list:
+        """
+        释放浏览器。如仍有未执行的单元，浏览器会被排到全局末尾等待其他槽位重新领取；
+        若是因失败释放且已超过重试上限，则丢弃其剩余单元并返回它们，由调用方标记为失败。
+        """
+        with self._cond:
+            self._held.discard(browser_id)
+            dropped = []
+            queue = self._units.get(browser_id)
+            if queue:
+                if failed and self._browser_attempts.get(browser_id, 0) > self.requeue_limit:
+                    dropped = list(queue)
+                    queue.clear()
+                else:
+                    self._units.move_to_end(browser_id)
+            self._cond.notify_all()
+            return dropped
+
+    def clear(self):
+        """清空所有待执行单元（用于中断）。"""
+        with self._cond:
+            for queue in self._units.values():
+                queue.clear()
+            self._cond.notify_all()
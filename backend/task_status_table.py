@@ -0,0 +1,217 @@
+import threading
+import time
+from array import array
+from collections import deque
+from datetime import datetime
+
+
+class TaskStatusTable:
+    """
+    一次运行中所有任务单元 (browser_id, unique_task_name) 的状态表。
+    浏览器ID和任务名驻留为整数编号，状态码、时间戳和修改版本号按行存放在紧凑数组中，
+    详情字符串截断后存放，常见的固定详情（如"任务成功完成。"）驻留为一份。set_status 在锁内原子地更新单行，
+    不再像 message_store 的嵌套字典那样每次更新都深拷贝整个浏览器的任务字典再写回。
+    每次状态变化同时增量维护按状态、按项目、按浏览器的计数和最近一段时间的完成吞吐量，
+    stats() 的开销与任务单元数无关，可以高频轮询。
+    """
+    PENDING = 'PENDING'
+    # 状态码即下标；PENDING 表示已登记但尚未发布过状态，快照中不导出
+    STATUSES = (PENDING, 'EXECUTING', 'SUCCESS', 'FAILURE', 'SKIPPED', 'TIMEOUT', 'CANCELLED')
+    TERMINAL_STATUSES = ('SUCCESS', 'FAILURE', 'SKIPPED', 'TIMEOUT', 'CANCELLED')
+    DETAIL_MAX_CHARS = 500
+    DETAIL_POOL_SIZE = 256  # 最多驻留多少种不同的详情；之后出现的详情（多为异常信息）不再进入驻留池
+    THROUGHPUT_WINDOW = 300  # 吞吐量按最近多少秒内完成的任务单元计算
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes = {status: code for code, status in enumerate(self.STATUSES)}
+        self._terminal = frozenset(self._codes[status] for status in self.TERMINAL_STATUSES)
+        self._browsers = []  # 编号 -> browser_id
+        self._browser_ids = {}  # browser_id -> 编号
+        self._tasks = []  # 编号 -> unique_task_name
+        self._task_ids = {}  # unique_task_name -> 编号
+        self._task_project = []  # 任务编号 -> 项目名
+        self._details = {}  # 驻留的详情字符串，大小不超过 DETAIL_POOL_SIZE
+
+        self._rows = {}  # (浏览器编号, 任务编号) -> 行号
+        self._row_browser = array('i')
+        self._row_task = array('i')
+        self._status = array('b')
+        self._timestamp = array('d')
+        self._detail = []  # 行号 -> 驻留的详情字符串
+        self._change_log = array('i')  # 第 n 次修改的行号，版本号即修改次数
+
+        # 增量计数：下标为状态码
+        self._status_counts = [0] * len(self.STATUSES)
+        self._project_counts = {}  # 项目名 -> 各状态计数
+        self._browser_counts = []  # 浏览器编号 -> 各状态计数
+        self._started = time.monotonic()
+        self._finished_times = deque()  # 最近 THROUGHPUT_WINDOW 秒内完成的时间点（monotonic）
+
+    def register(self, browser_id: str, task_name: str) -> int:
+        """登记一个任务单元（状态为 PENDING），返回其行号；已登记时直接返回。"""
+        with self._lock:
+            return self._row(browser_id, task_name)
+
+    def set_status(self, browser_id: str, task_name: str, status: str, detail: str = '',
+                   timestamp: float = None) -> int:
+        """
+        原子地更新任务单元的状态，未登记的单元自动登记。
+
+        :param timestamp: 状态时间（time.time() 秒数），默认为当前时间。
+        :return: 本次修改后的版本号。
+        """
+        code = self._codes[status]
+        detail = self._intern_detail(detail)
+        with self._lock:
+            row = self._row(browser_id, task_name)
+            old_code = self._status[row]
+            if old_code != code:
+                self._count(row, old_code, -1)
+                self._count(row, code, 1)
+                if code in self._terminal and old_code not in self._terminal:
+                    self._finished_times.append(time.monotonic())
+            self._status[row] = code
+            self._timestamp[row] = time.time() if timestamp is None else timestamp
+            self._detail[row] = detail
+            self._change_log.append(row)
+            return len(self._change_log)
+
+    def status(self, browser_id: str, task_name: str) -> str:
+        """任务单元的当前状态，未登记时返回None。"""
+        with self._lock:
+            row = self._find(browser_id, task_name)
+            return None if row is None else self.STATUSES[self._status[row]]
+
+    def get(self, browser_id: str, task_name: str) -> dict:
+        """任务单元的状态详情（与快照中的格式相同），未登记或尚未发布状态时返回None。"""
+        with self._lock:
+            row = self._find(browser_id, task_name)
+            if row is None or self._status[row] == 0:
+                return None
+            return self._export(row)
+
+    def completed_count(self) -> int:
+        """已结束（处于终态）的任务单元数，执行中的单元不计。"""
+        with self._lock:
+            return sum(self._status_counts[code] for code in self._terminal)
+
+    def stats(self, by_browser: bool = False) -> dict:
+        """
+        运行统计：总数、已结束数、各状态计数、各项目各状态计数和最近的吞吐量（个/分钟）。
+        by_browser 为True时附带各浏览器各状态计数（大小与浏览器数成正比）。
+        """
+        with self._lock:
+            result = {
+                'total': len(self._status),
+                'completed': sum(self._status_counts[code] for code in self._terminal),
+                'by_status': self._named(self._status_counts),
+                'by_project': {project: self._named(counts) for project, counts in self._project_counts.items()},
+                'tasks_per_minute': self._throughput(),
+            }
+            if by_browser:
+                result['by_browser'] = {self._browsers[browser]: self._named(counts)
+                                        for browser, counts in enumerate(self._browser_counts)}
+            return result
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return len(self._change_log)
+
+    def snapshot(self) -> dict:
+        """导出所有已发布状态的任务单元：{browser_id: {task_name: details}}，格式与原 'tasks' 主题一致。"""
+        with self._lock:
+            return self._export_rows(row for row in range(len(self._status)) if self._status[row])
+
+    def changes_since(self, version: int) -> dict:
+        """
+        导出 version 之后状态有变化的任务单元。
+        返回 {'version', 'reset', 'changes': {browser_id: {task_name: details}}}；
+        version 不属于本表（大于当前版本号）时 reset 为True，changes 为完整快照。
+        """
+        with self._lock:
+            current = len(self._change_log)
+            if version > current:
+                rows = (row for row in range(len(self._status)) if self._status[row])
+                return {'version': current, 'reset': True, 'changes': self._export_rows(rows)}
+            rows = sorted(set(self._change_log[max(0, version):]))
+            return {'version': current, 'reset': False, 'changes': self._export_rows(rows)}
+
+    def _row(self, browser_id, task_name):
+        browser = self._browser_ids.get(browser_id)
+        if browser is None:
+            browser = self._browser_ids[browser_id] = len(self._browsers)
+            self._browsers.append(browser_id)
+            self._browser_counts.append([0] * len(self.STATUSES))
+        task = self._task_ids.get(task_name)
+        if task is None:
+            task = self._task_ids[task_name] = len(self._tasks)
+            self._tasks.append(task_name)
+            self._task_project.append(task_name.split('_task_')[0].capitalize())
+        row = self._rows.get((browser, task))
+        if row is None:
+            row = self._rows[(browser, task)] = len(self._status)
+            self._row_browser.append(browser)
+            self._row_task.append(task)
+            self._status.append(0)
+            self._timestamp.append(0.0)
+            self._detail.append('')
+            self._count(row, 0, 1)
+        return row
+
+    def _count(self, row, code, delta):
+        self._status_counts[code] += delta
+        self._browser_counts[self._row_browser[row]][code] += delta
+        project = self._task_project[self._row_task[row]]
+        counts = self._project_counts.get(project)
+        if counts is None:
+            counts = self._project_counts[project] = [0] * len(self.STATUSES)
+        counts[code] += delta
+
+    def _named(self, counts):
+        return {status: count for status, count in zip(self.STATUSES, counts) if count}
+
+    def _throughput(self):
+        now = time.monotonic()
+        while self._finished_times and now - self._finished_times[0] > self.THROUGHPUT_WINDOW:
+            self._finished_times.popleft()
+        # 运行不足一分钟时按一分钟计算，避免开头几秒的吞吐量被放大
+        window = max(60.0, min(self.THROUGHPUT_WINDOW, now - self._started))
+        if not self._finished_times:
+            return 0.0
+        return round(len(self._finished_times) / window * 60, 2)
+
+    def _find(self, browser_id, task_name):
+        browser = self._browser_ids.get(browser_id)
+        task = self._task_ids.get(task_name)
+        if browser is None or task is None:
+            return None
+        return self._rows.get((browser, task))
+
+    def _intern_detail(self, detail):
+        detail = '' if detail is None else str(detail)
+        if len(detail) > self.DETAIL_MAX_CHARS:
+            detail = detail[:self.DETAIL_MAX_CHARS] + '...'
+        with self._lock:
+            pooled = self._details.get(detail)
+            if pooled is not None:
+                return pooled
+            if len(self._details) < self.DETAIL_POOL_SIZE:
+                self._details[detail] = detail
+            return detail
+
+    def _export(self, row):
+        return {
+            'task_name': self._tasks[self._row_task[row]],
+            'status': self.STATUSES[self._status[row]],
+            'details': self._detail[row],
+            'timestamp': datetime.fromtimestamp(self._timestamp[row]).isoformat(timespec='milliseconds'),
+        }
+
+    def _export_rows(self, rows):
+        result = {}
+        for row in rows:
+            result.setdefault(self._browsers[self._row_browser[row]], {})[self._tasks[self._row_task[row]]] = \
+                self._export(row)
+        return result
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from util.log_util import log_util
+
+
+class WorkerLease:
+    """
+    工作线程对一个并发槽位（及其浏览器）的占用凭证。
+    槽位只能被归还一次：正常结束时由工作线程归还，任务超时时由看门狗抢先归还，
+    之后卡住的工作线程即使恢复也不会重复释放槽位。
+    """
+
+    def __init__(self, slot_id: int, user_id: str, browser):
+        self.slot_id = slot_id
+        self.user_id = user_id
+        self.browser = browser
+        self.thread_ident = None  # 持有该槽位的工作线程，看门狗据此单独取消它
+        self.reclaimed = False
+        self._released = False
+        self._lock = threading.Lock()
+
+    def try_release(self) -> bool:
+        with self._lock:
+            if self._released:
+                return False
+            self._released = True
+            return True
+
+
+class TaskWatchdog:
+    """
+    任务看门狗线程。
+    工作线程在执行任务前登记截止时间，看门狗定期检查，发现超时后调用 on_timeout 回调
+    （由调度器负责标记超时、强制关闭浏览器并归还槽位）。
+    """
+
+    def __init__(self, on_timeout, interval: float):
+        self.log = log_util
+        self.on_timeout = on_timeout
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._watches = {}  # WorkerLease -> (task_name, deadline)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="TaskWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def begin(self, lease: WorkerLease, task_name, timeout: float):
+        """登记一个受监控的阶段。task_name 为None时表示浏览器准备阶段。"""
+        with self._lock:
+            self._watches[lease] = (task_name, time.monotonic() + timeout)
+
+    def end(self, lease: WorkerLease) -> bool:
+        """结束监控。如果该阶段已被看门狗判定为超时，返回False。"""
+        with self._lock:
+            self._watches.pop(lease, None)
+            return not lease.reclaimed
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            now = time.monotonic()
+            expired = []
+            with self._lock:
+                for lease, (task_name, deadline) in list(self._watches.items()):
+                    if now >= deadline:
+                        lease.reclaimed = True
+                        del self._watches[lease]
+                        expired.append((lease, task_name))
+
+            for lease, task_name in expired:
+                try:
+                    self.on_timeout(lease, task_name)
+                except Exception as e:
+                    self.log.error("看门狗", f"处理 {lease.user_id} 的超时任务时发生异常: {e}", exc_info=True)
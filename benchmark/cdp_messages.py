@@ -0,0 +1,74 @@
+"""
+批量页面探测前后每个任务的CDP消息数对比。
+
+使用真实的 AdsPower 环境（resource/browser.txt 中配置的浏览器）和项目脚本，分别在关闭和开启
+AppConfig.DOM_PROBE_ENABLED 的情况下执行同一个任务序列（多线程后端），统计每个任务平均发出的CDP消息数。
+
+用法（在项目根目录下）:
+    python benchmark/cdp_messages.py --task pharos_task_check_in --slots 4
+    python benchmark/cdp_messages.py --task pharos_task_faro_swap --browsers 2 --modes probe
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.message_store import message_store
+from backend.smart_controller import SmartController
+from benchmark.dispatcher_backends import run_once
+from config import AppConfig
+from util.ads_browser_util import AdsBrowserUtil
+
+MODES = {'ele': False, 'probe': True}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比批量页面探测前后每个任务的CDP消息数")
+    parser.add_argument('--task', required=True, help="要执行的任务方法名，例如 pharos_task_check_in")
+    parser.add_argument('--repetition', type=int, default=1, help="每个浏览器执行该任务的次数")
+    parser.add_argument('--slots', type=int, default=4, help="并发槽位数")
+    parser.add_argument('--browsers', type=int, default=0, help="参与的浏览器数量，默认使用全部配置的浏览器")
+    parser.add_argument('--modes', default='ele,probe', help="逗号分隔: ele（逐个查找）、probe（批量探测）")
+    args = parser.parse_args()
+
+    browser_ids = AdsBrowserUtil.get_configured_user_ids()
+    if args.browsers:
+        browser_ids = browser_ids[:args.browsers]
+    if not browser_ids:
+        print("resource/browser.txt 中没有配置任何浏览器。")
+        return
+
+    AppConfig.CDP_MESSAGE_COUNTING = True
+    # 两种模式依次执行同一任务序列，前一次运行写入的配额记录不能让后一次运行的单元被跳过
+    AppConfig.TASK_QUOTA_ENFORCED = False
+    controller = SmartController()
+    controller.discover_projects()
+    sequence = [{
+        'tasks': [{'task_name': args.task, 'repetition': args.repetition}],
+        'browser_ids': browser_ids,
+    }]
+
+    results = []
+    for mode in args.modes.split(','):
+        mode = mode.strip()
+        AppConfig.DOM_PROBE_ENABLED = MODES[mode]
+        print(f"=== {mode}: {len(browser_ids)} 个浏览器，{args.slots} 个槽位 ===")
+        result = run_once(controller, sequence, args.slots, 'thread', None)
+        gauges = (message_store.getByTopicAndKey('stats', 'run') or {}).get('gauges', {})
+        results.append({
+            'mode': mode,
+            'cdp_messages_per_task': gauges.get('cdp_messages_per_task'),
+            'cdp_messages': result['counters'].get('cdp_messages'),
+            'wall_seconds': result['wall_seconds'],
+            'success': result['success'],
+            'failure': result['failure'],
+        })
+
+    print()
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
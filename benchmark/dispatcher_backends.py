@@ -0,0 +1,85 @@
+"""
+多线程与多进程调度后端的对比基准。
+
+使用真实的 AdsPower 环境（resource/browser.txt 中配置的浏览器）和项目脚本，依次用两种后端
+执行同一个任务序列，输出总耗时、槽位利用率、吞吐量和主进程CPU时间。
+
+用法（在项目根目录下）:
+    python benchmark/dispatcher_backends.py --task pharos_task_check_in --slots 16
+    python benchmark/dispatcher_backends.py --task warden_task_chat_with_ai --repetition 2 --slots 24 --backends process
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.message_store import message_store
+from backend.smart_controller import SmartController
+from config import AppConfig
+from util.ads_browser_util import AdsBrowserUtil
+
+
+def run_once(controller, sequence, slots, backend, scheduler_mode):
+    wall_started = time.monotonic()
+    cpu_started = time.process_time()
+    controller.dispatch_sequence(sequence, slots, scheduler_mode, backend=backend)
+    while not message_store.getByTopicAndKey('signals', 'completion'):
+        time.sleep(1)
+    wall = time.monotonic() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    stats = message_store.getByTopicAndKey('stats', 'run') or {}
+    tasks = controller.get_task_progress()
+    statuses = [task['status'] for browser_tasks in tasks.values() for task in browser_tasks.values()]
+    return {
+        'backend': backend,
+        'wall_seconds': round(wall, 1),
+        'main_process_cpu_seconds': round(cpu, 1),
+        'slot_utilization': stats.get('slot_utilization'),
+        'success': statuses.count('SUCCESS'),
+        'failure': len(statuses) - statuses.count('SUCCESS'),
+        'tasks_per_minute': round(len(statuses) / wall * 60, 2) if wall else 0,
+        'counters': stats.get('counters', {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比多线程与多进程调度后端")
+    parser.add_argument('--task', required=True, help="要执行的任务方法名，例如 pharos_task_check_in")
+    parser.add_argument('--repetition', type=int, default=1, help="每个浏览器执行该任务的次数")
+    parser.add_argument('--slots', type=int, default=16, help="并发槽位数（建议16及以上）")
+    parser.add_argument('--browsers', type=int, default=0, help="参与的浏览器数量，默认使用全部配置的浏览器")
+    parser.add_argument('--backends', default='thread,process', help="逗号分隔的后端列表")
+    parser.add_argument('--scheduler', default=None, help="调度模式: package 或 task_queue")
+    args = parser.parse_args()
+
+    browser_ids = AdsBrowserUtil.get_configured_user_ids()
+    if args.browsers:
+        browser_ids = browser_ids[:args.browsers]
+    if not browser_ids:
+        print("resource/browser.txt 中没有配置任何浏览器。")
+        return
+
+    # 各后端依次执行同一任务序列，前一次运行写入的配额记录不能让后一次运行的单元被跳过
+    AppConfig.TASK_QUOTA_ENFORCED = False
+    controller = SmartController()
+    controller.discover_projects()
+    sequence = [{
+        'tasks': [{'task_name': args.task, 'repetition': args.repetition}],
+        'browser_ids': browser_ids,
+    }]
+
+    results = []
+    for backend in args.backends.split(','):
+        print(f"=== 后端 {backend}: {len(browser_ids)} 个浏览器，{args.slots} 个槽位 ===")
+        results.append(run_once(controller, sequence, args.slots, backend.strip(), args.scheduler))
+
+    print()
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+项目页面在关闭和开启资源屏蔽时的加载耗时与传输字节数对比。
+
+使用真实的 AdsPower 环境（resource/browser.txt 中配置的浏览器），多个浏览器同时打开各项目类
+声明的 *_URL 页面（禁用缓存），分别统计不屏蔽与按项目 RESOURCE_PROFILE 屏蔽时的平均加载耗时、
+传输字节数、请求数和被屏蔽的请求数。
+
+用法（在项目根目录下）:
+    python benchmark/resource_blocking.py --browsers 8
+    python benchmark/resource_blocking.py --project Pharos --rounds 3 --modes off,on
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.smart_controller import SmartController
+from config import AppConfig
+from util.ads_browser_util import AdsBrowserUtil
+from util.resource_blocker import ResourceBlocker
+
+MODES = {'off': False, 'on': True}
+
+
+def project_urls(controller, project=None):
+    """[(项目名, URL, 资源屏蔽配置)]，只包含声明了 RESOURCE_PROFILE 的项目类。"""
+    urls = []
+    for name, project_class in controller.projects_map.items():
+        if project and name != project:
+            continue
+        profile = getattr(project_class, 'RESOURCE_PROFILE', None)
+        if profile is None:
+            continue
+        for attr in dir(project_class):
+            if attr.endswith('_URL'):
+                urls.append((name, getattr(project_class, attr), profile))
+    return urls
+
+
+def load_once(browser, url, profile, settle):
+    """在新标签页中打开 url 并返回 (加载耗时秒, 传输字节数, 请求数, 被屏蔽的请求数)。"""
+    counts = {'bytes': 0, 'requests': 0, 'blocked': 0}
+    lock = threading.Lock()
+
+    def on_finished(**params):
+        with lock:
+            counts['bytes'] += params.get('encodedDataLength', 0)
+            counts['requests'] += 1
+
+    def on_failed(**params):
+        if params.get('blockedReason'):
+            with lock:
+                counts['blocked'] += 1
+
+    tab = browser.new_tab()
+    try:
+        tab.run_cdp('Network.enable')
+        tab.run_cdp('Network.setCacheDisabled', cacheDisabled=True)
+        ResourceBlocker.apply(tab, profile)
+        tab._driver.set_callback('Network.loadingFinished', on_finished)
+        tab._driver.set_callback('Network.loadingFailed', on_failed)
+
+        started = time.monotonic()
+        tab.get(url)
+        load_seconds = time.monotonic() - started
+        # 加载事件之后仍会有异步请求，等待一段时间再统计字节数
+        time.sleep(settle)
+        with lock:
+            return load_seconds, counts['bytes'], counts['requests'], counts['blocked']
+    finally:
+        tab.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比项目页面开启/关闭资源屏蔽时的加载耗时和流量")
+    parser.add_argument('--project', default=None, help="只测试指定项目，例如 Pharos")
+    parser.add_argument('--browsers', type=int, default=1, help="同时加载页面的浏览器数量")
+    parser.add_argument('--rounds', type=int, default=2, help="每个页面每种模式的加载轮数")
+    parser.add_argument('--settle', type=float, default=3.0, help="加载完成后继续统计流量的时间（秒）")
+    parser.add_argument('--modes', default='off,on', help="逗号分隔: off（不屏蔽）、on（按项目配置屏蔽）")
+    args = parser.parse_args()
+
+    browser_ids = AdsBrowserUtil.get_configured_user_ids()[:args.browsers]
+    if not browser_ids:
+        print("resource/browser.txt 中没有配置任何浏览器。")
+        return
+
+    controller = SmartController()
+    controller.discover_projects()
+    urls = project_urls(controller, args.project)
+    if not urls:
+        print("没有找到声明了 RESOURCE_PROFILE 的项目。")
+        return
+
+    browsers = [AdsBrowserUtil.start_browser_if_not_running(user_id) for user_id in browser_ids]
+    browsers = [browser for browser in browsers if browser]
+    executor = ThreadPoolExecutor(max_workers=len(browsers))
+
+    results = []
+    try:
+        for project, url, profile in urls:
+            for mode in args.modes.split(','):
+                mode = mode.strip()
+                AppConfig.RESOURCE_BLOCKING_ENABLED = MODES[mode]
+                samples = []
+                for _ in range(args.rounds):
+                    futures = [executor.submit(load_once, browser, url, profile, args.settle) for browser in browsers]
+                    for future in futures:
+                        try:
+                            samples.append(future.result())
+                        except Exception as e:
+                            print(f"加载 {url} 失败: {e}")
+                if not samples:
+                    continue
+                results.append({
+                    'project': project,
+                    'url': url,
+                    'mode': mode,
+                    'load_seconds': round(sum(s[0] for s in samples) / len(samples), 2),
+                    'kb_transferred': round(sum(s[1] for s in samples) / len(samples) / 1024, 1),
+                    'requests': round(sum(s[2] for s in samples) / len(samples), 1),
+                    'blocked': round(sum(s[3] for s in samples) / len(samples), 1),
+                })
+                print(results[-1])
+    finally:
+        executor.shutdown(wait=False)
+
+    print()
+    for result in results:
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
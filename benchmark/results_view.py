@@ -0,0 +1,112 @@
+"""
+任务总进度表格（TaskResultsModel + QTableView）在大量任务单元下的刷新耗时。
+
+不需要 AdsPower 环境：构造指定数量的任务单元填充表格，然后模拟前端轮询，每一轮让一部分单元
+发生状态变化并调用 update_task_progress，统计每轮"合并变化 + 处理重绘事件"的耗时。
+delta 模式只传入有变化的单元（与 get_task_changes 一致）；full 模式每轮传入全部单元的快照，
+用于确认内容未变的行不会触发重绘。每轮耗时应远小于前端的轮询间隔（2秒）。
+
+用法（在项目根目录下）:
+    python benchmark/results_view.py --units 50000
+    python benchmark/results_view.py --units 50000 --changes 2000 --ticks 30 --modes delta,full
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+# 无显示器时使用离屏平台，绘制流程与有界面时相同
+if not os.environ.get('DISPLAY') and sys.platform.startswith('linux'):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+
+from myToolApplication import TotalProgressWidget
+
+STATUSES = ('EXECUTING', 'SUCCESS', 'FAILURE', 'TIMEOUT')
+
+
+def build_units(unit_count, tasks_per_browser):
+    browser_count = max(1, unit_count // tasks_per_browser)
+    return [{'browser_id': f"browser_{i % browser_count:05d}", 'task_name': f"demo_task_{i // browser_count}_0"}
+            for i in range(unit_count)]
+
+
+def make_update(units, state, changes):
+    """随机选出 changes 个单元推进状态，返回 {browser_id: {task_name: details}}。"""
+    update = {}
+    timestamp = datetime.now().isoformat(timespec='milliseconds')
+    for unit in random.sample(units, min(changes, len(units))):
+        key = (unit['browser_id'], unit['task_name'])
+        status = 'EXECUTING' if key not in state else random.choice(STATUSES)
+        state[key] = {
+            'task_name': unit['task_name'], 'status': status,
+            'details': "" if status != 'FAILURE' else "RuntimeError: 模拟失败", 'timestamp': timestamp,
+        }
+        update.setdefault(unit['browser_id'], {})[unit['task_name']] = state[key]
+    return update
+
+
+def snapshot(state):
+    """所有已发布状态的单元（包括本轮未变化的），模拟全量快照轮询。"""
+    data = {}
+    for (browser_id, task_name), details in state.items():
+        data.setdefault(browser_id, {})[task_name] = details
+    return data
+
+
+def run_mode(app, widget, units, mode, ticks, changes):
+    state = {}
+    widget.populate_initial_tasks(list(units))
+    app.processEvents()
+    tick_ms = []
+    for _ in range(ticks):
+        update = make_update(units, state, changes)
+        if mode == 'full':
+            update = snapshot(state)
+        started = time.perf_counter()
+        widget.update_task_progress(update)
+        app.processEvents()
+        tick_ms.append((time.perf_counter() - started) * 1000)
+    tick_ms.sort()
+    return {
+        'mode': mode,
+        'units': len(units),
+        'changes_per_tick': changes,
+        'tick_ms_mean': round(statistics.mean(tick_ms), 2),
+        'tick_ms_p95': round(tick_ms[min(len(tick_ms) - 1, int(len(tick_ms) * 0.95))], 2),
+        'tick_ms_max': round(tick_ms[-1], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="测量任务总进度表格在大量任务单元下的刷新耗时")
+    parser.add_argument('--units', type=int, default=50000, help="任务单元数")
+    parser.add_argument('--tasks-per-browser', type=int, default=10, help="每个浏览器的任务单元数")
+    parser.add_argument('--changes', type=int, default=500, help="每轮轮询中状态变化的单元数")
+    parser.add_argument('--ticks', type=int, default=20, help="模拟的轮询次数")
+    parser.add_argument('--modes', default='delta,full', help="逗号分隔: delta（只传变化）、full（每轮传全量快照）")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    widget = TotalProgressWidget()
+    widget.resize(1200, 800)
+    widget.show()
+    app.processEvents()
+
+    units = build_units(args.units, args.tasks_per_browser)
+    started = time.perf_counter()
+    widget.populate_initial_tasks(list(units))
+    app.processEvents()
+    print(f"填充 {len(units)} 行耗时 {time.perf_counter() - started:.3f} 秒")
+
+    for mode in args.modes.split(','):
+        print(run_mode(app, widget, units, mode.strip(), args.ticks, args.changes))
+
+
+if __name__ == "__main__":
+    main()
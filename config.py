@@ -37,6 +37,16 @@ class AppConfig:
     # 外部资源目录，位于 exe 文件同级
     RESOURCE_DIR = os.path.join(APPLICATION_PATH, "resource")
     LOGS_DIR = os.path.join(APPLICATION_PATH, "logs")
+    # 运行数据目录（运行日志等需要跨进程保留的数据）
+    DATA_DIR = os.path.join(APPLICATION_PATH, "data")
+    RUNS_DIR = os.path.join(DATA_DIR, "runs")
+    # 任务配额账本：记录每个浏览器每个任务的成功执行时间
+    TASK_LEDGER_FILE = os.path.join(DATA_DIR, "task_ledger.json")
+    TASK_DURATION_FILE = os.path.join(DATA_DIR, "task_durations.json")
+    # 钱包选择弹窗中各站点最有效的OKX查找策略
+    SELECTOR_STRATEGY_FILE = os.path.join(DATA_DIR, "selector_strategies.json")
+    # 各浏览器的钱包解锁与dApp连接状态缓存
+    SESSION_STATE_FILE = os.path.join(DATA_DIR, "session_state.json")
     # 内部资源目录，被打包进 exe
     MY_PROJECT_DIR = os.path.join(BASE_DIR, "myProject")
 
@@ -53,6 +63,52 @@ class AppConfig:
     }
     API_HEADER_KEY = "X-API-KEY"
 
+    # 调度配置
+    # 预启动深度：在当前工作线程运行时，提前在后台启动接下来K个工作包的浏览器
+    BROWSER_PRELAUNCH_COUNT = 2
+    # 预启动深度的上限，防止同时打开过多浏览器占满内存
+    BROWSER_PRELAUNCH_MAX = 4
+    # 调度模式：'package' 每个工作线程领取一个浏览器的完整任务列表；
+    # 'task_queue' 按(浏览器, 任务)单元从共享队列领取，失败单元可重新排队
+    DEFAULT_SCHEDULER_MODE = "package"
+    # task_queue 模式下单个任务单元/浏览器的最大重新排队次数
+    TASK_REQUEUE_LIMIT = 1
+
+    # 任务超时配置（秒）：未通过 task_annotation.timeout 声明超时的任务使用默认值
+    DEFAULT_TASK_TIMEOUT = 900
+    # 浏览器准备阶段（排列窗口、注入补丁、解锁钱包）的超时
+    BROWSER_PREPARE_TIMEOUT = 300
+    # 看门狗检查间隔（秒）
+    WATCHDOG_INTERVAL = 5.0
+    # 为被看门狗回收的卡死线程预留的额外线程数
+    STUCK_WORKER_RESERVE = 4
+
+    # 调度后端："thread" 所有浏览器工作线程运行在主进程；"process" 按浏览器分片到多个子进程
+    DEFAULT_DISPATCHER_BACKEND = "thread"
+    SLOTS_PER_PROCESS = 4  # 多进程后端下每个子进程负责的槽位数
+
+    # 自适应并发配置：并发上限在用户设定的最小值与最大值之间动态调整
+    ADAPTIVE_INTERVAL = 15.0  # 决策间隔（秒）
+    ADAPTIVE_SAMPLE_WINDOW = 20  # 参与统计的最近任务数
+    ADAPTIVE_MIN_SAMPLES = 3  # 任务样本少于该值时只参考主机负载
+    ADAPTIVE_CPU_HIGH = 0.85
+    ADAPTIVE_CPU_LOW = 0.60
+    ADAPTIVE_MEM_AVAILABLE_LOW = 0.15
+    ADAPTIVE_TIMEOUT_RATE_HIGH = 0.2
+    ADAPTIVE_SLOWDOWN_RATIO = 1.5  # 最近任务耗时与各自任务基线之比的中位数超过该倍数时视为变慢
+
+    # 运行日志配置：非终态记录最多缓冲的条数和定时刷盘间隔（秒）
+    JOURNAL_FLUSH_BATCH = 50
+    JOURNAL_FLUSH_INTERVAL = 2.0
+
+    # 任务账本中执行记录的保留天数（需不小于最长的配额窗口）
+    TASK_LEDGER_RETENTION_DAYS = 7
+    # 是否按配额账本跳过已满足配额的任务单元；基准测试需要重复执行同一任务时关闭（成功执行仍会记账）
+    TASK_QUOTA_ENFORCED = True
+    # 任务耗时模型：每个任务保留最近多少次耗时；没有历史记录的任务按默认耗时（秒）估算
+    TASK_DURATION_WINDOW = 50
+    TASK_DURATION_DEFAULT = 120.0
+
     # 数据格式配置
     DATA_SEPARATOR = ":"
 
@@ -65,6 +121,8 @@ class AppConfig:
     # 日志配置
     LOG_FILENAME_PREFIX = "myTool"
     LOG_FILENAME_FORMAT = "{prefix}_{timestamp}.log"
+    LOG_VIEW_MAX_LINES = 5000  # 界面日志区最多保留的行数，超出后丢弃最早的行
+    LOG_VIEW_FLUSH_INTERVAL_MS = 200  # 界面日志批量刷新的间隔（毫秒），期间到达的日志合并为一次追加
 
     # 验证配置
     API_URL_VALID_PREFIXES = ("http://",)
@@ -72,6 +130,59 @@ class AppConfig:
     # 扩展配置
     OKX_EXTENSION_ID = "mcohilncbfahbmgdjkbpemcciiolgcge"
 
+    # 钱包弹窗检测：True 时通过CDP Target事件感知弹窗，False 时使用旧的 get_tabs 轮询（用于对比）
+    TAB_REGISTRY_ENABLED = True
+    WALLET_POPUP_TIMEOUT = 10  # 等待钱包弹窗出现的最长时间（秒）
+    # 每个浏览器最多同时打开的普通页面数，超出时按最近最少使用关闭项目脚本打开的页面
+    MAX_TABS_PER_BROWSER = 4
+    # 窗口布局：'grid' 按并发数平铺（任意数量，窗口小于最小尺寸时错开叠放），'cascade' 同一尺寸层叠错开
+    WINDOW_LAYOUT_MODE = "grid"
+    WINDOW_MIN_WIDTH = 440
+    WINDOW_MIN_HEIGHT = 340
+    # 焦点模拟：对每个自动化页面开启CDP焦点模拟并以关闭后台节流的参数启动浏览器，
+    # 重叠或被遮挡的窗口不会被 Chrome 当作后台页面降频
+    FOCUS_EMULATION_ENABLED = True
+    # 资源屏蔽：项目类通过 RESOURCE_PROFILE 声明要屏蔽的资源类型和URL模式，在打开项目页面时生效。
+    # False 时所有页面加载全部资源（用于对比加载耗时和流量）
+    RESOURCE_BLOCKING_ENABLED = True
+    # 多选择器竞速等待（ElementUtil.race）每轮查找之间的间隔（秒）
+    ELEMENT_RACE_POLL_INTERVAL = 0.3
+    # 批量页面探测：True 时多选择器等待通过每个标签页预装的 dom_probe.js 一次往返查询所有选择器，
+    # False 时逐个 ele() 查找（用于对比CDP消息数）
+    DOM_PROBE_ENABLED = True
+    # 统计每个任务发出的CDP消息数（通过包装 DrissionPage 驱动实现，仅用于基准测试）
+    CDP_MESSAGE_COUNTING = False
+    # 钱包选择弹窗查找OKX：首选策略的等待时间、其余备选策略的等待时间（秒），
+    # 以及记住的策略连续失败多少次后作废重新学习
+    OKX_SELECTOR_TIMEOUT = 10
+    OKX_SELECTOR_FALLBACK_TIMEOUT = 3
+    SELECTOR_STRATEGY_MAX_FAILURES = 3
+    # 会话状态缓存：钱包解锁状态和dApp连接状态的有效期（秒），以及缓存新鲜时廉价探测的等待时间（秒）
+    SESSION_UNLOCK_TTL = 30 * 60
+    SESSION_CONNECT_TTL = 6 * 60 * 60
+    SESSION_PROBE_TIMEOUT = 3
+    # 浏览器内存管控：每两个任务之间通过CDP Performance.getMetrics 采样各页面的JS堆、DOM节点数和文档数，
+    # 并采样浏览器进程树的常驻内存（RSS，使用 psutil，未安装时 Linux 读取 /proc）。JS堆或DOM节点超出预算时回收标签页，
+    # 回收后仍超出或RSS超出预算时重启浏览器
+    MEMORY_GOVERNOR_ENABLED = True
+    MEMORY_JS_HEAP_BUDGET_MB = 512
+    MEMORY_DOM_NODES_BUDGET = 150000
+    MEMORY_RSS_BUDGET_MB = 2048
+
+    # 无显示器模式：True/False 强制开启/关闭，None 时在没有 DISPLAY/WAYLAND_DISPLAY 的 Linux 上自动开启。
+    # 开启后调度器不排列窗口、不读取屏幕尺寸，也不导入 pyautogui 等GUI依赖
+    HEADLESS_MODE = None
+
+    # 无显示器模式下通过 AdsPower API 以 headless 方式启动浏览器
+    ADS_HEADLESS_BROWSER = True
+
+    @staticmethod
+    def is_headless() -> bool:
+        """当前是否运行在无显示器模式。"""
+        if AppConfig.HEADLESS_MODE is not None:
+            return bool(AppConfig.HEADLESS_MODE)
+        return sys.platform.startswith('linux') and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
     @staticmethod
     def get_resource_path(relative_path):
         """
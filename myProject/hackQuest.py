@@ -1,6 +1,9 @@
 from util.anti_sybil_dp_util import AntiSybilDpUtil
 from util.log_util import log_util
+from util.element_util import ElementUtil
 from util.okx_wallet_util import OKXWalletUtil
+from util.resource_blocker import ResourceBlocker
+from util.tab_manager import TabManager
 from annotation.task_annotation import task_annotation
 
 class HackQuestScript:
@@ -10,6 +13,8 @@ class HackQuestScript:
 
     project_name = "HackQuest"
     HACK_QUEST_URL = "https://www.hackquest.io/zh-cn/quest"
+    # 打开项目页面时屏蔽脚本用不到的图片、字体、视频和统计分析脚本
+    RESOURCE_PROFILE = ResourceBlocker.DAPP_PROFILE
 
     def __init__(self, browser, user_id: str, window_height: int = 800):
         """
@@ -20,6 +25,7 @@ class HackQuestScript:
         self.user_id = user_id
         self.window_height = window_height
         self.okx_util = OKXWalletUtil()
+        self.tabs = TabManager.for_browser(browser)
 
         try:
             # 步骤1: 为浏览器实例注入反女巫检测脚本
@@ -32,13 +38,7 @@ class HackQuestScript:
                 AntiSybilDpUtil.patch_webdriver_fingerprint(page_for_cdp)
 
             # 步骤2: 获取HackQuest主页的页面对象
-            tabs = self.browser.get_tabs(url=self.HACK_QUEST_URL)
-            if tabs:
-                self.page = tabs[0]
-                self.page.set.activate()
-                self.page.refresh()
-            else:
-                self.page = self.browser.new_tab(self.HACK_QUEST_URL)
+            self.page = self.tabs.open(self.HACK_QUEST_URL, profile=self.RESOURCE_PROFILE)
 
             # 步骤3: 等待页面加载并执行反女巫模拟真人操作
             self.page.wait.load_start()
@@ -56,24 +56,23 @@ class HackQuestScript:
     def hackquest_task_check_in(self):
         log_util.info(self.user_id, f"任务开始: {self.project_name} - 每日签到")
         try:
-            tabs = self.browser.get_tabs(url=self.HACK_QUEST_URL)
-            quest_page = None
-            if tabs:
-                quest_page = tabs[0]
-                quest_page.set.activate()
-            else:
-                quest_page = self.browser.new_tab(self.HACK_QUEST_URL)
-                quest_page.wait.load_start()
+            quest_page = self.tabs.open(self.HACK_QUEST_URL, refresh=False, profile=self.RESOURCE_PROFILE)
+            quest_page.wait.load_start()
 
             quest_page.scroll.to_rightmost()
             AntiSybilDpUtil.human_long_wait()
 
             # 登录
             # 使用更稳定、更精确的XPath，并大幅增加超时时间
+            # 已登录时签到卡片会直接出现，与登录按钮同时等待，避免白等登录按钮超时
             login_xpath = '//button[span[text()="登录"]]'
-            log_in_btn = quest_page.ele(f'xpath:{login_xpath}', timeout=10)
-            if log_in_btn and log_in_btn.states.is_clickable:
-                log_in_btn.click()
+            check_in_xpath = '//div[contains(@class, "rounded-2xl") and .//p[text()="当前连续登录"]]'
+            login_state = ElementUtil.race(quest_page, {
+                'login': f'xpath:{login_xpath}',
+                'logged_in': f'xpath:{check_in_xpath}',
+            }, timeout=10, require_clickable={'login'})
+            if login_state.key == 'login':
+                login_state.element.click()
                 AntiSybilDpUtil.human_short_wait()
                 metamask_xpath = '//button[contains(., "使用 Metamask 登录")]'
                 wallet_btn = quest_page.ele(f'xpath:{metamask_xpath}', timeout=10)
@@ -89,7 +88,6 @@ class HackQuestScript:
             if scrollable_component:
                 scrollable_component.scroll.down(400)
             # 步骤1: 使用“当前连续登录”作为锚点，定位到任务的div容器
-            check_in_xpath = '//div[contains(@class, "rounded-2xl") and .//p[text()="当前连续登录"]]'
             check_in_container = quest_page.ele(f'xpath:{check_in_xpath}', timeout=10)
             # 检查任务是否已经完成
             if "已领取" in check_in_container.text:
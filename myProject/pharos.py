@@ -1,8 +1,11 @@
-import time
 from DrissionPage import ChromiumPage
 from util.okx_wallet_util import OKXWalletUtil
 from util.anti_sybil_dp_util import AntiSybilDpUtil
+from util.cancel_util import CancelUtil
+from util.element_util import ElementUtil
 from util.log_util import log_util
+from util.resource_blocker import ResourceBlocker
+from util.tab_manager import TabManager
 from util.wallet_util import WalletUtil
 from annotation.task_annotation import task_annotation
 from datetime import datetime
@@ -18,6 +21,8 @@ class PharosScript:
     FARO_SWAP_URL = "https://faroswap.xyz/swap"
     NAME_URL = "https://test.pharosname.com/"
     CFD_URL = "https://app.brokex.trade/"
+    # 打开项目页面时屏蔽脚本用不到的图片、字体、视频和统计分析脚本
+    RESOURCE_PROFILE = ResourceBlocker.DAPP_PROFILE
 
     def __init__(self, browser, user_id: str, window_height: int = 800):
         """
@@ -29,6 +34,7 @@ class PharosScript:
         self.user_id = user_id
         self.okx_util = OKXWalletUtil()
         self.wallet_util = WalletUtil()
+        self.tabs = TabManager.for_browser(browser)
         self.window_height = window_height
 
         try:
@@ -42,47 +48,48 @@ class PharosScript:
                 AntiSybilDpUtil.patch_webdriver_fingerprint(page_for_cdp)
 
             # 步骤2: 获取Pharos主页的页面对象
-            tabs = self.browser.get_tabs(url=self.PHAROS_URL)
-            if tabs:
-                self.page = tabs[0]
-                self.page.set.activate()
-                self.page.refresh()
-            else:
-                self.page = self.browser.new_tab(self.PHAROS_URL)
+            self.page = self.tabs.open(self.PHAROS_URL, profile=self.RESOURCE_PROFILE)
             self.page.wait.load_start()
 
             # 步骤3: 人性化等待和交互
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_network_idle(self.page),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
             self._handle_switch_network_popup(self.page)
             AntiSybilDpUtil.simulate_random_click(self.page, self.user_id)
             AntiSybilDpUtil.human_brief_wait()
             AntiSybilDpUtil.simulate_mouse_move(self.page)
             
-            # 步骤4: 连接钱包
-            connect_btn = self.page.ele('text:Connect Wallet', timeout=10)
-            if connect_btn:
-                connect_btn.click()
-                AntiSybilDpUtil.human_short_wait()
+            # 步骤4: 连接钱包（会话缓存确认已连接时跳过检测；已显示地址说明已连接，无需等待连接按钮超时）
+            if not self.okx_util.is_connection_cached(self.page, self.user_id):
+                wallet_state = ElementUtil.race(self.page, {
+                    'connect': 'text:Connect Wallet',
+                    'address': 'xpath://span[starts-with(text(), "0x")]',
+                }, timeout=10)
+                if wallet_state.key == 'address':
+                    self.okx_util.remember_connection(self.page, self.user_id)
+                elif wallet_state.key == 'connect':
+                    wallet_state.element.click()
+                    AntiSybilDpUtil.human_short_wait()
                 
-                try:
-                    self.okx_util.click_OKX_in_selector(self.browser, self.page, self.user_id)
-                except Exception as e:
-                    if "未找到任何OKX钱包页面" in str(e):
-                        AntiSybilDpUtil.human_short_wait()
-                        address_element = self.page.ele('xpath://span[starts-with(text(), "0x")]', timeout=5)
-                        if not address_element:
+                    try:
+                        self.okx_util.click_OKX_in_selector(self.browser, self.page, self.user_id)
+                    except Exception as e:
+                        if "未找到任何OKX钱包页面" in str(e):
+                            AntiSybilDpUtil.human_short_wait()
+                            address_element = self.page.ele('xpath://span[starts-with(text(), "0x")]', timeout=5)
+                            if not address_element:
+                                raise e
+                        else:
                             raise e
-                    else:
-                        raise e
-                AntiSybilDpUtil.human_short_wait()
-                self._handle_switch_network_popup(self.page)
-                # 处理可选的"Continue"按钮
-                continue_btn = self.page.ele('text:Continue', timeout=10)
-                if continue_btn and continue_btn.states.is_clickable:
-                    continue_btn.click()
-                    AntiSybilDpUtil.human_long_wait()
-                    # 最终确认钱包连接
-                    self.okx_util.confirm_transaction_drission(self.browser, self.user_id)
+                    AntiSybilDpUtil.human_short_wait()
+                    self._handle_switch_network_popup(self.page)
+                    # 处理可选的"Continue"按钮
+                    continue_btn = self.page.ele('text:Continue', timeout=10)
+                    if continue_btn and continue_btn.states.is_clickable:
+                        continue_btn.click()
+                        AntiSybilDpUtil.human_long_wait()
+                        # 最终确认钱包连接
+                        self.okx_util.confirm_transaction_drission(self.browser, self.user_id)
 
         except Exception as e:
             log_util.error(self.user_id, f"项目 '{self.project_name}' 初始化失败: {e}", exc_info=True)
@@ -110,32 +117,35 @@ class PharosScript:
         log_util.info(self.user_id, "开始执行签到任务...")
         try:
             # 任务开始前，获取或导航到Pharos主页
-            tabs = self.browser.get_tabs(url=self.PHAROS_URL)
-            if tabs:
-                self.page = tabs[0]
-                self.page.set.activate()
-                self.page.refresh()
-            else:
-                self.page = self.browser.new_tab(self.PHAROS_URL)
+            self.page = self.tabs.open(self.PHAROS_URL, profile=self.RESOURCE_PROFILE)
 
             # 步骤1: 切换网络
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_network_idle(self.page),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
             self._handle_switch_network_popup(self.page)
             self.page.wait.doc_loaded()
 
-            # 步骤2: 如果找到按钮，则点击并刷新
-            checkin_btn = self.page.ele(
-                'xpath://button[contains(text(), "Check in")]', timeout=20
-            )
-            checkin_btn.wait.clickable(timeout=20).click()
+            # 步骤2: 同时等待 "Check in" 和 "Checked"，已签到时不必等 "Check in" 超时
+            checkin_state = ElementUtil.race(self.page, {
+                'checked': 'xpath://button[contains(text(), "Checked")]',
+                'checkin': 'xpath://button[contains(text(), "Check in")]',
+            }, timeout=20)
+            if checkin_state.key == 'checked' and checkin_state.visible:
+                log_util.info(self.user_id, "—————— 签到任务已成功完成（之前已签到） ——————")
+                return True
+            if checkin_state.key != 'checkin':
+                message = "未找到'Check in'或'Checked'按钮，请检查。"
+                log_util.error(self.user_id, message)
+                return message
+            checkin_state.element.wait.clickable(timeout=20).click()
 
             # 步骤3: 验证按钮状态是否变为 "Checked"
             AntiSybilDpUtil.human_short_wait()
-            checked_btn = self.page.ele(
-                'xpath://button[contains(text(), "Checked")]', timeout=10
-            )
+            checked_state = ElementUtil.race(self.page, {
+                'checked': 'xpath://button[contains(text(), "Checked")]',
+            }, timeout=10)
 
-            if checked_btn and checked_btn.states.is_displayed:
+            if checked_state.visible:
                 log_util.info(self.user_id, "—————— 签到任务已成功完成 ——————")
                 return True
             else:
@@ -168,35 +178,38 @@ class PharosScript:
         swap_page = None
         try:
             # 步骤1: 打开新的SWAP_URL页面
-            swap_page = self.browser.new_tab(self.ZENITH_SWAP_URL)
+            swap_page = self.tabs.open(self.ZENITH_SWAP_URL, profile=self.RESOURCE_PROFILE)
 
             # 步骤2: 人性化等待和页面刷新
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_network_idle(swap_page),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
             swap_page.refresh()
             swap_page.wait.load_start()
             AntiSybilDpUtil.human_short_wait()
 
             # 步骤3: 检查钱包是否已连接（新逻辑）
-            # 优先查找页面上是否已有 "0x" 开头的地址，这是已连接的明确标志
-            address_element = swap_page.ele('xpath://span[starts-with(text(), "0x")]', timeout=10)
-            if not (address_element and address_element.states.is_displayed):
-                # 如果未找到地址，则执行连接钱包的流程
-                connect_btn = swap_page.ele(
-                    'xpath://button[@data-testid="navbar-connect-wallet"]',
-                    timeout=15
-                )
-                if connect_btn and connect_btn.states.is_displayed:
-                    connect_btn.click()
-                    AntiSybilDpUtil.human_short_wait()
-                    if not self.okx_util.click_OKX_in_selector2(self.browser, swap_page, self.user_id):
-                        message = "执行OKX钱包连接流程失败。"
+            if not self.okx_util.is_connection_cached(swap_page, self.user_id):
+                # 同时查找 "0x" 开头的地址（已连接的明确标志）和连接按钮，地址优先
+                wallet_state = ElementUtil.race(swap_page, {
+                    'address': 'xpath://span[starts-with(text(), "0x")]',
+                    'connect': 'xpath://button[@data-testid="navbar-connect-wallet"]',
+                }, timeout=15)
+                if wallet_state.key == 'address' and wallet_state.visible:
+                    self.okx_util.remember_connection(swap_page, self.user_id)
+                else:
+                    # 如果未找到地址，则执行连接钱包的流程
+                    if wallet_state.key == 'connect' and wallet_state.visible:
+                        wallet_state.element.click()
+                        AntiSybilDpUtil.human_short_wait()
+                        if not self.okx_util.click_OKX_in_selector2(self.browser, swap_page, self.user_id):
+                            message = "执行OKX钱包连接流程失败。"
+                            log_util.error(self.user_id, message)
+                            return message
+                    else:
+                        # 如果连 "Connect" 按钮也找不到，说明页面可能有问题
+                        message = "未找到钱包地址，也未找到'Connect'按钮，页面异常。"
                         log_util.error(self.user_id, message)
                         return message
-                else:
-                    # 如果连 "Connect" 按钮也找不到，说明页面可能有问题
-                    message = "未找到钱包地址，也未找到'Connect'按钮，页面异常。"
-                    log_util.error(self.user_id, message)
-                    return message
 
             # 步骤4: 等待代币数量加载
             swap_page.wait.doc_loaded()
@@ -241,7 +254,9 @@ class PharosScript:
 
             # 步骤8: 等待兑换率计算完成
             swap_page.wait.doc_loaded()
-            AntiSybilDpUtil.human_huge_wait() # 使用长等待，给网页足够的时间返回汇率
+            # 汇率返回后Swap按钮才可点击
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(swap_page, '#swap-button', clickable=True),
+                                             timeout=20, baseline=AntiSybilDpUtil.HUGE_WAIT)
 
             # 步骤9: 点击Swap按钮
             swap_btn = swap_page.ele('#swap-button', timeout=30)
@@ -250,7 +265,8 @@ class PharosScript:
                 log_util.error(self.user_id, message)
                 return message
             swap_btn.wait.clickable(timeout=20).click()
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(swap_page, '#confirm-swap-or-send'),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
 
             # 步骤10: 在弹窗中点击 "Confirm Swap" 
             confirm_swap_btn = swap_page.ele('#confirm-swap-or-send', timeout=30)
@@ -304,11 +320,13 @@ class PharosScript:
                 AntiSybilDpUtil.simulate_typing(swap_page, random_amount_str)
 
             swap_page.wait.doc_loaded()
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(swap_page, '#swap-button', clickable=True),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
 
             swap_btn2 = swap_page.ele('#swap-button', timeout=30)
             swap_btn2.wait.clickable(timeout=20).click()
-            AntiSybilDpUtil.human_huge_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(swap_page, '#confirm-swap-or-send'),
+                                             timeout=20, baseline=AntiSybilDpUtil.HUGE_WAIT)
 
             new_confirm_swap_btn = swap_page.ele('#confirm-swap-or-send', timeout=30)
             new_confirm_swap_btn.wait.clickable(timeout=20).click()
@@ -345,9 +363,8 @@ class PharosScript:
             log_util.error(self.user_id, message, exc_info=True)
             return message
         finally:
-            # 任务结束后关闭页面
-            if swap_page and swap_page.tab_id in self.browser.tab_ids:
-                swap_page.close()
+            # 任务结束后把页面交还标签页池，留待下次复用
+            self.tabs.release(swap_page)
 
     def pharos_task_faro_swap(self):
         """
@@ -357,20 +374,31 @@ class PharosScript:
         swap_page = None
         try:
             # 步骤1: 打开新的SWAP_URL页面
-            swap_page = self.browser.new_tab(self.FARO_SWAP_URL)
-            AntiSybilDpUtil.human_huge_wait()
+            swap_page = self.tabs.open(self.FARO_SWAP_URL, profile=self.RESOURCE_PROFILE)
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(
+                swap_page, 'css:input.css-1fkmsfz', 'xpath://button[contains(text(), "Connect a wallet")]'),
+                timeout=20, baseline=AntiSybilDpUtil.HUGE_WAIT)
 
             # 步骤2: 检查并连接钱包
-            connected_button = swap_page.ele('xpath://button[contains(text(), "0x")]', timeout=5)
-            pending_button = swap_page.ele('button:has-text("pending")', timeout=5)
-            if not ((connected_button and connected_button.states.is_displayed) or (pending_button and pending_button.states.is_displayed)):
-                connect_btn = swap_page.ele('xpath://button[contains(text(), "Connect a wallet")]', timeout=10)
-                connect_btn.click()
-                AntiSybilDpUtil.human_short_wait()
-                self.okx_util.click_OKX_in_selector(self.browser, swap_page, self.user_id)
+            if not self.okx_util.is_connection_cached(swap_page, self.user_id):
+                wallet_state = ElementUtil.race(swap_page, {
+                    'connected': 'xpath://button[contains(text(), "0x")]',
+                    'pending': 'button:has-text("pending")',
+                    'connect': 'xpath://button[contains(text(), "Connect a wallet")]',
+                }, timeout=10)
+                if wallet_state.key in ('connected', 'pending') and wallet_state.visible:
+                    self.okx_util.remember_connection(swap_page, self.user_id)
+                else:
+                    if wallet_state.key == 'connect':
+                        connect_btn = wallet_state.element
+                    else:
+                        connect_btn = swap_page.ele('xpath://button[contains(text(), "Connect a wallet")]', timeout=10)
+                    connect_btn.click()
+                    AntiSybilDpUtil.human_short_wait()
+                    self.okx_util.click_OKX_in_selector(self.browser, swap_page, self.user_id)
 
             swap_page.actions.key_down("Escape")
-            time.sleep(0.1)
+            CancelUtil.sleep(0.1)
             swap_page.actions.key_up("Escape")
 
             # 步骤3: 确保要卖出的代币是 PHRS
@@ -399,7 +427,9 @@ class PharosScript:
             AntiSybilDpUtil.human_brief_wait()
             random_amount_str = AntiSybilDpUtil.get_perturbation_number(0.006, 0.001)
             AntiSybilDpUtil.simulate_typing(swap_page, random_amount_str)
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(
+                swap_page, 'xpath://button[@data-testid="swap-review-btn"]', clickable=True),
+                timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
 
             # 步骤6: 点击 Review Swap 按钮 (在15秒内持续查找)
             review_button = swap_page.ele('xpath://button[@data-testid="swap-review-btn"]', timeout=30)
@@ -408,7 +438,8 @@ class PharosScript:
                 log_util.error(self.user_id, message)
                 return message
             swap_page.actions.click(review_button)
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(
+                swap_page, "xpath://button[text()='Confirm swap']"), timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
 
             # 步骤7: 点击 Confirm Swap 按钮 (在15秒内持续查找)
             confirm_button = swap_page.ele("xpath://button[text()='Confirm swap']", timeout=30)
@@ -424,7 +455,7 @@ class PharosScript:
             AntiSybilDpUtil.human_huge_wait()
 
             swap_page.actions.key_down("Escape")
-            time.sleep(0.1)
+            CancelUtil.sleep(0.1)
             swap_page.actions.key_up("Escape")
             AntiSybilDpUtil.simulate_random_click(swap_page, self.user_id)
 
@@ -463,8 +494,7 @@ class PharosScript:
             log_util.error(self.user_id, message, exc_info=True)
             return message
         finally:
-            if swap_page and swap_page.tab_id in self.browser.tab_ids:
-                swap_page.close()
+            self.tabs.release(swap_page)
 
     def pharos_task_send_tokens(self):
         """
@@ -473,13 +503,7 @@ class PharosScript:
         log_util.info(self.user_id, "开始执行发送代币任务...")
         try:
             # 任务开始前，获取或导航到Pharos主页
-            tabs = self.browser.get_tabs(url=self.PHAROS_URL)
-            if tabs:
-                self.page = tabs[0]
-                self.page.set.activate()
-                self.page.refresh()
-            else:
-                self.page = self.browser.new_tab(self.PHAROS_URL)
+            self.page = self.tabs.open(self.PHAROS_URL, profile=self.RESOURCE_PROFILE)
 
             # 步骤1: 等待页面加载完成并查找'Send'按钮
             self.page.wait.load_start()
@@ -496,7 +520,8 @@ class PharosScript:
 
             # 步骤2: 点击Send按钮
             self.page.actions.click(send_button)
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(
+                self.page, 'xpath://div[text()="0.001PHRS"]'), timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
             # 步骤3: 点击金额选项
             amount_option = self.page.ele('xpath://div[text()="0.001PHRS"]', timeout=30) # type: ignore
             if not amount_option or not amount_option.states.is_displayed:
@@ -514,7 +539,9 @@ class PharosScript:
                 return message
             random_address = self.wallet_util.generate_random_evm_address()
             address_input.input(random_address)
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_element(
+                self.page, 'xpath://button[text()="Send PHRS"]', clickable=True),
+                timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
 
             # 步骤5: 点击最终的“Send PHRS”按钮
             final_send_button = self.page.ele('xpath://button[text()="Send PHRS"]', timeout=10) # type: ignore
@@ -552,28 +579,27 @@ class PharosScript:
         name_page = None
         try:
             # 步骤1: 获取或打开NAME_URL页面
-            tabs = self.browser.get_tabs(url=self.NAME_URL)
-            if tabs:
-                name_page = tabs[0]
-                name_page.set.activate()
-                name_page.refresh()
-            else:
-                name_page = self.browser.new_tab(self.NAME_URL)
+            name_page = self.tabs.open(self.NAME_URL, profile=self.RESOURCE_PROFILE)
             
             name_page.wait.load_start()
             AntiSybilDpUtil.human_short_wait()
 
             # 步骤2: 确保钱包已连接
-            profile_element = name_page.ele('xpath://div[@data-testid="header-profile"]', timeout=10)
-            if not profile_element:
-                log_util.info(self.user_id, "钱包未连接，开始连接流程...")
-                connect_btn = name_page.ele('xpath://*[text()="连接" or text()="Connect"]', timeout=10)
-                if connect_btn:
-                    connect_btn.click()
-                    AntiSybilDpUtil.human_short_wait()
-                    self.okx_util.click_OKX_in_selector(self.browser, name_page, self.user_id)
-                    AntiSybilDpUtil.human_short_wait()
-            
+            if not self.okx_util.is_connection_cached(name_page, self.user_id):
+                wallet_state = ElementUtil.race(name_page, {
+                    'profile': 'xpath://div[@data-testid="header-profile"]',
+                    'connect': 'xpath://*[text()="连接" or text()="Connect"]',
+                }, timeout=10)
+                if wallet_state.key == 'profile':
+                    self.okx_util.remember_connection(name_page, self.user_id)
+                else:
+                    log_util.info(self.user_id, "钱包未连接，开始连接流程...")
+                    if wallet_state.key == 'connect':
+                        wallet_state.element.click()
+                        AntiSybilDpUtil.human_short_wait()
+                        self.okx_util.click_OKX_in_selector(self.browser, name_page, self.user_id)
+                        AntiSybilDpUtil.human_short_wait()
+
             # 步骤3: 循环查找可用用户名并注册
             name_page.scroll.down(80)
             name_input = name_page.ele('xpath://input[@id="thorin2"]', timeout=10)
@@ -587,14 +613,16 @@ class PharosScript:
                 AntiSybilDpUtil.simulate_typing(name_page, user_name, self.user_id)
                 AntiSybilDpUtil.human_long_wait()
 
-                # 等待异步验证结果
-                unavailable_notice = name_page.ele('xpath://*[text()="不可用" or text()="Not Supported"] or text()="Unavailable"]', timeout=10)
-                if unavailable_notice:
+                # 等待异步验证结果：不可用与可注册两种结果同时等待
+                name_state = ElementUtil.race(name_page, {
+                    'unavailable': 'xpath://*[text()="不可用" or text()="Not Supported" or text()="Unavailable"]',
+                    'available': 'xpath://*[text()="可注册" or text()="Available"]',
+                }, timeout=10)
+                if name_state.key == 'unavailable':
                     continue  # 名称不可用，直接开始下一次循环
 
-                available_button = name_page.ele('xpath://*[text()="可注册" or text()="Available"]', timeout=10)
-                if available_button:
-                    available_button.click()
+                if name_state.key == 'available':
+                    name_state.element.click()
                     AntiSybilDpUtil.human_long_wait()
                     break
 
@@ -615,7 +643,7 @@ class PharosScript:
             for _ in range(55):
                 actions.key_down('up')
                 actions.key_up('up')
-                time.sleep(0.08)
+                CancelUtil.sleep(0.08)
             AntiSybilDpUtil.human_short_wait()
             name_page.actions.key_down('enter').key_up('enter')
             AntiSybilDpUtil.human_short_wait()
@@ -663,8 +691,7 @@ class PharosScript:
             log_util.error(self.user_id, message, exc_info=True)
             return message
         finally:
-            if name_page and name_page.tab_id in self.browser.tab_ids:
-                name_page.close()
+            self.tabs.release(name_page)
 
     def pharos_task_cfd_trading(self):
         """
@@ -675,7 +702,7 @@ class PharosScript:
         message = None
         try:
             # 步骤1: 获取或打开NAME_URL页面
-            cfd_trading_page = self.browser.new_tab(self.CFD_URL)
+            cfd_trading_page = self.tabs.open(self.CFD_URL, profile=self.RESOURCE_PROFILE)
             AntiSybilDpUtil.human_long_wait()
             if cfd_trading_page.ele('text:contains=Brokex Protocol is currently not available on mobile'):
                 return False
@@ -725,8 +752,7 @@ class PharosScript:
             log_util.error(self.user_id, message, exc_info=True)
             return message
         finally:
-            if cfd_trading_page and cfd_trading_page.tab_id in self.browser.tab_ids:
-                cfd_trading_page.close()
+            self.tabs.release(cfd_trading_page)
 
 
 if __name__ == "__main__":
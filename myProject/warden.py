@@ -1,10 +1,12 @@
 import random
-import time
 from datetime import datetime
 from util.anti_sybil_dp_util import AntiSybilDpUtil
+from util.cancel_util import CancelUtil
 from util.log_util import log_util
 from annotation.task_annotation import task_annotation
 from util.okx_wallet_util import OKXWalletUtil
+from util.resource_blocker import ResourceBlocker
+from util.tab_manager import TabManager
 
 
 class WardenScript:
@@ -15,6 +17,8 @@ class WardenScript:
     project_name = "Warden"
     WARDEN_URL = "https://app.wardenprotocol.org/earn"
     WARDEN_AI_CHAT_URL = "https://app.wardenprotocol.org/dashboard"
+    # 打开项目页面时屏蔽脚本用不到的图片、字体、视频和统计分析脚本
+    RESOURCE_PROFILE = ResourceBlocker.DAPP_PROFILE
 
     def __init__(self, browser, user_id: str, window_height: int = 800):
         """
@@ -25,6 +29,7 @@ class WardenScript:
         self.user_id = user_id
         self.window_height = window_height
         self.okx_util = OKXWalletUtil()
+        self.tabs = TabManager.for_browser(browser)
 
         try:
             # 步骤1: 为浏览器实例注入反女巫检测脚本
@@ -37,22 +42,18 @@ class WardenScript:
                 AntiSybilDpUtil.patch_webdriver_fingerprint(page_for_cdp)
 
             # 步骤2: 获取Warden主页的页面对象
-            tabs = self.browser.get_tabs(url=self.WARDEN_URL)
-            if tabs:
-                self.page = tabs[0]
-                self.page.set.activate()
-                self.page.refresh()
-            else:
-                self.page = self.browser.new_tab(self.WARDEN_URL)
+            self.page = self.tabs.open(self.WARDEN_URL, profile=self.RESOURCE_PROFILE)
 
             # 步骤3: 等待页面加载并检查是否需要重新登录
             self.page.wait.load_start()
-            AntiSybilDpUtil.human_long_wait()
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_network_idle(self.page),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
             
             # 新增逻辑：检查URL是否为认证页面
             if "auth" in self.page.url:
                 self.okx_util.click_OKX_in_selector(self.browser, self.page, self.user_id)
-                AntiSybilDpUtil.human_long_wait()
+                AntiSybilDpUtil.human_wait_until(lambda: "auth" not in self.page.url,
+                                                 timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
                 # 重新验证URL是否已离开auth页面
                 if "auth" in self.page.url:
                     raise Exception("尝试重新登录后，页面仍停留在认证页，初始化失败。")
@@ -76,13 +77,7 @@ class WardenScript:
         chat_page = None
         try:
             # 步骤1: 获取AI聊天页面的页面对象
-            tabs = self.browser.get_tabs(url=self.WARDEN_AI_CHAT_URL)
-            if tabs:
-                chat_page = tabs[0]
-                chat_page.set.activate()
-                chat_page.refresh()
-            else:
-                chat_page = self.browser.new_tab(self.WARDEN_AI_CHAT_URL)
+            chat_page = self.tabs.open(self.WARDEN_AI_CHAT_URL, profile=self.RESOURCE_PROFILE)
 
             AntiSybilDpUtil.human_short_wait()
 
@@ -104,7 +99,9 @@ class WardenScript:
             
             # 模拟回车发送
             chat_page.actions.key_down('enter').key_up('enter')
-            AntiSybilDpUtil.human_long_wait()  # 等待AI响应
+            # 等待AI响应：回复流式输出结束后网络才会空闲
+            AntiSybilDpUtil.human_wait_until(AntiSybilDpUtil.ready_network_idle(chat_page, quiet=3),
+                                             timeout=12, baseline=AntiSybilDpUtil.LONG_WAIT)
 
             log_util.info(self.user_id, f"任务成功: {self.project_name} - AI Chat")
             return True
@@ -115,8 +112,7 @@ class WardenScript:
             log_util.error(self.user_id, message, exc_info=True)
             return message
         finally:
-            if chat_page and chat_page.tab_id in self.browser.tab_ids:
-                chat_page.close()
+            self.tabs.release(chat_page)
 
     @task_annotation.once_per_day
     def warden_task_play_game(self):
@@ -126,13 +122,7 @@ class WardenScript:
         log_util.info(self.user_id, f"任务开始: {self.project_name} - Play Game")
         try:
             # 步骤1: 获取Warden主页的页面对象
-            tabs = self.browser.get_tabs(url=self.WARDEN_URL)
-            if tabs:
-                self.page = tabs[0]
-                self.page.set.activate()
-                self.page.refresh()
-            else:
-                self.page = self.browser.new_tab(self.WARDEN_URL)
+            self.page = self.tabs.open(self.WARDEN_URL, profile=self.RESOURCE_PROFILE)
 
             AntiSybilDpUtil.human_short_wait()
 
@@ -141,7 +131,7 @@ class WardenScript:
                 self.okx_util.click_OKX_in_selector(self.browser, self.page, self.user_id)
                 AntiSybilDpUtil.human_short_wait()
                 # 认证完会回到dashboard页面，再次跳转回earn页面
-                self.page = self.browser.new_tab(self.WARDEN_URL)
+                self.page = self.tabs.open(self.WARDEN_URL, profile=self.RESOURCE_PROFILE)
                 AntiSybilDpUtil.human_short_wait()
 
             # 步骤2: 滚动并点击游戏入口
@@ -168,11 +158,12 @@ class WardenScript:
             for _ in range(10):
                 key = random.choice(['a', 'd'])
                 self.page.actions.key_down(key)
-                time.sleep(0.2)
+                CancelUtil.sleep(0.2)
                 self.page.actions.key_up(key)
-                time.sleep(1)
+                CancelUtil.sleep(1)
 
-            time.sleep(60)
+            # 等待本局游戏结束。结算画面的元素尚未在实际游戏页面上确认，保留固定等待
+            CancelUtil.sleep(60)
             self.page.refresh()
             log_util.info(self.user_id, f"任务成功: {self.project_name} - Play Game")
             return True
@@ -1,16 +1,20 @@
 import markdown
 import sys
 import os
+import re
 import json
+import multiprocessing
+import threading
+from collections import deque
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
     QTextEdit, QPushButton, QLabel, QPlainTextEdit, 
     QStackedWidget, QMessageBox, QComboBox,
-    QFrame, QTableWidget, QTableWidgetItem, QHeaderView,
+    QFrame, QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
     QStyledItemDelegate, QProxyStyle, QStyle, QScrollArea, QLineEdit, QSplitter, QListWidgetItem,
     QRadioButton, QCheckBox, QGridLayout, QSizePolicy, QTreeWidgetItem, QTreeWidget
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QThread, QObject, QTimer
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QObject, QTimer, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QColor, QPalette, QIntValidator, QIcon, QMovie
 
 # 导入后端控制器和日志工具
@@ -22,10 +26,30 @@ from util.log_util import log_util
 from config import AppConfig
 
 class QtLogHandler(QObject):
-    log_signal = pyqtSignal(str)
+    """
+    线程安全的UI日志处理器。日志先放入待显示队列（超过 LOG_VIEW_MAX_LINES 时丢弃最早的），
+    每批日志只在第一条到达时发出一次 logs_pending 信号，由界面线程稍后一次性取走整批。
+    """
+    logs_pending = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self._pending = deque(maxlen=AppConfig.LOG_VIEW_MAX_LINES)
+        self._lock = threading.Lock()
 
     def handle(self, msg):
-        self.log_signal.emit(msg)
+        with self._lock:
+            self._pending.append(msg)
+            first = len(self._pending) == 1
+        if first:
+            self.logs_pending.emit()
+
+    def drain(self) -> list:
+        """取走所有待显示的日志。"""
+        with self._lock:
+            messages = list(self._pending)
+            self._pending.clear()
+        return messages
 
 class BackendInitializationThread(QThread):
     """用于在后台初始化控制器的线程"""
@@ -45,8 +69,16 @@ class BackendInitializationThread(QThread):
 
 
 
-class LogWidget(QTextEdit):
-    """日志显示组件，只负责显示从回调函数传递过来的日志。"""
+class LogWidget(QPlainTextEdit):
+    """
+    日志显示组件，只负责显示从回调函数传递过来的日志。
+    纯文本显示，最多保留 LOG_VIEW_MAX_LINES 行，超出后自动丢弃最早的行；日志由 QtLogHandler 缓冲，
+    每 LOG_VIEW_FLUSH_INTERVAL_MS 毫秒最多追加一次。按级别和浏览器ID/模块筛选时只隐藏不匹配的行，不重建文档。
+    """
+    LEVELS = ('INFO', 'WARN', 'ERROR')
+    # 日志格式: [时间] [级别] [浏览器ID/模块] ...；异常堆栈的后续行沿用上一条日志的筛选结果
+    HEADER_PATTERN = re.compile(r'^\[[^\]]*\] \[(\w+)\] \[([^\]]*)\]')
+
     def __init__(self):
         super().__init__()
         self.setReadOnly(True)
@@ -56,13 +88,83 @@ class LogWidget(QTextEdit):
         pal.setColor(QPalette.Text, QColor(30, 30, 30))
         self.setPalette(pal)
         self.setFixedHeight(200)
-    
+        self.setMaximumBlockCount(AppConfig.LOG_VIEW_MAX_LINES)
+
+        self.handler = None
+        self.min_level = 0
+        self.user_filter = ""
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(AppConfig.LOG_VIEW_FLUSH_INTERVAL_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def attach(self, handler):
+        """从 QtLogHandler 批量接收日志。"""
+        self.handler = handler
+        handler.logs_pending.connect(self._schedule_flush)
+
+    def _schedule_flush(self):
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        messages = self.handler.drain() if self.handler else []
+        if messages:
+            self.append_logs(messages)
+
     def append_log(self, msg):
-        self.append(msg)
+        self.append_logs([msg])
+
+    def append_logs(self, messages):
+        """一次性追加多条日志；只有原本停在底部时才自动滚动，不打断正在往上翻看的用户。"""
         sb = self.verticalScrollBar()
-        if sb is not None:
+        at_bottom = sb.value() >= sb.maximum()
+        text = "\n".join(messages[-AppConfig.LOG_VIEW_MAX_LINES:])
+        self.appendPlainText(text)
+        if self._is_filtering():
+            self._apply_filter(min(text.count("\n") + 1, self.blockCount()))
+        if at_bottom:
             sb.setValue(sb.maximum())
 
+    def set_min_level(self, level_index: int):
+        """只显示不低于 LEVELS[level_index] 的日志。"""
+        self.min_level = level_index
+        self._apply_filter()
+
+    def set_user_filter(self, text: str):
+        """只显示浏览器ID/模块名包含 text 的日志（不区分大小写），为空时不筛选。"""
+        self.user_filter = text.strip().lower()
+        self._apply_filter()
+
+    def _is_filtering(self):
+        return self.min_level > 0 or bool(self.user_filter)
+
+    def _matches(self, level, user_id):
+        rank = self.LEVELS.index(level) if level in self.LEVELS else 0
+        return rank >= self.min_level and (not self.user_filter or self.user_filter in user_id.lower())
+
+    def _apply_filter(self, tail_blocks=None):
+        """按当前筛选条件设置文本块的可见性；tail_blocks 指定时只处理最后这么多块（新追加的日志）。"""
+        document = self.document()
+        if tail_blocks:
+            block = document.lastBlock()
+            for _ in range(tail_blocks - 1):
+                block = block.previous()
+        else:
+            block = document.firstBlock()
+        start = block.position()
+        # 新追加的一批可能以上一条日志的续行（如异常堆栈）开头，续行沿用上一块的可见性
+        previous = block.previous()
+        visible = previous.isVisible() if previous.isValid() else True
+        while block.isValid():
+            match = self.HEADER_PATTERN.match(block.text())
+            if match:
+                visible = self._matches(match.group(1).upper(), match.group(2))
+            block.setVisible(visible)
+            block = block.next()
+        document.markContentsDirty(start, document.characterCount() - start)
+        self.viewport().update()
+
 class StyledSidebar(QListWidget):
     """样式化的侧边栏"""
     def __init__(self, items, width=200):
@@ -98,6 +200,32 @@ class EditModeDelegate(QStyledItemDelegate):
             painter.restore()
         super().paint(painter, option, index)
 
+# 表格通用样式；QTableView 选择器同时作用于 QTableWidget
+TABLE_STYLE_SHEET = '''
+    QTableView {
+        background-color: white;
+        border: 1px solid #d0d0d0;
+        border-radius: 12px;
+        gridline-color: #e0e0e0;
+    }
+    QTableView::item {
+        padding: 10px;
+        border: none;
+    }
+    QTableView::item:selected {
+        background-color: #e6f7ff;
+        color: #333;
+    }
+    QHeaderView::section {
+        background-color: #f8f9fa;
+        padding: 10px;
+        border: none;
+        border-bottom: 1px solid #d0d0d0;
+        font-weight: bold;
+        font-size: 14px;
+    }
+'''
+
 class StyledTableWidget(QTableWidget):
     """一个带有预设样式的可复用表格组件基类"""
     def __init__(self, headers):
@@ -107,30 +235,15 @@ class StyledTableWidget(QTableWidget):
         self.setHorizontalHeaderLabels(headers)
         self.verticalHeader().setVisible(False)
         self.setStyle(NoFocusRectStyle(self.style()))
-        self.setStyleSheet('''
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #d0d0d0;
-                border-radius: 12px;
-                gridline-color: #e0e0e0;
-            }
-            QTableWidget::item {
-                padding: 10px;
-                border: none;
-            }
-            QTableWidget::item:selected {
-                background-color: #e6f7ff;
-                color: #333;
-            }
-            QHeaderView::section {
-                background-color: #f8f9fa;
-                padding: 10px;
-                border: none;
-                border-bottom: 1px solid #d0d0d0;
-                font-weight: bold;
-                font-size: 14px;
-            }
-        ''')
+        self.setStyleSheet(TABLE_STYLE_SHEET)
+
+class StyledTableView(QTableView):
+    """与 StyledTableWidget 样式相同的表格视图，数据由模型提供，用于行数很多的表格。"""
+    def __init__(self):
+        super().__init__()
+        self.verticalHeader().setVisible(False)
+        self.setStyle(NoFocusRectStyle(self.style()))
+        self.setStyleSheet(TABLE_STYLE_SHEET)
 
 class ConfigTableWidget(StyledTableWidget):
     """配置表格组件，现在继承自StyledTableWidget"""
@@ -372,14 +485,21 @@ class ConfigTab(QWidget):
 
 class TaskDispatchThread(QThread):
     """专门用于在后台分发任务并等待其完成的线程，以防阻塞UI主线程"""
-    def __init__(self, controller, sequence, concurrent_browsers):
+    def __init__(self, controller, sequence, concurrent_browsers, scheduler_mode=None, adaptive=False, min_browsers=None,
+                 backend=None):
         super().__init__()
         self.controller = controller
         self.sequence = sequence
         self.concurrent_browsers = concurrent_browsers
+        self.scheduler_mode = scheduler_mode
+        self.adaptive = adaptive
+        self.min_browsers = min_browsers
+        self.backend = backend
 
     def run(self):
-        self.controller.dispatch_sequence(self.sequence, self.concurrent_browsers)
+        self.controller.dispatch_sequence(self.sequence, self.concurrent_browsers, self.scheduler_mode,
+                                          adaptive=self.adaptive, min_browsers=self.min_browsers,
+                                          backend=self.backend)
 
 class ProjectTab(QWidget):
     """项目标签页，采用两栏布局，左侧为可用任务，右侧为任务序列"""
@@ -392,6 +512,7 @@ class ProjectTab(QWidget):
         self.is_running = False # State lock
         self.progress_timer = QTimer(self)
         self.progress_timer.timeout.connect(self.query_progress)
+        self._tasks_version = 0  # 已同步到的任务状态表版本号，轮询时只拉取之后的变化
         self.sequence_model = [] # NEW: Central data model for the sequence
         # --- 新增：用于独立存储每个项目浏览器选择的状态字典 ---
         self.browser_selections_by_project = {}
@@ -423,6 +544,32 @@ class ProjectTab(QWidget):
         concurrency_layout.addWidget(concurrency_label)
         concurrency_layout.addWidget(self.concurrency_combo)
         concurrency_layout.addWidget(QLabel("个"))
+        self.adaptive_checkbox = QCheckBox("自适应，最少")
+        self.adaptive_checkbox.setToolTip("根据主机CPU、内存和任务耗时，在最少值与最多值之间自动调整并发数")
+        self.min_concurrency_combo = QComboBox()
+        self.min_concurrency_combo.addItems(["1", "2", "4"])
+        self.min_concurrency_combo.setFixedWidth(50)
+        self.min_concurrency_combo.setEnabled(False)
+        self.adaptive_checkbox.toggled.connect(self.min_concurrency_combo.setEnabled)
+        concurrency_layout.addWidget(self.adaptive_checkbox)
+        concurrency_layout.addWidget(self.min_concurrency_combo)
+        scheduler_label = QLabel("<b>调度模式:</b>")
+        scheduler_label.setStyleSheet("font-size: 15px; margin-left: 10px;")
+        self.scheduler_combo = QComboBox()
+        self.scheduler_combo.addItem("工作包", "package")
+        self.scheduler_combo.addItem("任务队列", "task_queue")
+        self.scheduler_combo.setCurrentIndex(max(0, self.scheduler_combo.findData(AppConfig.DEFAULT_SCHEDULER_MODE)))
+        concurrency_layout.addWidget(scheduler_label)
+        concurrency_layout.addWidget(self.scheduler_combo)
+        backend_label = QLabel("<b>执行方式:</b>")
+        backend_label.setStyleSheet("font-size: 15px; margin-left: 10px;")
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItem("多线程", "thread")
+        self.backend_combo.addItem("多进程", "process")
+        self.backend_combo.setToolTip("多进程：浏览器按分片运行在独立子进程中，单个进程卡死或崩溃不影响界面和其他浏览器")
+        self.backend_combo.setCurrentIndex(max(0, self.backend_combo.findData(AppConfig.DEFAULT_DISPATCHER_BACKEND)))
+        concurrency_layout.addWidget(backend_label)
+        concurrency_layout.addWidget(self.backend_combo)
         grid_layout.addWidget(concurrency_container, 0, 0)
 
         # --- Top-Right: View Options ---
@@ -878,8 +1025,14 @@ class ProjectTab(QWidget):
         QMessageBox.information(self, "任务开始", "任务已提交后端，开始执行...")
 
         concurrent_browsers = int(self.concurrency_combo.currentText())
-
-        self.dispatch_thread = TaskDispatchThread(app_controller, sequence_data_for_backend, concurrent_browsers)
+        scheduler_mode = self.scheduler_combo.currentData()
+        adaptive = self.adaptive_checkbox.isChecked()
+        min_browsers = int(self.min_concurrency_combo.currentText()) if adaptive else None
+        backend = self.backend_combo.currentData()
+
+        self.dispatch_thread = TaskDispatchThread(app_controller, sequence_data_for_backend, concurrent_browsers,
+                                                  scheduler_mode, adaptive, min_browsers, backend)
+        self._tasks_version = 0
         self.dispatch_thread.start()
         self.progress_timer.start(2000)
 
@@ -894,11 +1047,15 @@ class ProjectTab(QWidget):
     def query_progress(self):
         # 先获取执行状态，再获取进度数据
         status = app_controller.get_execution_status()
-        progress_data = app_controller.get_task_progress()
+        # 只拉取上次轮询之后有变化的任务单元；新一轮开始时表格已由 populate_initial_tasks 重建，reset 无需额外处理
+        delta = app_controller.get_task_changes(self._tasks_version)
+        self._tasks_version = delta['version']
+        progress_data = delta['changes']
 
         # 无论如何，都先用最新的数据更新UI
         if progress_data:
             self.results_tab.update_task_progress(progress_data)
+        self.results_tab.update_summary(app_controller.get_task_stats(), status.get('eta_seconds'))
 
         # 在UI更新后，再判断是否要停止
         if status.get('is_done', False):
@@ -922,111 +1079,180 @@ class ProjectTab(QWidget):
         else:
             log_util.info("UI", "用户取消了停止操作。")
 
+class TaskResultsModel(QAbstractTableModel):
+    """
+    任务总进度表格的数据模型。每行只保存浏览器ID、任务名、状态、详情和时间几个字符串，
+    由 QTableView 按需绘制可见行；状态更新只修改变化的行，并把连续的脏行合并成区间发出 dataChanged，
+    数万行时每次轮询的开销也只与变化的任务数相关。
+    """
+    HEADERS = ['序号', '浏览器id', '任务名称', '执行结果', '失败详情', '完成时间']
+    STATUS_COLUMN = 3
+    STATUS_STYLES = {
+        None: ("等待执行...", None),
+        'SUCCESS': ("成功", '#27ae60'),
+        'FAILURE': ("失败", '#c0392b'),
+        'EXECUTING': ("执行中...", '#2980b9'),
+        'TIMEOUT': ("超时", '#c0392b'),
+        'CANCELLED': ("已取消", '#7f8c8d'),
+        'SKIPPED': ("已跳过", '#7f8c8d'),
+    }
+    UNKNOWN_STYLE = ("未知", '#7f8c8d')
+    CENTERED_COLUMNS = (0, 1, 3, 5)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._browser_ids = []
+        self._task_names = []
+        self._first_in_group = []  # 同一浏览器的第一行才显示浏览器ID
+        self._statuses = []
+        self._details = []
+        self._timestamps = []
+        self._row_map = {}  # (browser_id, task_name) -> 行号
+        self._colors = {color: QColor(color) for _, color in self.STATUS_STYLES.values() if color}
+        self._colors[self.UNKNOWN_STYLE[1]] = QColor(self.UNKNOWN_STYLE[1])
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    def reset_tasks(self, tasks_data):
+        """用初始任务列表 [{'browser_id', 'task_name'}] 重建所有行（按浏览器ID排序），状态均为等待执行。"""
+        tasks_data = sorted(tasks_data, key=lambda x: x['browser_id'])
+        self.beginResetModel()
+        self._browser_ids = [task['browser_id'] for task in tasks_data]
+        self._task_names = [task['task_name'] for task in tasks_data]
+        self._first_in_group = [i == 0 or self._browser_ids[i - 1] != browser_id
+                                for i, browser_id in enumerate(self._browser_ids)]
+        self._statuses = [None] * len(tasks_data)
+        self._details = [''] * len(tasks_data)
+        self._timestamps = [''] * len(tasks_data)
+        self._row_map = {(browser_id, task_name): i
+                         for i, (browser_id, task_name) in enumerate(zip(self._browser_ids, self._task_names))}
+        self.endResetModel()
+
+    def apply_changes(self, tasks_data) -> int:
+        """
+        合并状态变化 {browser_id: {task_name: details}}，只对内容确实变化的行发出 dataChanged。
+        :return: 变化的行数。
+        """
+        dirty = []
+        for browser_id, tasks in tasks_data.items():
+            for task_name, result in tasks.items():
+                row = self._row_map.get((browser_id, task_name))
+                if row is None:
+                    continue
+                status = result.get('status')
+                details = result.get('details', '') or ''
+                timestamp = result.get('timestamp', '') or ''
+                if (self._statuses[row] == status and self._details[row] == details
+                        and self._timestamps[row] == timestamp):
+                    continue
+                self._statuses[row] = status
+                self._details[row] = details
+                self._timestamps[row] = timestamp
+                dirty.append(row)
+        if not dirty:
+            return 0
+
+        dirty.sort()
+        first = last = dirty[0]
+        for row in dirty[1:]:
+            if row != last + 1:
+                self._emit_rows_changed(first, last)
+                first = row
+            last = row
+        self._emit_rows_changed(first, last)
+        return len(dirty)
+
+    def _emit_rows_changed(self, first, last):
+        self.dataChanged.emit(self.index(first, self.STATUS_COLUMN), self.index(last, len(self.HEADERS) - 1))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._task_names)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        # 所有单元格只读
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return str(row + 1)
+            if column == 1:
+                return self._browser_ids[row] if self._first_in_group[row] else ""
+            if column == 2:
+                return self._task_names[row]
+            if column == 3:
+                return self.STATUS_STYLES.get(self._statuses[row], self.UNKNOWN_STYLE)[0]
+            if column == 4:
+                return self._details[row]
+            return self._timestamps[row]
+        if role == Qt.TextAlignmentRole and column in self.CENTERED_COLUMNS:
+            return Qt.AlignCenter
+        if column == self.STATUS_COLUMN and self._statuses[row] is not None:
+            if role == Qt.ForegroundRole:
+                color = self.STATUS_STYLES.get(self._statuses[row], self.UNKNOWN_STYLE)[1]
+                return self._colors[color]
+            if role == Qt.FontRole:
+                return self._bold_font
+        return None
+
+
 class TotalProgressWidget(QWidget):
     """任务总进度视图的专用控件。"""
+    ROW_HEIGHT = 32
+
     def __init__(self):
         super().__init__()
-        self.task_row_map = {}  # 用于快速查找任务对应的行
+        self.model = TaskResultsModel(self)
         self.init_ui()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
 
-        headers = ['序号', '浏览器id', '任务名称', '执行结果', '失败详情', '完成时间']
-        self.table = StyledTableWidget(headers)
-        self.table.setStyleSheet(self.table.styleSheet() + "QTableWidget::item { padding: 0px 5px; }")
-        # FIX: Set selection to single, full rows to fix all selection bugs
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        # FIX: Ensure no cell can ever be edited
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-
-        header = self.table.horizontalHeader()
-        self.table.resizeColumnsToContents()
+        self.table = StyledTableView()
+        self.table.setStyleSheet(self.table.styleSheet() + "QTableView::item { padding: 0px 5px; }")
+        self.table.setModel(self.model)
+        # 整行单选，且单元格不可编辑
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        # 固定行高：视图无需逐行计算尺寸，行数很多时滚动和重绘仍只涉及可见行
+        vertical_header = self.table.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.Fixed)
+        vertical_header.setDefaultSectionSize(self.ROW_HEIGHT)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
         layout.addWidget(self.table)
 
+    def update_summary(self, stats, eta_seconds=None):
+        """显示运行统计摘要（stats 为 get_task_stats 的返回值）。"""
+        by_status = stats.get('by_status', {})
+        text = (f"已完成 {stats.get('completed', 0)}/{stats.get('total', 0)}，"
+                f"执行中 {by_status.get('EXECUTING', 0)}，成功 {by_status.get('SUCCESS', 0)}，"
+                f"失败 {by_status.get('FAILURE', 0) + by_status.get('TIMEOUT', 0)}，"
+                f"吞吐 {stats.get('tasks_per_minute', 0)} 个/分钟")
+        if eta_seconds is not None:
+            text += f"，预计剩余 {int(eta_seconds // 60)} 分 {int(eta_seconds % 60)} 秒"
+        self.summary_label.setText(text)
+
     def populate_initial_tasks(self, tasks_data):
-        tasks_data.sort(key=lambda x: x['browser_id'])
-        self.table.setUpdatesEnabled(False)
-        self.table.setRowCount(0)
-        self.task_row_map.clear()
-        self.table.setRowCount(len(tasks_data))
-
-        last_browser_id = None
-        for i, task in enumerate(tasks_data):
-            browser_id = task['browser_id']
-            task_name = task['task_name']
-
-            # FIX: Only show browser_id if it's the first in a new group
-            display_browser_id = browser_id if browser_id != last_browser_id else ""
-            last_browser_id = browser_id
-
-            # FIX: Create items with simple text, no icons or animations
-            seq_item = QTableWidgetItem(str(i + 1))
-            id_item = QTableWidgetItem(display_browser_id)
-            name_item = QTableWidgetItem(task_name)
-            result_item = QTableWidgetItem("等待执行...")
-            details_item = QTableWidgetItem("")
-            time_item = QTableWidgetItem("")
-
-            # FIX: Set ALL items as non-editable immediately after creation
-            for item in [seq_item, id_item, name_item, result_item, details_item, time_item]:
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-
-            seq_item.setTextAlignment(Qt.AlignCenter)
-            id_item.setTextAlignment(Qt.AlignCenter)
-            result_item.setTextAlignment(Qt.AlignCenter)
-            time_item.setTextAlignment(Qt.AlignCenter)
-
-            self.table.setItem(i, 0, seq_item)
-            self.table.setItem(i, 1, id_item)
-            self.table.setItem(i, 2, name_item)
-            self.table.setItem(i, 3, result_item)
-            self.table.setItem(i, 4, details_item)
-            self.table.setItem(i, 5, time_item)
-
-            self.task_row_map[(browser_id, task_name)] = i
-
-        self.table.setUpdatesEnabled(True)
+        self.model.reset_tasks(tasks_data)
 
     def update_task_progress(self, tasks_data):
-        # 新的数据结构: {'browser_id': {'task_name': task_details}}
-        for browser_id, tasks in tasks_data.items():
-            for task_name, result in tasks.items():
-                key = (browser_id, task_name)
-
-                if key in self.task_row_map:
-                    row = self.task_row_map[key]
-                    
-                    status = result.get('status')
-                    details = result.get('details', '')
-                    timestamp = result.get('timestamp', '')
-
-                    status_item = self.table.item(row, 3)
-                    details_item = self.table.item(row, 4)
-                    time_item = self.table.item(row, 5)
-                    
-                    font = status_item.font()
-                    font.setBold(True)
-
-                    if status == 'SUCCESS':
-                        status_item.setText("成功")
-                        status_item.setForeground(QColor('#27ae60'))
-                    elif status == 'FAILURE':
-                        status_item.setText("失败")
-                        status_item.setForeground(QColor('#c0392b'))
-                    elif status == 'EXECUTING':
-                        status_item.setText("执行中...")
-                        status_item.setForeground(QColor('#2980b9'))
-                    else:
-                        status_item.setText("未知")
-                        status_item.setForeground(QColor('#7f8c8d'))
-                    
-                    status_item.setFont(font)
-                    details_item.setText(details)
-                    time_item.setText(timestamp)
-
+        # 数据结构: {'browser_id': {'task_name': task_details}}，只包含有变化的任务
+        self.model.apply_changes(tasks_data)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -1091,6 +1317,9 @@ class ExecutionResultsTab(QWidget):
     def update_task_progress(self, completed_tasks_data):
         self.total_progress_view.update_task_progress(completed_tasks_data)
 
+    def update_summary(self, stats, eta_seconds=None):
+        self.total_progress_view.update_summary(stats, eta_seconds)
+
 class MyToolApplication(QWidget):
     """主应用程序窗口"""
     def __init__(self):
@@ -1108,6 +1337,13 @@ class MyToolApplication(QWidget):
         main_layout = QVBoxLayout()
         self.tab_widget = QTabWidget(); self.tab_widget.setStyleSheet("QTabWidget::pane { border: none; }")
         self.log_widget = LogWidget()
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(["全部级别", "警告及以上", "仅错误"])
+        self.log_level_combo.currentIndexChanged.connect(self.log_widget.set_min_level)
+        self.log_user_filter = QLineEdit()
+        self.log_user_filter.setPlaceholderText("按浏览器ID/模块筛选")
+        self.log_user_filter.setFixedWidth(220)
+        self.log_user_filter.textChanged.connect(self.log_widget.set_user_filter)
         self.home_tab = HomeTab()
         self.config_tab = ConfigTab(self) # 传递主窗口引用
         self.results_tab = ExecutionResultsTab()
@@ -1121,13 +1357,15 @@ class MyToolApplication(QWidget):
         self.tab_widget.tabBarClicked.connect(self.on_tab_bar_clicked)
         self.tab_widget.currentChanged.connect(self.on_tab_changed)
         main_layout.addWidget(self.tab_widget)
-        log_label = QLabel("日志"); log_label.setFont(QFont('Microsoft YaHei', 12, QFont.Weight.Bold)); log_label.setStyleSheet("color: #333; margin: 10px 0 5px 0;"); main_layout.addWidget(log_label)
+        log_label = QLabel("日志"); log_label.setFont(QFont('Microsoft YaHei', 12, QFont.Weight.Bold)); log_label.setStyleSheet("color: #333; margin: 10px 0 5px 0;")
+        log_header = QHBoxLayout(); log_header.addWidget(log_label); log_header.addStretch()
+        log_header.addWidget(self.log_level_combo); log_header.addWidget(self.log_user_filter); main_layout.addLayout(log_header)
         main_layout.addWidget(self.log_widget); self.setLayout(main_layout)
 
         # 设置线程安全的日志处理器
-        log_handler = QtLogHandler()
-        log_handler.log_signal.connect(self.log_widget.append)
-        log_util.add_ui_handler(log_handler.handle)
+        self.log_handler = QtLogHandler()
+        self.log_widget.attach(self.log_handler)
+        log_util.add_ui_handler(self.log_handler.handle)
 
         log_util.info("UI", "应用程序UI已加载，正在初始化后端...")
         self.tab_widget.tabBar().installEventFilter(self); self.tab_widget.currentChanged.connect(self.on_tab_changed)
@@ -1173,4 +1411,6 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
+    # 多进程调度后端在打包后的Windows程序中需要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -1,9 +1,12 @@
 import requests
+import json
 import os
 import sys
 import time
+from urllib.parse import quote
 
 from DrissionPage import ChromiumPage, ChromiumOptions
+from util.foreground_util import ForegroundUtil
 from util.log_util import log_util
 from config import AppConfig
 
@@ -56,11 +59,12 @@ class AdsBrowserUtil:
         return api_base
 
     @staticmethod
-    def start_browser_if_not_running(user_id: str):
+    def start_browser_if_not_running(user_id: str, headless: bool = False):
         """
         检查指定ID的浏览器是否正在运行，如果未运行，则尝试启动它。
 
         :param user_id: 要操作的浏览器user_id。
+        :param headless: 是否以无界面方式启动（AdsPower API 的 headless=1 参数）。
         :return: 如果浏览器最终处于运行状态，则返回其DrissionPage的Browser对象；否则返回None。
         """
         api_base = AdsBrowserUtil._get_api_config()
@@ -88,6 +92,11 @@ class AdsBrowserUtil:
         if not selenium_ws:
             start_endpoint = "/browser/start"
             start_url = f"{api_base.rstrip('/')}{start_endpoint}?user_id={user_id}"
+            if headless:
+                start_url += "&headless=1"
+            launch_args = ForegroundUtil.launch_args()
+            if launch_args:
+                start_url += f"&launch_args={quote(json.dumps(launch_args))}"
             active_url = f"{api_base.rstrip('/')}{active_endpoint}?user_id={user_id}" # 为二次检查准备好URL
             
             for attempt in range(3):
@@ -141,6 +150,33 @@ class AdsBrowserUtil:
         
         return None
 
+    @staticmethod
+    def stop_browser(user_id: str) -> bool:
+        """
+        通过AdsPower API关闭指定ID的浏览器（包括整个进程树），用于需要彻底重启浏览器的场景。
+
+        :param user_id: 要关闭的浏览器user_id。
+        :return: API确认关闭时返回True，否则返回False。
+        """
+        api_base = AdsBrowserUtil._get_api_config()
+        if not api_base:
+            log_util.error("AdsBrowserUtil", "API基础地址未配置，无法关闭浏览器。")
+            return False
+
+        stop_url = f"{api_base.rstrip('/')}/browser/stop?user_id={user_id}"
+        try:
+            resp = requests.get(stop_url, proxies={"http": None, "https": None}, timeout=20)
+            resp.raise_for_status()
+            data = resp.json()
+        except requests.exceptions.RequestException as e:
+            log_util.error("AdsBrowserUtil", f"关闭浏览器 {user_id} 时API请求失败: {e}", exc_info=True)
+            return False
+
+        if data.get("code") != 0:
+            log_util.warn("AdsBrowserUtil", f"关闭浏览器 {user_id} 失败: {data.get('msg')}")
+            return False
+        return True
+
     @staticmethod
     def get_configured_user_ids() -> list[str]:
         """只从配置文件中读取并返回所有配置的浏览器user_id列表。"""
@@ -1,8 +1,11 @@
-import time
 import random
 import json
+import threading
+import time
 
 from DrissionPage import ChromiumPage
+from util.cancel_util import CancelUtil
+from util.element_util import ElementUtil
 from util.log_util import log_util
 
 
@@ -10,7 +13,15 @@ class AntiSybilDpUtil:
     """
     用于DrissionPage的防女巫工具类，提供人性化的操作。
     所有方法都应该是静态的，并且在适用时接受一个页面对象作为第一个参数。
+    所有等待都通过 CancelUtil.sleep 进行，停止运行后会立即抛出 TaskCancelledError。
     """
+    # 固定等待的时长范围（秒）
+    LONG_WAIT = (8.0, 12.0)
+    HUGE_WAIT = (13.0, 20.0)
+    # 就绪等待在条件满足后附加的随机停顿（秒），模拟人看到结果后的反应时间
+    READY_JITTER = (0.5, 1.5)
+
+    _wait_stats = threading.local()  # 当前线程累计节省的等待时间（秒）
 
     @staticmethod
     def get_perturbation_number(center_value: float, deviation_value: float) -> str:
@@ -39,7 +50,7 @@ class AntiSybilDpUtil:
         1s内等待
         """
         delay = random.uniform(0.5, 1)
-        time.sleep(delay)
+        CancelUtil.sleep(delay)
 
     @staticmethod
     def human_short_wait():
@@ -47,23 +58,84 @@ class AntiSybilDpUtil:
         人性化的短等待，模拟思考或网络延迟。
         """
         delay = random.uniform(3, 5)
-        time.sleep(delay)
+        CancelUtil.sleep(delay)
 
     @staticmethod
     def human_long_wait():
         """
         人性化的长等待，用于等待页面加载。
         """
-        delay = random.uniform(8.0, 12.0)
-        time.sleep(delay)
+        delay = random.uniform(*AntiSybilDpUtil.LONG_WAIT)
+        CancelUtil.sleep(delay)
 
     @staticmethod
     def human_huge_wait():
         """
         超长等待，一般用于比较卡的项目交互。
         """
-        delay = random.uniform(13.0, 20.0)
-        time.sleep(delay)
+        delay = random.uniform(*AntiSybilDpUtil.HUGE_WAIT)
+        CancelUtil.sleep(delay)
+
+    @staticmethod
+    def human_wait_until(condition, timeout: float, baseline: tuple = None, jitter: tuple = READY_JITTER,
+                         poll_interval: float = 0.5) -> bool:
+        """
+        就绪等待：代替“操作后固定睡眠”，条件满足后立即返回（再附加一段有界的随机停顿）。
+
+        :param condition: 无参可调用对象，返回真表示页面已就绪；抛出异常（页面刷新中等）视为未就绪。
+                          可使用 ready_element / ready_network_idle 构造。
+        :param timeout: 最长等待时间（秒），一般取被替换的固定等待的上限。
+        :param baseline: 被替换的固定等待的时长范围（如 LONG_WAIT），用于统计节省的时间。
+        :param jitter: 条件满足后附加的随机停顿范围（秒），None 表示不停顿。
+        :return: 条件是否在超时前满足。超时时返回False，调用方按原流程继续（后续的元素查找会给出明确的失败原因）。
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        ready = False
+        while True:
+            try:
+                ready = bool(condition())
+            except Exception:
+                ready = False
+            remaining = deadline - time.monotonic()
+            if ready or remaining <= 0:
+                break
+            CancelUtil.sleep(min(poll_interval, remaining))
+
+        if ready and jitter:
+            CancelUtil.sleep(random.uniform(*jitter))
+        if baseline:
+            saved = sum(baseline) / 2 - (time.monotonic() - started)
+            stats = AntiSybilDpUtil._wait_stats
+            stats.saved = getattr(stats, 'saved', 0.0) + saved
+        return ready
+
+    @staticmethod
+    def thread_wait_saved() -> float:
+        """当前线程累计通过就绪等待节省的时间（秒，按被替换固定等待的平均时长计算，超时时可能为负）。"""
+        return getattr(AntiSybilDpUtil._wait_stats, 'saved', 0.0)
+
+    @staticmethod
+    def ready_element(page, *locators, clickable: bool = False):
+        """就绪条件：任一定位符对应的元素出现（clickable=True 时要求可点击）。"""
+        selectors = {index: locator for index, locator in enumerate(locators)}
+        return lambda: ElementUtil.race(page, selectors, timeout=0, require_clickable=clickable)
+
+    @staticmethod
+    def ready_network_idle(page, quiet: float = 1.5):
+        """就绪条件：文档加载完成，且连续 quiet 秒内没有新的资源请求。"""
+        js = ('performance.setResourceTimingBufferSize(100000);'
+              'return [document.readyState, performance.getEntriesByType("resource").length];')
+        state = {'count': None, 'since': None}
+
+        def condition():
+            ready_state, count = page.run_js(js)
+            now = time.monotonic()
+            if ready_state != 'complete' or count != state['count']:
+                state['count'], state['since'] = count, now
+                return False
+            return now - state['since'] >= quiet
+        return condition
 
     @staticmethod
     def simulate_scroll(page: ChromiumPage):
@@ -95,7 +167,7 @@ class AntiSybilDpUtil:
                 y = random.randint(100, height - 100 if height > 200 else height)
                 # DrissionPage的actions是即时执行的，不需要 .perform()
                 page.actions.move_to((x, y), duration=random.uniform(0.3, 0.8))
-                time.sleep(random.uniform(0.2, 0.5))
+                CancelUtil.sleep(random.uniform(0.2, 0.5))
         except Exception as e:
             log_util.error("anti_sybil", f"simulate_mouse_move时发生意外错误: {e}")
 
@@ -160,7 +232,7 @@ class AntiSybilDpUtil:
                 """辅助函数，用于执行逐字输入。"""
                 for char in t:
                     p.actions.key_down(char).key_up(char)
-                    time.sleep(random.uniform(0.08, 0.25))
+                    CancelUtil.sleep(random.uniform(0.08, 0.25))
 
             # 10%的概率触发“输入-删除-重输”的反女巫逻辑
             if random.random() < 0.1:
@@ -171,7 +243,7 @@ class AntiSybilDpUtil:
                 # 模拟退格键删除
                 for _ in range(len(text) + 2):  # 多删几个以防万一
                     page.actions.key_down('backspace').key_up('backspace')
-                    time.sleep(random.uniform(0.02, 0.05))
+                    CancelUtil.sleep(random.uniform(0.02, 0.05))
                 AntiSybilDpUtil.human_short_wait()
 
             # 最终的、正确的输入 (无论是否触发了反女巫，都会执行这一步)
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class TaskCancelledError(BaseException):
+    """
+    任务被取消（用户停止运行或看门狗回收槽位）时抛出。
+    与 asyncio.CancelledError 一样继承自 BaseException，避免被项目脚本中大量的
+    `except Exception` 捕获后吞掉，从而能一路传回调度器。
+    """
+
+
+class CancelUtil:
+    """
+    可取消的等待工具。
+    所有等待辅助函数和轮询循环都应该使用 CancelUtil.sleep 代替 time.sleep：
+    一旦全局中断事件被设置（用户点击停止），或当前线程被单独取消（看门狗回收了它的槽位），
+    等待会在 CANCEL_POLL_INTERVAL 秒内结束并抛出 TaskCancelledError。
+    """
+    CANCEL_POLL_INTERVAL = 0.25
+
+    _interrupt_event = None
+    _cancelled_threads = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def bind(interrupt_event):
+        """绑定全局中断事件（threading.Event 或 multiprocessing.Event）。"""
+        CancelUtil._interrupt_event = interrupt_event
+
+    @staticmethod
+    def cancel_thread(thread_ident: int):
+        """单独取消某个线程，该线程下一次等待或检查时抛出 TaskCancelledError。"""
+        with CancelUtil._lock:
+            CancelUtil._cancelled_threads.add(thread_ident)
+
+    @staticmethod
+    def reset_current_thread():
+        """清除当前线程的取消标记。线程池中的线程开始新的工作前调用。"""
+        with CancelUtil._lock:
+            CancelUtil._cancelled_threads.discard(threading.get_ident())
+
+    @staticmethod
+    def is_cancelled() -> bool:
+        event = CancelUtil._interrupt_event
+        if event is not None and event.is_set():
+            return True
+        return threading.get_ident() in CancelUtil._cancelled_threads
+
+    @staticmethod
+    def check():
+        """如果已被取消，则抛出 TaskCancelledError。"""
+        if CancelUtil.is_cancelled():
+            raise TaskCancelledError("任务已被取消。")
+
+    @staticmethod
+    def sleep(seconds: float):
+        """可被取消的 time.sleep。"""
+        deadline = time.monotonic() + seconds
+        while True:
+            CancelUtil.check()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            chunk = min(remaining, CancelUtil.CANCEL_POLL_INTERVAL)
+            event = CancelUtil._interrupt_event
+            if event is not None:
+                event.wait(chunk)
+            else:
+                time.sleep(chunk)
@@ -0,0 +1,41 @@
+import threading
+
+from util.log_util import log_util
+
+
+class CdpCounter:
+    """
+    CDP消息计数器（仅用于基准测试，AppConfig.CDP_MESSAGE_COUNTING 开启时由调度器安装）。
+    包装 DrissionPage 驱动的 run 方法，按调用线程分别计数。任务代码在工作线程中同步发出CDP请求，
+    调度器在任务前后读取当前线程的计数之差，即为该任务发出的CDP消息数。
+    """
+    _local = threading.local()
+    _installed = False
+    _lock = threading.Lock()
+
+    @staticmethod
+    def install() -> bool:
+        """包装 DrissionPage 驱动，重复调用无副作用。DrissionPage 不可用时返回False。"""
+        with CdpCounter._lock:
+            if CdpCounter._installed:
+                return True
+            try:
+                from DrissionPage._base.driver import Driver
+            except ImportError as e:
+                log_util.warn("CDP计数", f"无法加载 DrissionPage 驱动，CDP消息计数不可用: {e}")
+                return False
+
+            original_run = Driver.run
+
+            def counted_run(driver, *args, **kwargs):
+                CdpCounter._local.count = getattr(CdpCounter._local, 'count', 0) + 1
+                return original_run(driver, *args, **kwargs)
+
+            Driver.run = counted_run
+            CdpCounter._installed = True
+            return True
+
+    @staticmethod
+    def thread_count() -> int:
+        """当前线程累计发出的CDP消息数。"""
+        return getattr(CdpCounter._local, 'count', 0)
@@ -0,0 +1,98 @@
+// 页面状态探测辅助库：在每个文档的隔离环境（Page.createIsolatedWorld）中执行一次，
+// Python 端通过一次 Runtime.evaluate 调用批量获取多个选择器的存在性、可见性、可点击性和文本，
+// 代替逐个 ele() + states.is_displayed + states.is_clickable 的多次CDP往返。
+// 隔离环境与页面脚本共享DOM但不共享JS全局对象，页面无法看到 domProbe，也不会在 window 上留下任何属性。
+const domProbe = (function() {
+    'use strict';
+
+    const TEXT_LIMIT = 200;
+
+    // 与 DrissionPage 的 'text:' 定位一致：第一个文本节点包含该文本的元素（文档顺序）
+    function findByText(root, text, deep) {
+        const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT);
+        let node = walker.nextNode();
+        while (node) {
+            if (node.nodeType === Node.TEXT_NODE) {
+                if (node.nodeValue && node.nodeValue.includes(text)) return node.parentElement;
+            } else if (deep && node.shadowRoot) {
+                const found = findByText(node.shadowRoot, text, deep);
+                if (found) return found;
+            }
+            node = walker.nextNode();
+        }
+        return null;
+    }
+
+    function findOne(spec) {
+        try {
+            switch (spec.type) {
+                case 'xpath':
+                    return document.evaluate(spec.value, document, null,
+                        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+                case 'text':
+                    return findByText(document.body || document.documentElement, spec.value, !!spec.deep);
+                default:
+                    return document.querySelector(spec.value);
+            }
+        } catch (e) {
+            return null;
+        }
+    }
+
+    function isVisible(el) {
+        if (!el || !el.isConnected || !el.getClientRects().length) return false;
+        const style = window.getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none';
+    }
+
+    function isClickable(el) {
+        if (!isVisible(el) || el.disabled) return false;
+        return window.getComputedStyle(el).pointerEvents !== 'none';
+    }
+
+    function state(el) {
+        if (!el || el.nodeType !== Node.ELEMENT_NODE) {
+            return {exists: false, visible: false, clickable: false, text: ''};
+        }
+        return {
+            exists: true,
+            visible: isVisible(el),
+            clickable: isClickable(el),
+            text: (el.innerText || el.textContent || '').trim().slice(0, TEXT_LIMIT),
+        };
+    }
+
+    // specs: [{key, type: 'xpath'|'text'|'css', value, deep}]，返回 JSON 字符串 {key: state}
+    function probe(specsJson) {
+        const specs = JSON.parse(specsJson);
+        const result = {};
+        for (const spec of specs) {
+            result[spec.key] = state(findOne(spec));
+        }
+        return JSON.stringify(result);
+    }
+
+    // 在所有匹配 hostXpath 的可见宿主组件（含其 Shadow Root）内递归查找包含 text 的按钮并点击
+    function clickDeep(hostXpath, text) {
+        const hosts = document.evaluate(hostXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < hosts.snapshotLength; i++) {
+            const host = hosts.snapshotItem(i);
+            if (!isVisible(host)) continue;
+            let foundNode = null;
+            const traverse = function(node) {
+                if (!node || foundNode) return;
+                if (node.shadowRoot) { traverse(node.shadowRoot); }
+                if (!foundNode && node.childNodes) { node.childNodes.forEach(traverse); }
+                if (!foundNode && node.innerText && node.innerText.includes(text) &&
+                    (node.tagName === 'BUTTON' || node.tagName === 'DIV' || node.onclick)) {
+                    foundNode = node;
+                }
+            };
+            traverse(host.shadowRoot ? host.shadowRoot : host);
+            if (foundNode) { foundNode.click(); return true; }
+        }
+        return false;
+    }
+
+    return Object.freeze({probe: probe, clickDeep: clickDeep});
+})();
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+from dataclasses import dataclass
+
+from util.tab_registry import TabRegistry
+
+
+@dataclass
+class ProbeState:
+    exists: bool = False
+    visible: bool = False
+    clickable: bool = False
+    text: str = ''
+
+    def __bool__(self):
+        return self.exists
+
+
+class DomProbeUtil:
+    """
+    批量页面状态探测。
+    util/config/dom_probe.js 在每个文档的隔离环境（Page.createIsolatedWorld）中执行一次，之后一次 Runtime.evaluate
+    即可返回多个选择器的存在性、可见性、可点击性和文本，代替逐个 ele() 与 states 查询的多次CDP往返。
+    隔离环境与页面共享DOM但不共享JS全局对象，页面脚本看不到辅助库，也无法通过 window 上的属性识别自动化。
+    只支持能在页面JS中等价实现的定位符（xpath:、text:、css:、tag:、#id、.class），
+    其余 DrissionPage 语法的定位符由 to_spec 返回None，调用方应回退到 ele()。
+    """
+    WORLD_NAME = 'dom_probe'
+
+    _script = None
+    _contexts = {}  # tab_id -> 已安装辅助库的隔离环境 executionContextId，文档跳转后失效
+    _lock = threading.Lock()
+
+    # 钱包 provider 只存在于页面自身的JS环境，因此这一查询以闭包形式在页面环境执行，不在页面上留下任何状态
+    ACCOUNTS_JS = """
+        const provider = window.okxwallet || window.ethereum;
+        if (!provider || !provider.request) return '[]';
+        return provider.request({method: 'eth_accounts'}).then(a => JSON.stringify(a || []), () => '[]');
+    """
+
+    @staticmethod
+    def script() -> str:
+        if DomProbeUtil._script is None:
+            js_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "dom_probe.js")
+            with open(js_path, 'r', encoding='utf-8') as f:
+                DomProbeUtil._script = f.read()
+        return DomProbeUtil._script
+
+    @staticmethod
+    def supports(root) -> bool:
+        """root 是否为标签页（而不是元素、Shadow Root），只有标签页能安装辅助库。"""
+        return hasattr(root, 'tab_id') and hasattr(root, 'run_cdp') and hasattr(root, 'run_js')
+
+    @staticmethod
+    def install(tab) -> int:
+        """为标签页的当前文档创建隔离环境并在其中执行辅助库，返回该环境的 executionContextId。"""
+        frame_id = tab.run_cdp('Page.getFrameTree')['frameTree']['frame']['id']
+        context_id = tab.run_cdp('Page.createIsolatedWorld', frameId=frame_id,
+                                 worldName=DomProbeUtil.WORLD_NAME)['executionContextId']
+        DomProbeUtil._evaluate(tab, context_id, DomProbeUtil.script())
+        with DomProbeUtil._lock:
+            DomProbeUtil._contexts[tab.tab_id] = context_id
+        return context_id
+
+    @staticmethod
+    def forget(tab_id):
+        """标签页关闭后丢弃它的隔离环境记录。"""
+        with DomProbeUtil._lock:
+            DomProbeUtil._contexts.pop(tab_id, None)
+
+    @staticmethod
+    def _evaluate(tab, context_id, expression):
+        response = tab.run_cdp('Runtime.evaluate', expression=expression, contextId=context_id, returnByValue=True)
+        if response.get('exceptionDetails'):
+            raise RuntimeError(f"页面探测脚本执行出错: {response['exceptionDetails'].get('text')}")
+        return response.get('result', {}).get('value')
+
+    @staticmethod
+    def _call(tab, method: str, *args):
+        """
+        在隔离环境中调用辅助库的方法，一次往返。文档跳转或刷新后旧环境失效，
+        此时重新创建隔离环境、安装辅助库后再调用一次。
+        """
+        expression = f"domProbe.{method}({', '.join(json.dumps(arg, ensure_ascii=False) for arg in args)})"
+        with DomProbeUtil._lock:
+            context_id = DomProbeUtil._contexts.get(tab.tab_id)
+        if context_id is not None:
+            try:
+                return DomProbeUtil._evaluate(tab, context_id, expression)
+            except Exception:
+                DomProbeUtil.forget(tab.tab_id)
+        return DomProbeUtil._evaluate(tab, DomProbeUtil.install(tab), expression)
+
+    @staticmethod
+    def to_spec(key, locator: str, deep: bool = False):
+        """把 DrissionPage 定位符转换为辅助库的查询描述，不支持的语法返回None。"""
+        for prefix in ('xpath:', 'x:'):
+            if locator.startswith(prefix):
+                return {'key': key, 'type': 'xpath', 'value': locator[len(prefix):]}
+        if locator.startswith('text:'):
+            return {'key': key, 'type': 'text', 'value': locator[len('text:'):], 'deep': deep}
+        for prefix in ('css:', 'c:'):
+            if locator.startswith(prefix):
+                return {'key': key, 'type': 'css', 'value': locator[len(prefix):]}
+        if locator.startswith('tag:'):
+            # tag:input 与 tag:input@type=password（单个属性精确匹配）
+            tag, _, attr = locator[len('tag:'):].partition('@')
+            if not tag or any(c in tag for c in ' :@()'):
+                return None
+            if not attr:
+                return {'key': key, 'type': 'css', 'value': tag}
+            name, sep, value = attr.partition('=')
+            if not sep or not name or any(c in name + value for c in '@()"\'[]'):
+                return None
+            return {'key': key, 'type': 'css', 'value': f'{tag}[{name}="{value}"]'}
+        if locator[:1] in ('#', '.') and all(c not in locator for c in ' :@=()[]'):
+            return {'key': key, 'type': 'css', 'value': locator}
+        return None
+
+    @staticmethod
+    def probe_specs(tab, specs: list) -> dict:
+        """一次往返查询所有 specs，返回 {key: ProbeState}。"""
+        raw = DomProbeUtil._call(tab, 'probe', json.dumps(specs, ensure_ascii=False))
+        states = json.loads(raw) if raw else {}
+        return {spec['key']: ProbeState(**states.get(spec['key'], {})) for spec in specs}
+
+    @staticmethod
+    def click_deep(tab, host_xpath: str, text: str) -> bool:
+        """在所有可见的宿主组件（含Shadow Root）内递归查找包含 text 的按钮并点击，一次往返。"""
+        return bool(DomProbeUtil._call(tab, 'clickDeep', host_xpath, text))
+
+    @staticmethod
+    def connected_accounts(tab) -> list:
+        """当前页面所在站点已获钱包授权的地址列表（eth_accounts），一次往返，不会触发钱包弹窗。"""
+        raw = tab.run_js(DomProbeUtil.ACCOUNTS_JS)
+        return json.loads(raw) if raw else []
+
+
+# 标签页关闭后它的隔离环境随之销毁，丢弃记录避免长时间运行时不断累积
+TabRegistry.add_close_listener(DomProbeUtil.forget)
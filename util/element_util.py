@@ -0,0 +1,139 @@
+import time
+from dataclasses import dataclass
+
+from config import AppConfig
+from util.cancel_util import CancelUtil
+from util.dom_probe_util import DomProbeUtil
+from util.log_util import log_util
+
+# DrissionPage是可选依赖；页面刷新、元素失效属于查找过程中的正常情况，视为本轮未命中
+try:
+    from DrissionPage.errors import ContextLostError, ElementLostError
+    _TRANSIENT_ERRORS = (ContextLostError, ElementLostError)
+except ImportError:
+    _TRANSIENT_ERRORS = ()
+
+
+@dataclass
+class RaceResult:
+    key: str = None  # 命中的选择器键，超时为None
+    element: object = None
+    clickable: bool = False
+    visible: bool = False  # 命中时元素是否可见，调用方不必再查询 element.states.is_displayed
+
+    def __bool__(self):
+        return self.key is not None
+
+
+class ElementUtil:
+    """
+    页面元素查找工具。
+    """
+
+    @staticmethod
+    def race(root, selectors: dict, timeout: float, require_clickable=False,
+             poll_interval: float = None) -> RaceResult:
+        """
+        在同一个轮询循环、同一个截止时间内等待多个选择器，返回最先命中的那个。
+        用于替代串行的 ele(..., timeout=10) 链：页面只会出现其中一个分支时，串行查找每个落空的分支
+        都要白等完整的超时，而这里总等待时间不超过 timeout。
+
+        :param root: 默认的查找根（页面、标签页、元素、shadow root 或 iframe）。
+        :param selectors: 有序字典 {键: 定位符} 或 {键: (查找根, 定位符)}。同一轮中多个选择器
+                          同时命中时，按字典顺序取第一个，因此顺序即优先级。
+        :param timeout: 共享的最长等待时间（秒），0 表示只查找一轮。
+        :param require_clickable: True 时只有可点击的元素才算命中，不可点击的继续等待；
+                                  也可以传入键的集合，只对其中的选择器要求可点击。
+        :param poll_interval: 每轮之间的间隔，默认 AppConfig.ELEMENT_RACE_POLL_INTERVAL。
+        :return: RaceResult；超时未命中时 key 为 None（布尔值为 False）。
+        """
+        interval = poll_interval or AppConfig.ELEMENT_RACE_POLL_INTERVAL
+        deadline = time.monotonic() + timeout
+        specs = ElementUtil._probe_specs(root, selectors)
+        while True:
+            if specs is not None:
+                try:
+                    result = ElementUtil._poll_probed(root, selectors, specs, require_clickable)
+                except _TRANSIENT_ERRORS:
+                    result = None
+                except Exception as e:
+                    log_util.warn("元素查找", f"批量页面探测失败，改为逐个查找: {e}")
+                    specs = None
+                    continue
+            else:
+                result = ElementUtil._poll_each(root, selectors, require_clickable)
+            if result:
+                return result
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return RaceResult()
+            CancelUtil.sleep(min(interval, remaining))
+
+    @staticmethod
+    def _probe_specs(root, selectors: dict):
+        """所有选择器都在同一个标签页上且定位符都能由页面探测辅助库处理时，返回批量查询描述。"""
+        if not AppConfig.DOM_PROBE_ENABLED or not DomProbeUtil.supports(root):
+            return None
+        specs = []
+        for key, selector in selectors.items():
+            spec = None if isinstance(selector, tuple) else DomProbeUtil.to_spec(key, selector)
+            if spec is None:
+                return None
+            specs.append(spec)
+        return specs
+
+    @staticmethod
+    def _poll_probed(root, selectors, specs, require_clickable):
+        """一次往返取得所有选择器的状态，只对命中的那个再取元素对象。"""
+        states = DomProbeUtil.probe_specs(root, specs)
+        for key, state in states.items():
+            if not state.exists:
+                continue
+            if state.clickable or not ElementUtil._needs_clickable(require_clickable, key):
+                element = ElementUtil._find_now(root, selectors[key])
+                if element:
+                    return RaceResult(key, element, state.clickable, state.visible)
+        return None
+
+    @staticmethod
+    def _poll_each(root, selectors, require_clickable):
+        for key, selector in selectors.items():
+            lookup_root, locator = selector if isinstance(selector, tuple) else (root, selector)
+            element = ElementUtil._find_now(lookup_root, locator)
+            if not element:
+                continue
+            clickable = ElementUtil.is_clickable(element)
+            if clickable or not ElementUtil._needs_clickable(require_clickable, key):
+                return RaceResult(key, element, clickable, clickable or ElementUtil.is_displayed(element))
+        return None
+
+    @staticmethod
+    def _needs_clickable(require_clickable, key) -> bool:
+        if isinstance(require_clickable, bool):
+            return require_clickable
+        return key in require_clickable
+
+    @staticmethod
+    def _find_now(root, locator):
+        """不等待地查找一次。页面已断开等其他异常照常抛出，与直接调用 ele 一致。"""
+        if root is None:
+            return None
+        try:
+            return root.ele(locator, timeout=0)
+        except _TRANSIENT_ERRORS:
+            return None
+
+    @staticmethod
+    def is_clickable(element) -> bool:
+        try:
+            return bool(element.states.is_clickable)
+        except _TRANSIENT_ERRORS:
+            return False
+
+    @staticmethod
+    def is_displayed(element) -> bool:
+        try:
+            return bool(element.states.is_displayed)
+        except _TRANSIENT_ERRORS:
+            return False
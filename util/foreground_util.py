@@ -0,0 +1,58 @@
+import threading
+
+from config import AppConfig
+from util.log_util import log_util
+from util.tab_registry import TabRegistry
+
+
+class ForegroundUtil:
+    """
+    让自动化页面始终保持前台状态。
+    Chrome 会对被遮挡、重叠或未获得焦点的窗口中的页面做后台节流（定时器降频、暂停渲染），页面操作会不可预测地变慢。
+    这里对每个标签页开启CDP焦点模拟（Emulation.setFocusEmulationEnabled），并把页面生命周期设为 active，
+    页面始终认为自己处于前台且拥有焦点；配合启动参数关闭后台节流后，并发数可以超过屏幕能平铺的窗口数。
+    设置绑定在标签页的CDP会话上，跳转和刷新后仍然有效，每个标签页只需设置一次。
+    """
+    # 启动浏览器时传给 AdsPower 的参数，关闭后台定时器节流和被遮挡窗口的渲染降级
+    LAUNCH_ARGS = (
+        '--disable-background-timer-throttling',
+        '--disable-backgrounding-occluded-windows',
+        '--disable-renderer-backgrounding',
+    )
+
+    _applied = set()  # 已设置的 tab_id
+    _lock = threading.Lock()
+
+    @staticmethod
+    def keep_foreground(tab) -> bool:
+        """对标签页开启焦点模拟。AppConfig.FOCUS_EMULATION_ENABLED 关闭或已设置过时直接返回。"""
+        if not AppConfig.FOCUS_EMULATION_ENABLED:
+            return False
+        with ForegroundUtil._lock:
+            if tab.tab_id in ForegroundUtil._applied:
+                return True
+            ForegroundUtil._applied.add(tab.tab_id)
+        try:
+            tab.run_cdp('Emulation.setFocusEmulationEnabled', enabled=True)
+            tab.run_cdp('Page.setWebLifecycleState', state='active')
+            return True
+        except Exception as e:
+            with ForegroundUtil._lock:
+                ForegroundUtil._applied.discard(tab.tab_id)
+            log_util.warn("焦点模拟", f"为标签页开启焦点模拟失败: {e}")
+            return False
+
+    @staticmethod
+    def forget(tab_id):
+        """标签页关闭后移除其记录。"""
+        with ForegroundUtil._lock:
+            ForegroundUtil._applied.discard(tab_id)
+
+    @staticmethod
+    def launch_args() -> list:
+        """启动浏览器时需要附加的参数；未开启焦点模拟时为空。"""
+        return list(ForegroundUtil.LAUNCH_ARGS) if AppConfig.FOCUS_EMULATION_ENABLED else []
+
+
+# 标签页关闭后移除记录，避免长时间运行时 _applied 不断累积
+TabRegistry.add_close_listener(ForegroundUtil.forget)
@@ -32,6 +32,7 @@ class LogUtil:
                 return
             
             self.ui_handlers = []
+            self.forwarder = None
             self.log_buffer = []
             self.buffer_lock = threading.Lock()
             
@@ -47,6 +48,13 @@ class LogUtil:
             
             self._initialized = True
 
+    def set_forwarder(self, forwarder):
+        """
+        设置日志转发函数。设置后日志不再打印、写文件或通知UI，而是整条交给转发函数，
+        用于多进程调度时把子进程的日志送回主进程统一输出（主进程调用 emit）。
+        """
+        self.forwarder = forwarder
+
     def add_ui_handler(self, handler):
         if handler not in self.ui_handlers:
             self.ui_handlers.append(handler)
@@ -103,7 +111,16 @@ class LogUtil:
 
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         full_message = f"[{timestamp}] [{level.upper()}] [{user_id}] {location}{message}{stack_trace}"
-        
+        if self.forwarder:
+            try:
+                self.forwarder(full_message)
+                return
+            except Exception as e:
+                print(f"[CRITICAL] Log forwarder failed: {e}")
+        self.emit(full_message)
+
+    def emit(self, full_message: str):
+        """输出一条已格式化的日志。"""
         # 1. 立即打印到控制台
         print(full_message)
         
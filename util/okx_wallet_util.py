@@ -1,6 +1,14 @@
 import os
 import time
 
+from config import AppConfig
+from .cancel_util import CancelUtil
+from .dom_probe_util import DomProbeUtil
+from .element_util import ElementUtil
+from .selector_strategy_memo import selector_strategy_memo
+from .session_state_cache import session_state_cache
+from .tab_registry import TabRegistry
+
 # DrissionPage是可选依赖，只有在使用dp方法时才需要
 try:
     from DrissionPage import ChromiumPage
@@ -19,6 +27,10 @@ class OKXWalletUtil:
     # EXTENSION_ID = 'mcohilncbfahbmgdjkbpemcciiolgcge'
     EXTENSION_ID = 'cgakmdfcojbiaaodedeaofbbnemebmdi'
 
+    SEND_BUTTON_XPATH = 'xpath://*[contains(., "发送") or contains(., "發送")]'  # 兼容简体“发送”和繁体“發送”
+    ACTION_BUTTON_XPATH = 'xpath://button[contains(., "确认") or contains(., "確認") or contains(., "连接") or contains(., "連接")]'
+    MODAL_HOSTS_XPATH = "xpath://*[contains(local-name(), 'modal')]"
+
     def __init__(self):
         self.password_file = "resource/okxPassword.txt"
         if OKXWalletUtil.PASSWORD is None:
@@ -39,10 +51,48 @@ class OKXWalletUtil:
     def confirm_transaction_drission(self, browser, user_id: str):
         """
         等待并处理OKX钱包的通用弹窗，可处理连续出现的多个弹窗。
+        钱包弹窗的出现和关闭通过标签页注册表（CDP Target事件）感知，不再轮询 get_tabs。
+        """
+        registry = TabRegistry.for_browser(browser)
+        if not AppConfig.TAB_REGISTRY_ENABLED:
+            return self._confirm_transaction_polling(browser, user_id, registry)
+
+        message = None
+        wallet_page = None
+
+        # 阻塞等待钱包弹窗出现，弹窗一出现就被事件唤醒
+        if not registry.wait_for_extension_popup(self.EXTENSION_ID, timeout=AppConfig.WALLET_POPUP_TIMEOUT):
+            message = "未找到任何OKX钱包页面。可能已断开或未弹出。"
+            log_util.error(user_id, message)
+            raise Exception(message)
+
+        try:
+            while True:
+                CancelUtil.check()
+                tab_id = registry.extension_tab_id(self.EXTENSION_ID)
+                if not tab_id:
+                    break
+                wallet_page = browser.get_tab(tab_id)
+                message = self._handle_wallet_popup(wallet_page, user_id) or message
+            if message:
+                return message
+            else:
+                return True
+
+        except Exception as e:
+            if wallet_page and wallet_page.tab_id in browser.tab_ids:
+                wallet_page.close()
+            raise Exception(f"钱包操作错误: {e}")
+
+    def _confirm_transaction_polling(self, browser, user_id: str, registry):
+        """
+        旧的轮询实现：每轮调用 get_tabs 并读取每个页面的URL。
+        保留用于对比标签页注册表前后的CDP轮询次数和弹窗检测延迟（AppConfig.TAB_REGISTRY_ENABLED=False）。
         """
         # 嵌套函数，用于检查是否存在钱包标签页
         def wallet_tab_exists():
             from DrissionPage.errors import PageDisconnectedError
+            TabRegistry.record_polls(browser)
             for tab in browser.get_tabs():
                 try:
                     # 尝试访问URL，如果页面断开会在此处抛出异常
@@ -56,7 +106,6 @@ class OKXWalletUtil:
 
         message = None
         wallet_page = None
-        last_tab_id = None  # 用于跟踪上一个操作的tab_id,但是解决不了页面断开的bug
 
         # 在进入循环前，必须确保钱包页面存在，否则调用此函数本身就是个逻辑错误
         AntiSybilDpUtil.human_short_wait()
@@ -64,84 +113,90 @@ class OKXWalletUtil:
             message = "未找到任何OKX钱包页面。可能已断开或未弹出。"
             log_util.error(user_id, message)
             raise Exception(message)
+        registry.note_detected(self.EXTENSION_ID)
 
         try:
             while wallet_tab_exists():
+                CancelUtil.check()
+                TabRegistry.record_polls(browser)
                 wallet_page = next((tab for tab in browser.get_tabs() if self.EXTENSION_ID in tab.url), None)
 
                 if not wallet_page:
-                    time.sleep(1)
+                    CancelUtil.sleep(1)
                     continue
-                # 如果页面没有变化，则继续等待
-                # if wallet_page.tab_id == last_tab_id:
-                #     time.sleep(1)
-                #     continue
-
-                # 优先处理“取消交易”弹窗
-                cancel_tx_button = wallet_page.ele('text:取消交易', timeout=10)
-                if cancel_tx_button and cancel_tx_button.states.is_clickable:
-                    cancel_tx_button.click()
-                    last_tab_id = wallet_page.tab_id
-                    AntiSybilDpUtil.human_long_wait()
-                    continue
-
-                # 处理“确认”或“连接”
-                action_button = wallet_page.ele(
-                    'xpath://button[contains(., "确认") or contains(., "確認") or contains(., "连接") or contains(., "連接")]', timeout=10
-                )
-                if action_button and action_button.states.is_clickable:
-                    action_button.click()
-                    last_tab_id = wallet_page.tab_id
-                    AntiSybilDpUtil.human_long_wait()
-                    continue
-
-                # 处理“取消”
-                cancel_button = wallet_page.ele('text:取消', timeout=10)
-                if cancel_button and cancel_button.states.is_clickable:
-                    cancel_button.click()
-                    last_tab_id = wallet_page.tab_id
-                    AntiSybilDpUtil.human_long_wait()
-                    message = "okx全部只能点击取消按钮。"
-                    log_util.error(user_id, message)
-                    continue
-
-                time.sleep(1)
+                message = self._handle_wallet_popup(wallet_page, user_id) or message
             if message:
                 return message
             else:
                 return True
-            
+
         except Exception as e:
             if wallet_page and wallet_page.tab_id in browser.tab_ids:
                 wallet_page.close()
             raise Exception(f"钱包操作错误: {e}")
-    
+
+    def _handle_wallet_popup(self, wallet_page, user_id: str):
+        """
+        处理一次钱包弹窗：在同一个10秒内同时等待“取消交易”、“确认/连接”、“取消”按钮，
+        同时可点击时按此顺序优先。只能点击“取消”时返回错误信息，其余情况返回None。
+        """
+        found = ElementUtil.race(wallet_page, {
+            'cancel_tx': 'text:取消交易',
+            'action': self.ACTION_BUTTON_XPATH,
+            'cancel': 'text:取消',
+        }, timeout=10, require_clickable=True)
+        if not found:
+            CancelUtil.sleep(1)
+            return None
+
+        found.element.click()
+        AntiSybilDpUtil.human_long_wait()
+        if found.key == 'cancel':
+            message = "okx全部只能点击取消按钮。"
+            log_util.error(user_id, message)
+            return message
+        return None
+
     def open_and_unlock_drission(self, browser, user_id: str):
         """
         使用 DrissionPage 打开并解锁OKX钱包。
         如果钱包已解锁，则直接返回。
         如果需要解锁，则执行解锁操作并保持页面打开。
         失败时会尝试关闭页面并抛出异常。
+        会话状态缓存表明钱包近期已解锁时，跳过长等待，只用很短的时间探测一次确认。
         """
         wallet_tab = None
+        scope = session_state_cache.UNLOCK_SCOPE
         try:
             if not self.PASSWORD:
                 raise Exception("未加载钱包密码，无法解锁")
 
             wallet_url = f"chrome-extension://{self.EXTENSION_ID}/popup.html"
             wallet_tab = browser.new_tab(url=wallet_url)
-            AntiSybilDpUtil.human_long_wait()
 
-            # 使用 xpath 兼容简体“发送”和繁体“發送”
-            send_button_xpath = 'xpath://*[contains(., "发送") or contains(., "發送")]'
+            # 已解锁、旧版密码框、新版iframe密码框三个分支共用一个截止时间
+            unlock_selectors = {
+                'unlocked': self.SEND_BUTTON_XPATH,
+                'password': 'tag:input@type=password',
+                'iframe': 'tag:iframe',
+            }
+            state = None
+            if session_state_cache.is_fresh(user_id, scope, AppConfig.SESSION_UNLOCK_TTL):
+                state = ElementUtil.race(wallet_tab, unlock_selectors, timeout=AppConfig.SESSION_PROBE_TIMEOUT)
+                if state.key != 'unlocked':
+                    log_util.info(user_id, "缓存的钱包解锁状态已失效，重新检测。")
+                    session_state_cache.invalidate(user_id, scope)
+            if not state:
+                AntiSybilDpUtil.human_long_wait()
+                state = ElementUtil.race(wallet_tab, unlock_selectors, timeout=10)
 
-            if wallet_tab.ele(send_button_xpath, timeout=10):
+            if state.key == 'unlocked':
                 log_util.info(user_id, "钱包已经是解锁状态")
+                session_state_cache.mark(user_id, scope)
                 wallet_tab.close()
             else:
-                password_input = wallet_tab.ele('tag:input@type=password', timeout=5)  # 使用较短超时
-                if password_input:
-                    password_input.input(self.PASSWORD)
+                if state.key == 'password':
+                    state.element.input(self.PASSWORD)
                     AntiSybilDpUtil.human_short_wait()
                     unlock_button = wallet_tab.ele('tag:button@type=submit', timeout=10)
                     unlock_button.click()
@@ -157,28 +212,34 @@ class OKXWalletUtil:
                         # unlock_button_in_frame = iframe.ele('tag:button@type=submit', timeout=10)
                         # unlock_button_in_frame.click()
                         wallet_tab.actions.key_down("Enter")
-                        time.sleep(0.1)
+                        CancelUtil.sleep(0.1)
                         wallet_tab.actions.key_up("Enter")
                         AntiSybilDpUtil.human_short_wait()
                     else:
                         raise Exception("在iframe内未找到placeholder为'请输入密码'的输入框")
 
-                # 解锁后，检查并处理可能出现的“取消交易”弹窗
-                cancel_tx_button = wallet_tab.ele('text:取消交易', timeout=10)
-                if cancel_tx_button and cancel_tx_button.states.is_clickable:
+                # 解锁后，处理可能出现的“取消交易”/“取消”弹窗（最多各一次），出现“发送”即解锁完成
+                unlocked = False
+                for _ in range(2):
+                    after_unlock = ElementUtil.race(wallet_tab, {
+                        'cancel_tx': 'text:取消交易',
+                        'cancel': 'text:取消',
+                        'unlocked': self.SEND_BUTTON_XPATH,
+                    }, timeout=10, require_clickable={'cancel_tx', 'cancel'})
+                    if after_unlock.key in (None, 'unlocked'):
+                        unlocked = after_unlock.key == 'unlocked'
+                        break
                     AntiSybilDpUtil.human_short_wait()
-                    cancel_tx_button.click()
+                    after_unlock.element.click()
                     AntiSybilDpUtil.human_short_wait()
 
-                cancel_button = wallet_tab.ele('text:取消', timeout=10)
-                if cancel_button and cancel_button.states.is_clickable:
+                if not unlocked:
                     AntiSybilDpUtil.human_short_wait()
-                    cancel_button.click()
-                    AntiSybilDpUtil.human_short_wait()
-
-                AntiSybilDpUtil.human_short_wait()
-                if not wallet_tab.wait.ele_displayed(send_button_xpath, timeout=10):
-                    log_util.warn(user_id, "未能确认钱包是否解锁，请手动确认。")
+                    unlocked = bool(wallet_tab.wait.ele_displayed(self.SEND_BUTTON_XPATH, timeout=10))
+                    if not unlocked:
+                        log_util.warn(user_id, "未能确认钱包是否解锁，请手动确认。")
+                if unlocked:
+                    session_state_cache.mark(user_id, scope)
 
                 if wallet_tab and wallet_tab.tab_id in browser.tab_ids:
                     wallet_tab.close()
@@ -189,103 +250,153 @@ class OKXWalletUtil:
                 wallet_tab.close()
             raise Exception(f"解锁钱包过程中失败: {e}")
 
+    def is_connection_cached(self, page, user_id: str) -> bool:
+        """
+        页面所在dApp近期已确认连接过钱包，且 eth_accounts 探测仍有授权地址时返回True，
+        调用方可以跳过连接按钮/地址的检测等待。探测不通过时作废该缓存。
+        """
+        scope = session_state_cache.connect_scope(selector_strategy_memo.domain_of(page.url))
+        if not session_state_cache.is_fresh(user_id, scope, AppConfig.SESSION_CONNECT_TTL):
+            return False
+        try:
+            accounts = DomProbeUtil.connected_accounts(page)
+        except Exception as e:
+            log_util.warn(user_id, f"探测dApp钱包连接状态失败: {e}")
+            accounts = []
+        if accounts:
+            log_util.info(user_id, f"{scope} 的钱包连接状态缓存有效，跳过连接检测。")
+            return True
+        log_util.info(user_id, f"{scope} 的钱包连接状态缓存已失效，重新检测。")
+        session_state_cache.invalidate(user_id, scope)
+        return False
+
+    def remember_connection(self, page, user_id: str):
+        """记录页面所在dApp已确认连接钱包。"""
+        session_state_cache.mark(user_id, session_state_cache.connect_scope(selector_strategy_memo.domain_of(page.url)))
+
     def click_OKX_in_selector(self, browser, page: ChromiumPage, user_id: str):
         """
-        在钱包选择弹窗中，通过尝试多种策略智能查找并点击OKX钱包选项。
+        在钱包选择弹窗中，通过尝试多种策略智能查找并点击OKX钱包选项：
+        'text' 全局文本搜索、'shadow' Modal宿主组件的Shadow Root查找、'js' JS递归注入。
+        按站点记住上次生效的策略，下次首先尝试它，其余策略只以较短的等待时间作为备选。
+        """
+        domain = selector_strategy_memo.domain_of(page.url)
+        preferred = selector_strategy_memo.preferred(domain)
+
+        winner = None
+        for strategies, timeout in self._okx_strategy_plan(preferred):
+            if strategies == ('js',):
+                if self._click_okx_by_js(page, timeout):
+                    winner = 'js'
+                    break
+                continue
+            strategy, clicked_element = self._find_okx_in_dom(page, strategies, timeout)
+            if clicked_element:
+                page.actions.click(clicked_element)
+                winner = strategy
+                break
+
+        selector_strategy_memo.record(domain, preferred, winner)
+        if preferred and winner != preferred:
+            log_util.info(user_id, f"{domain} 记住的OKX查找策略 '{preferred}' 未生效，实际生效: {winner}")
+
+        if winner:
+            AntiSybilDpUtil.human_long_wait()
+            if self.confirm_transaction_drission(browser, user_id) is True:
+                self.remember_connection(page, user_id)
+        else:
+            raise Exception("尝试所有策略后，仍未能找到可点击的OKX Wallet选项。")
+
+    @staticmethod
+    def _okx_strategy_plan(preferred):
+        """
+        返回 [(策略组, 等待时间)]。没有记忆时保持原有顺序：全局文本与Shadow Root同时查找，其次JS注入；
+        有记忆时先只用记住的策略等待完整时间，其余策略按原有顺序以备选时间依次尝试。
+        """
+        full = AppConfig.OKX_SELECTOR_TIMEOUT
+        fallback = AppConfig.OKX_SELECTOR_FALLBACK_TIMEOUT
+        if preferred == 'js':
+            return [(('js',), full), (('text', 'shadow'), fallback)]
+        if preferred in ('text', 'shadow'):
+            others = [s for s in ('text', 'shadow', 'js') if s != preferred]
+            return [((preferred,), full)] + [((s,), fallback) for s in others]
+        return [(('text', 'shadow'), full), (('js',), fallback)]
+
+    def _find_okx_in_dom(self, page, strategies, timeout):
+        """
+        用DP原生查找OKX选项，strategies 为 'text'（全局文本）和/或 'shadow'（各Modal宿主的Shadow Root）。
+        所有位置共用一个截止时间，同时命中时按 strategies 的顺序优先。
+        Modal宿主在点击 Connect 后才渲染，因此每轮都重新列出宿主，宿主出现前也会等待至多 timeout 秒。
+        返回 (生效的策略, 可点击的元素)，未找到时返回 (None, None)。
         """
-        okx_button_found = False
-        clicked_element = None
-
-        # --- 策略1: 全局文本搜索 (DP原生，最高优先级) ---
-        okx_text_element = page.ele('text:OKX Wallet', timeout=10)
-        if okx_text_element:
-            # 优先检查文本元素自身是否可点击 (处理父元素是“假”按钮的情况)
-            if okx_text_element.states.is_clickable:
-                clicked_element = okx_text_element
+        deadline = time.monotonic() + timeout
+        while True:
+            selectors = self._okx_selectors(page, strategies)
+            found = ElementUtil.race(page, selectors, timeout=0) if selectors else None
+            if found:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None, None
+            CancelUtil.sleep(min(AppConfig.ELEMENT_RACE_POLL_INTERVAL, remaining))
+
+        strategy = found.key.split('_')[0]
+        # 优先检查文本元素自身是否可点击 (处理父元素是“假”按钮的情况)
+        if found.clickable:
+            return strategy, found.element
+        # 如果文本自身不可点击，再查找其可点击的父按钮
+        button = found.element.parent('tag:button')
+        if button and button.states.is_clickable:
+            return strategy, button
+        return None, None
+
+    def _okx_selectors(self, page, strategies):
+        """按 strategies 的顺序生成本轮要查找的选择器，'shadow' 为当前每个可见Modal宿主的Shadow Root各生成一个。"""
+        selectors = {}
+        for strategy in strategies:
+            if strategy == 'text':
+                selectors['text'] = 'text:OKX Wallet'
             else:
-                # 如果文本自身不可点击，再查找其可点击的父按钮
-                button = okx_text_element.parent('tag:button')
-                if button and button.states.is_clickable:
-                    clicked_element = button
-
-        # --- 策略2: 在Modal宿主组件的Shadow Root中查找 (DP原生，第二优先级) ---
-        if not clicked_element:
-            modal_hosts = page.eles("xpath://*[contains(local-name(), 'modal')]")
-            if modal_hosts:
-                for host in modal_hosts:
-                    if not host.states.is_displayed: continue
+                for index, host in enumerate(page.eles(self.MODAL_HOSTS_XPATH, timeout=0)):
                     try:
-                        shadow_root = host.shadow_root
-                        okx_text_in_shadow = shadow_root.ele('text:OKX Wallet', timeout=10)
-                        if okx_text_in_shadow:
-                            # 同样采用“先内后外”的点击逻辑
-                            if okx_text_in_shadow.states.is_clickable:
-                                clicked_element = okx_text_in_shadow
-                                break
-                            else:
-                                button = okx_text_in_shadow.parent('tag:button')
-                                if button and button.states.is_clickable:
-                                    clicked_element = button
-                                    break
+                        if host.states.is_displayed and host.shadow_root:
+                            selectors[f'shadow_{index}'] = (host.shadow_root, 'text:OKX Wallet')
                     except Exception:
                         continue
+        return selectors
 
-        # --- 策略3: JS递归注入 ---
-        if not clicked_element:
-            js_find_and_click = '''
-            function findWalletAndClick(rootElement, walletName) {
-                let foundNode = null;
-                function traverse(node) {
-                    if (!node || foundNode) return;
-                    if (node.shadowRoot) { traverse(node.shadowRoot); }
-                    if (!foundNode && node.childNodes) { node.childNodes.forEach(traverse); }
-                    if (!foundNode && node.innerText && node.innerText.includes(walletName) && (node.tagName === 'BUTTON' || node.tagName === 'DIV' || node.onclick)) {
-                        foundNode = node;
-                        return;
-                    }
-                }
-                traverse(rootElement.shadowRoot ? rootElement.shadowRoot : rootElement);
-                if (foundNode) { foundNode.click(); return true; }
-                return false;
-            }
-            return findWalletAndClick(arguments[0], arguments[1]);
-            '''
-            # 复用策略2找到的hosts，如果之前没找到，重新找一次
-            if 'modal_hosts' not in locals():
-                modal_hosts = page.eles("xpath://*[contains(local-name(), 'modal')]")
-
-            if modal_hosts:
-                for host in modal_hosts:
-                    if host.states.is_displayed:
-                        try:
-                            if page.run_js(js_find_and_click, host, "OKX Wallet"):
-                                okx_button_found = True # JS已点击，只需标记成功
-                                break
-                        except Exception:
-                            continue
-
-        # --- 最终执行或报错 ---
-        if clicked_element:
-            page.actions.click(clicked_element)
-            okx_button_found = True
-
-        if okx_button_found:
-            AntiSybilDpUtil.human_long_wait()
-            self.confirm_transaction_drission(browser, user_id)
-        else:
-            raise Exception("尝试所有策略后，仍未能找到可点击的OKX Wallet选项。")
+    def _click_okx_by_js(self, page, timeout):
+        """
+        在每个可见的Modal宿主组件内递归查找并用JS点击OKX选项，宿主尚未渲染时等待至多 timeout 秒。
+        查找和点击由页面探测辅助库在一次往返内完成，不再逐个宿主传输脚本和查询可见性。
+        """
+        host_xpath = self.MODAL_HOSTS_XPATH[len('xpath:'):]
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if DomProbeUtil.click_deep(page, host_xpath, "OKX Wallet"):
+                    return True
+            except Exception as e:
+                log_util.warn("OKX钱包", f"JS查找OKX选项失败: {e}")
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            CancelUtil.sleep(min(AppConfig.ELEMENT_RACE_POLL_INTERVAL, remaining))
 
     def click_OKX_in_selector2(self, browser, page: ChromiumPage, user_id: str):
         """
         使用js去点击的。
         """
-        okx_wallet_button = page.ele(
-            'xpath://div[text()="OKX Wallet"]/parent::div/parent::div',
-            timeout=15
-        )
-        if not (okx_wallet_button and okx_wallet_button.states.is_displayed):
+        found = ElementUtil.race(page, {
+            'okx': 'xpath://div[text()="OKX Wallet"]/parent::div/parent::div',
+        }, timeout=15)
+        if not (found and found.visible):
             raise Exception("在DApp页面找不到 OKX Wallet 选项。")
 
-        okx_wallet_button.run_js("this.click();")
+        found.element.run_js("this.click();")
         AntiSybilDpUtil.human_long_wait()
-        self.confirm_transaction_drission(browser, user_id)
\ No newline at end of file
+        result = self.confirm_transaction_drission(browser, user_id)
+        if result is True:
+            self.remember_connection(page, user_id)
+        return result
\ No newline at end of file
@@ -0,0 +1,63 @@
+from dataclasses import dataclass
+
+from config import AppConfig
+from util.log_util import log_util
+
+
+@dataclass(frozen=True)
+class ResourceProfile:
+    """
+    项目页面的资源屏蔽配置。
+    block_types 为要屏蔽的资源类型（ResourceBlocker.TYPE_PATTERNS 中的键，如 'Image'、'Font'、'Media'），
+    block_urls 为额外屏蔽的URL通配模式（如统计分析脚本的域名）。
+    """
+    block_types: tuple = ()
+    block_urls: tuple = ()
+
+    def patterns(self) -> list:
+        patterns = []
+        for resource_type in self.block_types:
+            patterns.extend(ResourceBlocker.TYPE_PATTERNS.get(resource_type, ()))
+        patterns.extend(self.block_urls)
+        return patterns
+
+
+class ResourceBlocker:
+    """
+    通过CDP Network.setBlockedURLs 屏蔽项目脚本用不到的资源（图片、字体、视频、统计分析脚本），
+    减少多个浏览器共用同一上行链路时的页面加载等待。
+    setBlockedURLs 只支持URL通配模式，资源类型按文件扩展名转换为模式，而不是用 Fetch 拦截逐个放行请求：
+    后者每个请求都要经过一次CDP往返，且回调一旦阻塞整个页面都会卡住。
+    屏蔽设置对标签页之后的所有加载（跳转、刷新）持续有效，需在导航到项目页面之前调用 apply。
+    """
+    TYPE_PATTERNS = {
+        # SVG 常用作按钮图标，保留
+        'Image': ('*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.ico*'),
+        'Font': ('*.woff*', '*.ttf*', '*.otf*', '*.eot*'),
+        'Media': ('*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.mov*', '*.m3u8*'),
+    }
+
+    # 常见的统计分析、广告和客服组件域名
+    ANALYTICS_URLS = (
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+        '*hotjar.com*', '*clarity.ms*', '*mixpanel.com*', '*segment.io*', '*amplitude.com*',
+        '*intercom.io*', '*posthog.com*',
+    )
+
+    # 大多数dApp页面通用的配置
+    DAPP_PROFILE = ResourceProfile(block_types=('Image', 'Font', 'Media'), block_urls=ANALYTICS_URLS)
+
+    @staticmethod
+    def apply(tab, profile: ResourceProfile) -> bool:
+        """
+        在标签页上应用资源屏蔽配置；profile 为None或 AppConfig.RESOURCE_BLOCKING_ENABLED 关闭时清除屏蔽。
+        返回是否实际屏蔽了资源。
+        """
+        patterns = profile.patterns() if profile and AppConfig.RESOURCE_BLOCKING_ENABLED else []
+        try:
+            tab.run_cdp('Network.enable')
+            tab.run_cdp('Network.setBlockedURLs', urls=patterns)
+        except Exception as e:
+            log_util.warn("资源屏蔽", f"设置资源屏蔽失败，页面将加载全部资源: {e}")
+            return False
+        return bool(patterns)
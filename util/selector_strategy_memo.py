@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+from config import AppConfig
+from util.log_util import log_util
+
+
+class SelectorStrategyMemo:
+    """
+    按站点域名记住“哪种查找策略能找到钱包选项”的备忘录。
+    同一个dApp上每次都是同一种策略生效，记住之后下次先用它，其余策略只作为备选。
+    记住的策略连续失败 SELECTOR_STRATEGY_MAX_FAILURES 次后作废，改用当次实际生效的策略（或重新学习）。
+    记录跨运行持久化到 AppConfig.SELECTOR_STRATEGY_FILE。这是一个线程安全的单例。
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._loaded = False
+        return cls._instance
+
+    def __init__(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self.file_path = AppConfig.SELECTOR_STRATEGY_FILE
+            # domain -> {'strategy', 'hits', 'misses', 'failures'}
+            self._entries = {}
+            self.forwarder = None
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except Exception as e:
+            log_util.error("策略备忘录", f"读取查找策略记录 {self.file_path} 失败，将重新学习: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """先写临时文件再替换，避免写入中途崩溃损坏记录。"""
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            log_util.error("策略备忘录", f"保存查找策略记录 {self.file_path} 失败: {e}")
+
+    def set_forwarder(self, forwarder):
+        """
+        设置记录转发函数。设置后 record 只更新内存中的记录，再把参数 (domain, preferred, winner) 交给转发函数，
+        不再写文件；用于多进程调度时由主进程重放子进程的记录并统一写盘。
+        """
+        self.forwarder = forwarder
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        return urlparse(url or "").netloc or "unknown"
+
+    def preferred(self, domain: str):
+        """该域名记住的策略，没有时返回None。"""
+        with self._lock:
+            return self._entries.get(domain, {}).get('strategy')
+
+    def record(self, domain: str, preferred, winner):
+        """
+        记录一次查找结果。
+        :param preferred: 本次首先尝试的记忆策略（没有记忆时为None）。
+        :param winner: 本次实际生效的策略，全部失败时为None。
+        """
+        with self._lock:
+            entry = self._entries.setdefault(domain, {'strategy': None, 'hits': 0, 'misses': 0, 'failures': 0})
+            if preferred is not None:
+                if winner == preferred:
+                    entry['hits'] += 1
+                    entry['failures'] = 0
+                else:
+                    entry['misses'] += 1
+                    entry['failures'] += 1
+                    if entry['failures'] >= AppConfig.SELECTOR_STRATEGY_MAX_FAILURES:
+                        # 转发时由主进程重放这条记录并输出警告，避免重复日志
+                        if self.forwarder is None:
+                            log_util.warn("策略备忘录", f"{domain} 记住的策略 '{preferred}' 已连续失败 "
+                                                   f"{entry['failures']} 次，作废并重新学习。")
+                        entry['strategy'] = None
+                        entry['failures'] = 0
+            if entry['strategy'] is None and winner:
+                entry['strategy'] = winner
+            if self.forwarder:
+                self.forwarder(domain, preferred, winner)
+            else:
+                self._save()
+
+    def summary(self) -> dict:
+        """各域名记住的策略及命中/未命中次数。"""
+        with self._lock:
+            return {domain: dict(entry) for domain, entry in self._entries.items()}
+
+
+# 导出的单例实例
+selector_strategy_memo = SelectorStrategyMemo()
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+import time
+
+from config import AppConfig
+from util.log_util import log_util
+
+
+class SessionStateCache:
+    """
+    按浏览器配置（user_id）记录钱包解锁状态和各dApp站点的钱包连接状态，带有效期（TTL）。
+    缓存新鲜时调用方只需做一次廉价探测确认，跳过耗时的检测流程（长等待、多个元素超时）；
+    缓存过期、不存在或探测不通过时回退到原有的完整检测逻辑。
+    记录跨运行持久化到 AppConfig.SESSION_STATE_FILE。这是一个线程安全的单例。
+    """
+    UNLOCK_SCOPE = 'okx_unlock'
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._loaded = False
+        return cls._instance
+
+    def __init__(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self.file_path = AppConfig.SESSION_STATE_FILE
+            self._states = {}  # user_id -> {scope: 记录时间戳（秒）}
+            self._counters = {'hits': 0, 'misses': 0, 'stale': 0}
+            self.forwarder = None
+            self._load()
+            self._loaded = True
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                self._states = json.load(f)
+        except Exception as e:
+            log_util.error("会话缓存", f"读取会话状态缓存 {self.file_path} 失败，将重新检测: {e}")
+            self._states = {}
+
+    def _save(self):
+        """先写临时文件再替换，避免写入中途崩溃损坏记录。"""
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._states, f, ensure_ascii=False)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            log_util.error("会话缓存", f"保存会话状态缓存 {self.file_path} 失败: {e}")
+
+    def set_forwarder(self, forwarder):
+        """
+        设置更新转发函数。设置后 mark/invalidate 只更新内存中的状态，再以 (操作名, user_id, scope) 交给转发函数，
+        不再写文件；用于多进程调度时由主进程调用 replay 重放子进程的更新并统一写盘。
+        """
+        self.forwarder = forwarder
+
+    @staticmethod
+    def connect_scope(domain: str) -> str:
+        return f"connect:{domain}"
+
+    def is_fresh(self, user_id: str, scope: str, ttl: float) -> bool:
+        """该状态是否在 ttl 秒内被确认过。"""
+        with self._lock:
+            recorded_at = self._states.get(user_id, {}).get(scope)
+            fresh = recorded_at is not None and time.time() - recorded_at < ttl
+            self._counters['hits' if fresh else 'misses'] += 1
+            return fresh
+
+    def mark(self, user_id: str, scope: str):
+        """记录该状态刚刚被确认。"""
+        with self._lock:
+            self._apply('mark', user_id, scope)
+
+    def invalidate(self, user_id: str, scope: str):
+        """缓存新鲜但探测未通过时调用，下次直接走完整检测。"""
+        with self._lock:
+            if self._apply('invalidate', user_id, scope):
+                self._counters['stale'] += 1
+
+    def replay(self, operation: str, user_id: str, scope: str):
+        """应用子进程转发来的更新，不计入本进程的命中统计。"""
+        with self._lock:
+            self._apply(operation, user_id, scope)
+
+    def _apply(self, operation, user_id, scope) -> bool:
+        """在持有锁的情况下更新状态，有变化时转发或写盘。返回是否有变化。"""
+        if operation == 'mark':
+            self._states.setdefault(user_id, {})[scope] = time.time()
+        elif self._states.get(user_id, {}).pop(scope, None) is None:
+            return False
+        if self.forwarder:
+            self.forwarder(operation, user_id, scope)
+        else:
+            self._save()
+        return True
+
+    def summary(self) -> dict:
+        """命中、未命中和探测失效的次数。"""
+        with self._lock:
+            return dict(self._counters)
+
+
+# 导出的单例实例
+session_state_cache = SessionStateCache()
@@ -0,0 +1,209 @@
+import threading
+from collections import OrderedDict
+
+from config import AppConfig
+from util.anti_sybil_dp_util import AntiSybilDpUtil
+from util.foreground_util import ForegroundUtil
+from util.log_util import log_util
+from util.resource_blocker import ResourceBlocker
+from util.tab_registry import TabRegistry
+
+
+class TabManager:
+    """
+    单个浏览器的标签页池。
+    项目脚本通过 open(url) 获取页面：已有同一URL前缀的页面时直接复用（激活并刷新），否则新建；
+    打开的普通页面数达到 AppConfig.MAX_TABS_PER_BROWSER 时按最近最少使用（LRU）关闭托管页面。
+    每个任务结束后由调度器调用 close_strays 关闭不受托管的残留页面，避免重复执行任务时
+    标签页和渲染进程在浏览器中不断累积。页面列表来自标签页注册表（CDP Target事件），不轮询 get_tabs。
+    open 时传入项目的资源屏蔽配置（ResourceProfile），会在页面导航前通过 ResourceBlocker 生效。
+    新建的每个页面都在导航前开启焦点模拟并注入反指纹补丁，与调度器准备的工作页面一致；
+    工作页面通过 adopt 登记为托管页面，不会被当作残留页面关闭，也不会在达到上限时被LRU淘汰。
+    """
+    _managers = {}  # browser.address -> TabManager
+    _lock = threading.Lock()
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.registry = TabRegistry.for_browser(browser)
+        self._lru = OrderedDict()  # tab_id -> URL前缀，最近使用的在末尾
+        self._profiles = {}  # tab_id -> 已应用的资源屏蔽配置
+        self._pinned = set()  # 通过 adopt 登记的工作页面，不参与LRU淘汰
+        self._tabs_lock = threading.Lock()
+        self.stats = {'opened': 0, 'reused': 0, 'evicted': 0, 'strays_closed': 0, 'recycled': 0, 'peak_tabs': 0}
+
+    @staticmethod
+    def for_browser(browser) -> 'TabManager':
+        """获取（必要时创建）指定浏览器的标签页池。"""
+        with TabManager._lock:
+            manager = TabManager._managers.get(browser.address)
+        if manager is not None and manager.browser is browser:
+            return manager
+
+        manager = TabManager(browser)
+        with TabManager._lock:
+            TabManager._managers[browser.address] = manager
+        return manager
+
+    @staticmethod
+    def discard(browser):
+        """移除标签页池而不访问浏览器（浏览器可能已无响应）。"""
+        with TabManager._lock:
+            TabManager._managers.pop(browser.address, None)
+
+    @staticmethod
+    def release_browser(browser) -> dict:
+        """浏览器关闭前调用：移除其标签页池并返回统计（含托管页面的JS堆占用）。没有标签页池时返回空字典。"""
+        with TabManager._lock:
+            manager = TabManager._managers.pop(browser.address, None)
+        if manager is None or manager.browser is not browser:
+            return {}
+        stats = dict(manager.stats)
+        stats['open_tabs'] = len(manager.registry.page_targets())
+        stats['js_heap_mb'] = manager.js_heap_mb()
+        return stats
+
+    def open(self, url: str, prefix: str = None, refresh: bool = True, profile=None):
+        """
+        获取URL前缀为 prefix（默认即 url）的页面：已存在时激活复用（refresh=True 时刷新），否则新建。
+        profile 为该页面的资源屏蔽配置（ResourceProfile），新建页面时在导航前应用。
+        """
+        prefix = prefix or url
+        tab_id = self._find(prefix)
+        if tab_id:
+            tab = self.browser.get_tab(tab_id)
+            tab.set.activate()
+            self._apply_profile(tab, profile)
+            if refresh:
+                tab.refresh()
+            self.stats['reused'] += 1
+        else:
+            self._make_room()
+            # 先打开空白页，在导航前开启焦点模拟、注入反指纹补丁并应用资源屏蔽
+            tab = self.browser.new_tab()
+            self._prepare_tab(tab)
+            if profile:
+                self._apply_profile(tab, profile)
+            tab.get(url)
+            self.stats['opened'] += 1
+
+        with self._tabs_lock:
+            self._lru[tab.tab_id] = prefix
+            self._lru.move_to_end(tab.tab_id)
+        self.stats['peak_tabs'] = max(self.stats['peak_tabs'], len(self._open_page_ids()))
+        return tab
+
+    def adopt(self, tab):
+        """
+        把已准备好的页面（调度器的工作页面）登记为托管页面：close_strays 不再把它当作残留页面关闭，
+        打开的页面达到上限时也不会淘汰它，任务正在操作的页面不会被关闭。
+        """
+        with self._tabs_lock:
+            self._lru[tab.tab_id] = tab.url or ''
+            self._lru.move_to_end(tab.tab_id)
+            self._pinned.add(tab.tab_id)
+
+    @staticmethod
+    def _prepare_tab(tab):
+        ForegroundUtil.keep_foreground(tab)
+        AntiSybilDpUtil.patch_webdriver_fingerprint(tab)
+
+    def _apply_profile(self, tab, profile):
+        with self._tabs_lock:
+            if self._profiles.get(tab.tab_id) == profile:
+                return
+        ResourceBlocker.apply(tab, profile)
+        with self._tabs_lock:
+            self._profiles[tab.tab_id] = profile
+
+    def release(self, tab):
+        """任务用完页面后调用。页面保留在池中供下次复用，已被关闭的页面在 close_strays 时移出池。"""
+        if tab is None:
+            return
+        with self._tabs_lock:
+            if tab.tab_id in self._lru:
+                self._lru.move_to_end(tab.tab_id)
+
+    def close_strays(self):
+        """关闭不受托管的残留页面，并把托管页面数压到上限以内。始终保留至少一个页面，避免浏览器随最后一个页面关闭。"""
+        pages = self.registry.page_targets()
+        with self._tabs_lock:
+            for tab_id in list(self._lru):
+                if tab_id not in pages:
+                    self._lru.pop(tab_id)
+                    self._profiles.pop(tab_id, None)
+                    self._pinned.discard(tab_id)
+            strays = [tab_id for tab_id in pages if tab_id not in self._lru]
+        if not self._lru and strays:
+            strays = strays[1:]  # 没有托管页面时保留一个残留页面
+        self._close(strays, 'strays_closed')
+        self._make_room(reserve=0)
+
+    def recycle(self) -> int:
+        """关闭所有普通页面（含托管页面），只留下一个新建的空白页，释放页面累积的JS堆和DOM。返回关闭的页面数。"""
+        pages = list(self.registry.page_targets())
+        blank = self.browser.new_tab()
+        self._prepare_tab(blank)
+        victims = [tab_id for tab_id in pages if tab_id != blank.tab_id]
+        self._close(victims, 'recycled')
+        with self._tabs_lock:
+            self._lru.clear()
+            self._profiles.clear()
+            self._pinned.clear()
+        # 新的空白页接替被关闭的工作页面
+        self.adopt(blank)
+        return len(victims)
+
+    def _find(self, prefix):
+        pages = self.registry.page_targets()
+        with self._tabs_lock:
+            # 优先复用最近使用的托管页面
+            for tab_id in reversed(self._lru):
+                if pages.get(tab_id, '').startswith(prefix):
+                    return tab_id
+        for tab_id, url in pages.items():
+            if url.startswith(prefix):
+                return tab_id
+        return None
+
+    def _open_page_ids(self) -> set:
+        with self._tabs_lock:
+            return set(self.registry.page_targets()) | set(self._lru)
+
+    def _make_room(self, reserve: int = 1):
+        """按LRU关闭托管页面（工作页面除外），直到打开的页面数加上即将新建的 reserve 个不超过上限。"""
+        open_count = len(self._open_page_ids())
+        overflow = open_count + reserve - AppConfig.MAX_TABS_PER_BROWSER
+        if overflow <= 0:
+            return
+        with self._tabs_lock:
+            # 至少保留一个页面
+            victims = [tab_id for tab_id in self._lru if tab_id not in self._pinned][:min(overflow, open_count - 1)]
+        self._close(victims, 'evicted')
+
+    def _close(self, tab_ids, stat_name):
+        if not tab_ids:
+            return
+        try:
+            self.browser.close_tabs(tab_ids)
+        except Exception as e:
+            log_util.warn("标签页池", f"关闭标签页失败: {e}")
+            return
+        with self._tabs_lock:
+            for tab_id in tab_ids:
+                self._lru.pop(tab_id, None)
+                self._profiles.pop(tab_id, None)
+                self._pinned.discard(tab_id)
+        self.stats[stat_name] += len(tab_ids)
+
+    def js_heap_mb(self) -> float:
+        """所有托管页面的JS堆占用（MB）。"""
+        with self._tabs_lock:
+            tab_ids = list(self._lru)
+        used = 0
+        for tab_id in tab_ids:
+            try:
+                used += self.browser.get_tab(tab_id).run_cdp('Runtime.getHeapUsage').get('usedSize', 0)
+            except Exception:
+                continue
+        return round(used / 1024 / 1024, 1)
@@ -0,0 +1,185 @@
+import threading
+import time
+
+from util.cancel_util import CancelUtil
+from util.log_util import log_util
+
+
+class TabRegistry:
+    """
+    基于CDP Target事件的单浏览器标签页注册表。
+    订阅 Target.targetCreated / targetInfoChanged / targetDestroyed，在本地维护所有页面的URL，
+    查询是否存在某个扩展弹窗不再需要 get_tabs() 并逐个读取 tab.url（每次都是CDP往返）。
+    wait_for_extension_popup 阻塞在条件变量上，弹窗出现时由事件线程直接唤醒。
+
+    DrissionPage 的 Chromium 对象已经在同一个驱动上注册了 Target 事件回调，
+    set_callback 会覆盖旧回调，因此这里把原回调包装进来一起调用。
+
+    同时统计每个浏览器的CDP标签页轮询次数和弹窗检测延迟（从Target创建到被检测到），
+    由调度器在释放浏览器时通过 pop_stats 汇总进运行统计。
+    """
+    _registries = {}  # browser.address -> TabRegistry
+    _stats = {}  # browser.address -> {'tab_polls', 'popup_detections', 'popup_detect_ms'}
+    _close_listeners = []  # 标签页关闭时以 targetId 调用，用于清理按 tab_id 记录的状态
+    _lock = threading.Lock()
+
+    def __init__(self, browser):
+        self.browser = browser
+        self._cond = threading.Condition()
+        self._targets = {}  # targetId -> {'type', 'url', 'created_at'}
+        self._subscribe()
+        self._seed()
+
+    @staticmethod
+    def for_browser(browser) -> 'TabRegistry':
+        """获取（必要时创建）指定浏览器的注册表。"""
+        with TabRegistry._lock:
+            registry = TabRegistry._registries.get(browser.address)
+        if registry is not None and registry.browser is browser:
+            return registry
+
+        # 订阅和初始化需要CDP往返，不在锁内进行
+        registry = TabRegistry(browser)
+        with TabRegistry._lock:
+            TabRegistry._registries[browser.address] = registry
+        return registry
+
+    @staticmethod
+    def release(browser):
+        """浏览器关闭时移除其注册表。"""
+        with TabRegistry._lock:
+            TabRegistry._registries.pop(browser.address, None)
+
+    @staticmethod
+    def add_close_listener(listener):
+        """注册标签页关闭回调（在CDP事件线程中以 targetId 调用，应尽快返回）。"""
+        with TabRegistry._lock:
+            if listener not in TabRegistry._close_listeners:
+                TabRegistry._close_listeners.append(listener)
+
+    @staticmethod
+    def record_polls(browser, count: int = 1):
+        """记录一次（或多次）基于 get_tabs 的CDP轮询。"""
+        TabRegistry._add_stat(browser.address, 'tab_polls', count)
+
+    @staticmethod
+    def pop_stats(browser) -> dict:
+        with TabRegistry._lock:
+            return TabRegistry._stats.pop(browser.address, {})
+
+    @staticmethod
+    def _add_stat(address, name, amount):
+        with TabRegistry._lock:
+            stats = TabRegistry._stats.setdefault(address, {})
+            stats[name] = stats.get(name, 0) + amount
+
+    def _subscribe(self):
+        driver = self.browser._driver
+        handlers = {
+            'Target.targetCreated': self._on_target_created,
+            'Target.targetInfoChanged': self._on_target_info_changed,
+            'Target.targetDestroyed': self._on_target_destroyed,
+        }
+        for event, handler in handlers.items():
+            original = driver.event_handlers.get(event)
+            driver.set_callback(event, self._chain(original, handler))
+        driver.run('Target.setDiscoverTargets', discover=True)
+
+    @staticmethod
+    def _chain(original, handler):
+        def chained(**kwargs):
+            if original:
+                try:
+                    original(**kwargs)
+                except Exception as e:
+                    log_util.warn("标签页注册表", f"DrissionPage原有的Target事件回调异常: {e}")
+            handler(**kwargs)
+        return chained
+
+    def _seed(self):
+        """用一次 Target.getTargets 建立初始状态，之后完全由事件维护。"""
+        TabRegistry.record_polls(self.browser)
+        result = self.browser._driver.run('Target.getTargets')
+        now = time.monotonic()
+        with self._cond:
+            for info in result.get('targetInfos', []):
+                self._targets[info['targetId']] = {'type': info.get('type'), 'url': info.get('url', ''),
+                                                   'created_at': now}
+
+    def _on_target_created(self, targetInfo=None, **kwargs):
+        if not targetInfo:
+            return
+        with self._cond:
+            self._targets[targetInfo['targetId']] = {'type': targetInfo.get('type'),
+                                                     'url': targetInfo.get('url', ''),
+                                                     'created_at': time.monotonic()}
+            self._cond.notify_all()
+
+    def _on_target_info_changed(self, targetInfo=None, **kwargs):
+        if not targetInfo:
+            return
+        with self._cond:
+            target = self._targets.setdefault(targetInfo['targetId'], {'created_at': time.monotonic()})
+            target['type'] = targetInfo.get('type')
+            target['url'] = targetInfo.get('url', '')
+            self._cond.notify_all()
+
+    def _on_target_destroyed(self, targetId=None, **kwargs):
+        with self._cond:
+            self._targets.pop(targetId, None)
+            self._cond.notify_all()
+        with TabRegistry._lock:
+            listeners = list(TabRegistry._close_listeners)
+        for listener in listeners:
+            try:
+                listener(targetId)
+            except Exception as e:
+                log_util.warn("标签页注册表", f"标签页关闭回调异常: {e}")
+
+    def _find_extension_page(self, extension_id: str):
+        prefix = f"chrome-extension://{extension_id}/"
+        for target_id, target in self._targets.items():
+            if target.get('type') == 'page' and target.get('url', '').startswith(prefix):
+                return target_id, target
+        return None, None
+
+    def extension_tab_id(self, extension_id: str):
+        """返回当前打开的扩展页面的 targetId（即 tab_id），不存在时返回None。不产生CDP请求。"""
+        with self._cond:
+            return self._find_extension_page(extension_id)[0]
+
+    def note_detected(self, extension_id: str):
+        """轮询方式检测到扩展弹窗时调用，用于记录从弹窗出现到被检测到的延迟。"""
+        with self._cond:
+            target = self._find_extension_page(extension_id)[1]
+        if target:
+            self._record_detection(target)
+
+    def _record_detection(self, target):
+        latency_ms = (time.monotonic() - target['created_at']) * 1000
+        TabRegistry._add_stat(self.browser.address, 'popup_detections', 1)
+        TabRegistry._add_stat(self.browser.address, 'popup_detect_ms', latency_ms)
+
+    def page_targets(self) -> dict:
+        """当前所有普通页面（不含扩展页面）的 {tab_id: url}。不产生CDP请求。"""
+        with self._cond:
+            return {target_id: target.get('url', '') for target_id, target in self._targets.items()
+                    if target.get('type') == 'page' and not target.get('url', '').startswith('chrome-extension://')}
+
+    def wait_for_extension_popup(self, extension_id: str, timeout: float):
+        """
+        阻塞等待扩展弹窗页面出现，返回其 tab_id；超时返回None。
+        等待期间每 CANCEL_POLL_INTERVAL 秒醒来一次检查取消信号。
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                target_id, target = self._find_extension_page(extension_id)
+                if target_id:
+                    self._record_detection(target)
+                    return target_id
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                CancelUtil.check()
+                self._cond.wait(min(remaining, CancelUtil.CANCEL_POLL_INTERVAL))
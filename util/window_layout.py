@@ -0,0 +1,90 @@
+import math
+from dataclasses import dataclass
+
+
+@dataclass
+class WindowRect:
+    """窗口位置和尺寸（逻辑像素，未除以DPI缩放）。"""
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class WindowLayout:
+    """
+    浏览器窗口布局计算，支持任意并发数。
+    grid：在屏幕上平铺，不超过8个窗口时沿用旧版固定网格，更多窗口时行列数按窗口最接近 WINDOW_ASPECT 的原则选取；
+    窗口小于最小尺寸时，屏幕只按能容纳的格子数平铺，超出的窗口按层错开叠放在已有格子上。
+    cascade：所有窗口使用同一尺寸层叠错开，不追求可见。
+    窗口重叠或被遮挡时需配合焦点模拟（ForegroundUtil），否则 Chrome 会把被遮挡的窗口当作后台页面节流。
+    """
+    MODE_GRID = 'grid'
+    MODE_CASCADE = 'cascade'
+
+    WINDOW_ASPECT = 16 / 10
+    LAYER_OFFSET = 30  # 叠放时每层窗口的错开距离
+    CASCADE_STEPS = 10  # 层叠模式下错开多少次后回到起点
+    # 不超过8个窗口时沿用旧版固定网格：(并发数上限, 列数, 行数)
+    FIXED_GRID = ((2, 2, 1), (4, 2, 2), (6, 3, 2), (8, 4, 2))
+
+    @staticmethod
+    def grid_shape(count: int, width: float, height: float, min_width: float = 0, min_height: float = 0,
+                   gap: float = 0) -> tuple:
+        """
+        count 个窗口平铺在 width x height 区域内时的 (列数, 行数)。不超过8个窗口时使用旧版固定网格，
+        不受最小尺寸限制；更多窗口时格子不小于最小尺寸，且能放下的 WINDOW_ASPECT 窗口最大，其次空格子最少，
+        没有满足最小尺寸的平铺方式时返回None。
+        """
+        for limit, cols, rows in WindowLayout.FIXED_GRID:
+            if count <= limit:
+                return cols, rows
+        best = None
+        for cols in range(1, count + 1):
+            rows = math.ceil(count / cols)
+            cell_width = (width - (cols - 1) * gap) / cols
+            cell_height = (height - (rows - 1) * gap) / rows
+            if cell_width < min_width or cell_height < min_height:
+                continue
+            window_width = min(cell_width, cell_height * WindowLayout.WINDOW_ASPECT)
+            key = (window_width, -(cols * rows - count))
+            if best is None or key > best[0]:
+                best = (key, cols, rows)
+        return (best[1], best[2]) if best else None
+
+    @staticmethod
+    def capacity_shape(width: float, height: float, min_width: float, min_height: float, gap: float) -> tuple:
+        """不小于最小尺寸时屏幕最多能平铺的 (列数, 行数)。"""
+        cols = max(1, int((width + gap) // (min_width + gap)))
+        rows = max(1, int((height + gap) // (min_height + gap)))
+        return cols, rows
+
+    @staticmethod
+    def rect(slot: int, count: int, width: float, height: float, mode: str = MODE_GRID,
+             min_width: float = 440, min_height: float = 340, gap: float = 10) -> WindowRect:
+        """计算第 slot 个窗口（共 count 个）在 width x height 可用区域内的位置和尺寸。"""
+        if mode == WindowLayout.MODE_CASCADE:
+            window_width = min(width, max(min_width, width * 0.6))
+            window_height = min(height, max(min_height, height * 0.6))
+            step = slot % WindowLayout.CASCADE_STEPS
+            max_x = max(0, width - window_width)
+            max_y = max(0, height - window_height)
+            offset = step * WindowLayout.LAYER_OFFSET
+            return WindowRect(int(min(offset, max_x)), int(min(offset, max_y)), int(window_width), int(window_height))
+
+        layer = 0
+        shape = WindowLayout.grid_shape(count, width, height, min_width, min_height, gap)
+        if shape is None:
+            # 屏幕放不下这么多不小于最小尺寸的窗口，按能容纳的格子数平铺，超出的窗口逐层错开叠放
+            shape = WindowLayout.capacity_shape(width, height, min_width, min_height, gap)
+            layer = slot // (shape[0] * shape[1])
+            slot = slot % (shape[0] * shape[1])
+        cols, rows = shape
+        cell_width = (width - (cols - 1) * gap) / cols
+        cell_height = (height - (rows - 1) * gap) / rows
+
+        row, col = divmod(slot, cols)
+        offset = layer * WindowLayout.LAYER_OFFSET
+        x = min(col * (cell_width + gap) + offset, max(0, width - cell_width))
+        y = min(row * (cell_height + gap) + offset, max(0, height - cell_height))
+        return WindowRect(int(x), int(y), int(cell_width), int(cell_height))